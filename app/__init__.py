@@ -1,54 +1,117 @@
-from flask import Flask
+import os
+from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from flask_migrate import Migrate
+from sqlalchemy.orm import configure_mappers
 from .models import db
+from .utils.principalCache import principal_cache
+from .utils.passwordHash import hashing_pool, HashingPoolBusy
+from .utils.responseCache import response_cache
+from .utils.compression import response_compression
+from .utils.textCompression import text_compression, install_text_functions
+from .utils.deletionWorker import deletion_worker
+from .utils.rateLimit import limiter, configured_limit
+from .utils.metrics import install_metrics
+from .utils.dbRouting import replica_lag
+from .utils.engine import engine_options, sqlite_pragmas, ensure_sqlite_directory, install_sqlite_pragmas
+from .utils.schema import verify_schema, SCHEMA_STARTUP_MODES
 from config import Config
 
-def create_app():
+def create_app(async_mode=None):
+    """
+    Build the app. async_mode (default: the ASYNC_MODE setting) serves the
+    article and user read endpoints with async handlers on AsyncSession;
+    writes keep using the sync controllers either way. Modules only some
+    deployments need (Flask-Migrate, the async engine) are imported here on
+    demand rather than at package import, to keep worker cold starts short.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if async_mode is not None:
+        app.config['ASYNC_MODE'] = async_mode
+
+    # Database engine profile (SQLite PRAGMAs or a tuned connection pool)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    ensure_sqlite_directory(app.config['SQLALCHEMY_DATABASE_URI'])
 
     # Initialize extensions
     db.init_app(app)
-    migrate = Migrate(app, db)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, sqlite_pragmas(app.config))
+            # The search triggers read article content through article_text()
+            install_text_functions(engine)
+    text_compression.init_app(app)
+    replica_lag.reset()
+    if app.config['METRICS_ENABLED']:
+        install_metrics(app, db)
+    # Only the flask CLI needs the `flask db` commands, and Flask-Migrate pulls in all of Alembic
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    principal_cache.init_app(app)
+    hashing_pool.init_app(app)
+    response_cache.init_app(app)
+    # Registered before CORS and the rate limiter so it runs after their hooks, on the final body
+    response_compression.init_app(app)
+
+    @app.errorhandler(HashingPoolBusy)
+    def hashing_pool_busy(error):
+        response = jsonify({'error': 'Server is busy, please retry shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     
     # Configure CORS
     CORS(app, resources={
         r"/api/*": {
             "origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:8080"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "If-Match", "If-None-Match", "If-Modified-Since"],
+            "expose_headers": ["Link", "X-Next-Cursor", "ETag", "Last-Modified", "Location"]
         }
     })
     
-    # Configure rate limiting
-    limiter = Limiter(
-        app=app,
-        key_func=get_remote_address,
-        default_limits=["200 per day", "50 per hour"]
-    )
-    
-    # Apply rate limits to specific endpoints
-    @limiter.limit("5 per minute")
-    def auth_endpoints():
-        pass
-    
-    @limiter.limit("100 per hour")
-    def api_endpoints():
-        pass
-
     # Register blueprints
     from .routes.auth import auth_bp
     from .routes.user import user_bp
     from .routes.article import article_bp
+    from .routes.export import export_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(article_bp)
+    app.register_blueprint(export_bp)
+    if app.config['ASYNC_MODE']:
+        from .routes.asyncRead import ASYNC_VIEWS
+        from .utils.asyncDb import async_db
+        async_db.init_app(app)
+        app.view_functions.update(ASYNC_VIEWS)
+    if app.config['METRICS_ENABLED']:
+        from .routes.metrics import metrics_bp
+        app.register_blueprint(metrics_bp)
+        limiter.exempt(metrics_bp)
 
-    with app.app_context():
-        db.create_all()  # Create tables on first run
+    # Configure rate limiting (storage, strategy and limits come from config)
+    limiter.limit(configured_limit('RATELIMIT_AUTH'))(auth_bp)
+    for blueprint in (user_bp, article_bp, export_bp):
+        limiter.limit(configured_limit('RATELIMIT_API'))(blueprint)
+    limiter.init_app(app)
+
+    # Schema at startup: create missing tables (development), check the migration head, or neither
+    schema_startup = app.config['DB_SCHEMA_STARTUP']
+    if schema_startup not in SCHEMA_STARTUP_MODES:
+        raise ValueError(f"DB_SCHEMA_STARTUP must be one of {', '.join(SCHEMA_STARTUP_MODES)}")
+    # Neither runs under the CLI: it must start on a missing or older schema, since it is what runs
+    # the migrations (tables made by create_all() would make `db upgrade` fail); `init-db` creates them
+    from_cli = os.environ.get('FLASK_RUN_FROM_CLI')
+    if schema_startup == 'create' and not from_cli:
+        with app.app_context():
+            db.create_all()  # Create tables on first run
+    elif schema_startup == 'verify' and not from_cli:
+        with app.app_context():
+            verify_schema(db.engine, app.config['MIGRATIONS_VERSIONS_DIR'])
+    # Resolve the model relationships now rather than during a worker's first request
+    configure_mappers()
+    # Started last, once the schema step has run, so its first poll finds the job table
+    deletion_worker.init_app(app)
 
     return app
@@ -1,14 +1,63 @@
+from datetime import datetime
+from sqlalchemy import tuple_, insert, update, delete, select, true, not_, bindparam, case, func
+from sqlalchemy.orm import load_only, selectinload, joinedload
 from app import db
-from app.models import Article
+from app.models import Article, User, content_values
+from app.utils.auth import check_resource_ownership
+from app.utils.responseCache import response_cache
+from app.utils.textCompression import text_compression
+from app.controllers.statsController import adjust_article_stats, article_deltas
 
-#Obtain all articles
-def get_all_articles():
-    return Article.query.all()
+STORAGE_BATCH_SIZE = 500
 
-#Obtain one article by id
-def get_article_by_id(article_id):
+#Drop cached public responses that an article change makes stale
+def invalidate_article_cache(article_id, affects_lists=True):
+    if article_id is not None:
+        response_cache.invalidate('article', article_id)
+        response_cache.invalidate('article-author', article_id)
+    if affects_lists:
+        response_cache.invalidate_namespace('articles')
+
+#Loader option embedding an article's author, limited to the public fields
+def author_load_option(strategy=selectinload):
+    return strategy(Article.author).load_only(*(getattr(User, field) for field in User.PUBLIC_FIELDS))
+
+#Loader options restricting a query to the given columns (others stay deferred)
+#and eager loading the related resources named in include
+def article_load_options(fields=None, required=(), include=()):
+    options = []
+    if fields:
+        if 'author' in include:
+            required = tuple(required) + ('user_id',)
+        columns = dict.fromkeys(tuple(required) + tuple(fields))
+        options.append(load_only(*(getattr(Article, column) for column in columns)))
+    if 'author' in include:
+        # One extra SELECT ... WHERE users.id IN (...) per page, whatever its size
+        options.append(author_load_option())
+    return options
+
+#Obtain one article by id (with the author joined in when included)
+def get_article_by_id(article_id, include=()):
+    if 'author' in include:
+        return Article.query.options(author_load_option(joinedload)).get(article_id)
     return Article.query.get(article_id)
 
+#Obtain only the fields needed for visibility checks and cache validation
+def get_article_meta(article_id, include=()):
+    query = db.session.query(Article.id, Article.user_id, Article.is_published, Article.updated_at)
+    if 'author' in include:
+        # An embedded author makes the author's updated_at part of the representation's version
+        query = query.outerjoin(User, User.id == Article.user_id).add_columns(
+            User.updated_at.label('author_updated_at')
+        )
+    return query.filter(Article.id == article_id).first()
+
+#Obtain many articles by id with one IN query (ids that do not exist are simply absent)
+def get_articles_by_ids(article_ids, fields=None, include=()):
+    return Article.query.filter(Article.id.in_(article_ids)).options(
+        *article_load_options(fields, required=('id', 'user_id', 'is_published'), include=include)
+    ).all()
+
 #Create new article
 def create_article(title, content, user_id, is_published=True):
     new_article = Article(
@@ -18,42 +67,307 @@ def create_article(title, content, user_id, is_published=True):
         is_published=is_published
     )
     db.session.add(new_article)
+    adjust_article_stats({user_id: [1, 1 if is_published else 0]})
     db.session.commit()
+    if is_published:
+        invalidate_article_cache(None)
     return new_article
 
-#Update existing article
-def update_article(article_id, title=None, content=None, is_published=None):
-    article = get_article_by_id(article_id)
-    if not article:
-        return None, "Article not found"
-    if title:
-        article.title = title
-    if content:
-        article.content = content
-    if is_published is not None:
-        article.is_published = is_published
+# Reasons an ownership-checked write did not apply, mapped to statuses by the routes
+ARTICLE_NOT_FOUND = 'Article not found'
+ACCESS_DENIED = 'Access denied'
+ARTICLE_MODIFIED = 'Article has been modified'
+ARTICLE_CONFLICT = 'Article was changed by a concurrent request'
+
+#SQL form of check_resource_ownership, so a write can check ownership in its WHERE clause
+def ownership_clause(current_user):
+    if getattr(current_user, 'role', None) == 'admin':
+        return true()
+    return Article.user_id == current_user.id
 
+#Tell why an ownership-checked write matched no row (one lookup, on the failure path only)
+def _write_error(article_id, current_user, expected_updated_at):
+    user_id = db.session.execute(select(Article.user_id).where(Article.id == article_id)).scalar()
+    if user_id is None:
+        return ARTICLE_NOT_FOUND
+    if not check_resource_ownership(user_id, current_user):
+        return ACCESS_DENIED
+    return ARTICLE_MODIFIED if expected_updated_at is not None else ARTICLE_CONFLICT
+
+#Apply values to an article the user may change, returning the updated article or None
+def _update_returning(article_id, current_user, values, conditions):
+    where = (Article.id == article_id, ownership_clause(current_user), *conditions)
+    if not values:
+        # Nothing to change, so leave updated_at (and with it the ETag) alone
+        return db.session.execute(select(Article).where(*where)).scalars().first()
+    statement = update(Article).where(*where).values(dict(values, updated_at=datetime.utcnow())).returning(Article)
+    return db.session.execute(
+        statement, execution_options={'synchronize_session': False, 'populate_existing': True}
+    ).scalars().first()
+
+#Commit an applied article write with its stats change, and drop stale cached responses
+def _finish_update(article, published_delta):
+    if published_delta:
+        adjust_article_stats({article.user_id: [0, published_delta]})
+    # The returned row is already current, so keep the commit from expiring it into a reload
+    db.session.expunge(article)
     db.session.commit()
+    invalidate_article_cache(article.id, affects_lists=article.is_published or bool(published_delta))
     return article, None
 
-#Delete article
-def delete_article(article_id):
-    article = get_article_by_id(article_id)
+#Update an article the user owns (or any article for admins)
+def update_article(article_id, current_user, title=None, content=None, is_published=None, expected_updated_at=None):
+    """
+    One UPDATE ... WHERE id = ? AND user_id = ? RETURNING, instead of
+    reading the article first. Returns (article, error) where error is one
+    of the constants above. expected_updated_at makes the write conditional
+    on the version the caller checked (If-Match).
+
+    Each statement also pins is_published, so the stats delta is known from
+    which one matched: the first keeps the current state (the usual case),
+    the second flips it. Changing only title or content takes one statement.
+    """
+    values = {}
+    if title:
+        values['title'] = title
+    if content:
+        values.update(content_values(content))
+    conditions = [Article.updated_at == expected_updated_at] if expected_updated_at is not None else []
+
+    if is_published is None:
+        attempts = [(values, conditions, 0)]
+    else:
+        published = bool(is_published)
+        attempts = [
+            (values, conditions + [Article.is_published.is_(published)], 0),
+            (dict(values, is_published=published), conditions + [Article.is_published.is_(not published)],
+             1 if published else -1),
+        ]
+    for attempt_values, attempt_conditions, published_delta in attempts:
+        article = _update_returning(article_id, current_user, attempt_values, attempt_conditions)
+        if article:
+            return _finish_update(article, published_delta)
+    return None, _write_error(article_id, current_user, expected_updated_at)
+
+#Flip an article's publish status in place
+def toggle_publish_status(article_id, current_user, expected_updated_at=None):
+    conditions = [Article.updated_at == expected_updated_at] if expected_updated_at is not None else []
+    article = _update_returning(article_id, current_user, {'is_published': not_(Article.is_published)}, conditions)
     if not article:
-        return False
-    
-    db.session.delete(article)
+        return None, _write_error(article_id, current_user, expected_updated_at)
+    return _finish_update(article, 1 if article.is_published else -1)
+
+#Delete an article the user owns (or any article for admins)
+def delete_article(article_id, current_user):
+    """One DELETE ... RETURNING; the returned row carries what the stats need. Returns error or None"""
+    row = db.session.execute(
+        delete(Article).where(Article.id == article_id, ownership_clause(current_user))
+        .returning(Article.user_id, Article.is_published),
+        execution_options={'synchronize_session': False}
+    ).first()
+    if not row:
+        return _write_error(article_id, current_user, None)
+    adjust_article_stats({row.user_id: [-1, -1 if row.is_published else 0]})
     db.session.commit()
-    return True
+    invalidate_article_cache(article_id, row.is_published)
+    return None
 
 # Get published articles only
 def get_published_articles():
     return Article.query.filter_by(is_published=True).all()
 
 # Get articles by user
-def get_articles_by_user(user_id):
-    return Article.query.filter_by(user_id=user_id).all()
+def get_articles_by_user(user_id, fields=None, include=()):
+    return Article.query.filter_by(user_id=user_id).options(
+        *article_load_options(fields, include=include)
+    ).all()
 
 # Get published articles by user
 def get_published_articles_by_user(user_id):
     return Article.query.filter_by(user_id=user_id, is_published=True).all()
+
+# Get one page of published articles, newest first, using keyset pagination
+def get_published_articles_page(limit, cursor=None, fields=None, include=()):
+    query = Article.query.filter(Article.is_published.is_(True)).options(
+        *article_load_options(fields, required=('id', 'created_at'), include=include)
+    )
+    if cursor:
+        created_at, article_id = cursor
+        query = query.filter(tuple_(Article.created_at, Article.id) < tuple_(created_at, article_id))
+    # Fetch one extra row to know whether another page exists
+    articles = query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1).all()
+    has_more = len(articles) > limit
+    return articles[:limit], has_more
+
+def _bulk_error(index, kind, status, error):
+    return {'index': index, 'op': kind, 'status': status, 'error': error}
+
+# Type each writable field of a bulk operation must have when given
+BULK_FIELD_TYPES = {'title': (str, 'a string'), 'content': (str, 'a string'), 'is_published': (bool, 'a boolean')}
+
+def _bulk_field_error(operation):
+    for field, (field_type, description) in BULK_FIELD_TYPES.items():
+        value = operation.get(field)
+        if value is not None and not isinstance(value, field_type):
+            return f"{field} must be {description}"
+    return None
+
+# Apply a batch of create/update/delete operations in a single transaction
+def bulk_apply_articles(operations, current_user, atomic=False):
+    """
+    Validate every operation up front (one query for all ownership checks),
+    then run creates, updates and deletes as one executemany statement each
+    and commit once. Returns (results, applied) where results holds one
+    entry per operation in request order. With atomic=True nothing is
+    applied if any operation fails validation.
+    """
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+    deltas = article_deltas()
+
+    target_ids = [
+        operation.get('id') for operation in operations
+        if isinstance(operation, dict) and isinstance(operation.get('id'), int)
+    ]
+    existing = {}
+    if target_ids:
+        rows = db.session.query(Article.id, Article.user_id, Article.is_published).filter(
+            Article.id.in_(set(target_ids))
+        )
+        existing = {row.id: row for row in rows}
+
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        kind = operation.get('op') if isinstance(operation, dict) else None
+        field_error = _bulk_field_error(operation) if kind in ('create', 'update') else None
+        if field_error:
+            results[index] = _bulk_error(index, kind, 400, field_error)
+            continue
+        if kind == 'create':
+            title = operation.get('title')
+            content = operation.get('content')
+            if not title or not content:
+                results[index] = _bulk_error(index, kind, 400, 'Title and content are required')
+                continue
+            creates.append((index, {
+                'title': title,
+                'content': content,
+                'user_id': current_user.id,
+                # An explicit null means the default, as it means "unchanged" for updates
+                'is_published': operation['is_published'] if operation.get('is_published') is not None else True,
+            }))
+        elif kind in ('update', 'delete'):
+            article_id = operation.get('id')
+            if not isinstance(article_id, int) or isinstance(article_id, bool):
+                results[index] = _bulk_error(index, kind, 400, 'id is required')
+                continue
+            if article_id in seen_ids:
+                results[index] = _bulk_error(index, kind, 400, 'Article appears more than once in the batch')
+                continue
+            seen_ids.add(article_id)
+            row = existing.get(article_id)
+            if not row:
+                results[index] = _bulk_error(index, kind, 404, 'Article not found')
+                continue
+            if not check_resource_ownership(row.user_id, current_user):
+                results[index] = _bulk_error(index, kind, 403, 'Access denied')
+                continue
+            if kind == 'delete':
+                deletes.append((index, article_id))
+                deltas[row.user_id][0] -= 1
+                deltas[row.user_id][1] -= 1 if row.is_published else 0
+                continue
+            values = {}
+            if operation.get('title'):
+                values['title'] = operation['title']
+            if operation.get('content'):
+                values.update(content_values(operation['content']))
+            if operation.get('is_published') is not None:
+                values['is_published'] = operation['is_published']
+                if bool(values['is_published']) != bool(row.is_published):
+                    deltas[row.user_id][1] += 1 if values['is_published'] else -1
+            updates.append((index, article_id, values))
+        else:
+            results[index] = _bulk_error(index, kind, 400, 'op must be "create", "update" or "delete"')
+
+    if atomic and any(result is not None for result in results):
+        for index, operation in enumerate(operations):
+            if results[index] is None:
+                results[index] = _bulk_error(index, operation.get('op'), 424, 'Not applied because another operation failed')
+        return results, False
+
+    for _, values in creates:
+        deltas[current_user.id][0] += 1
+        deltas[current_user.id][1] += 1 if values['is_published'] else 0
+    adjust_article_stats(deltas)
+
+    now = datetime.utcnow()
+    if creates:
+        new_ids = db.session.execute(
+            insert(Article).returning(Article.id, sort_by_parameter_order=True),
+            [dict(values, created_at=now, updated_at=now) for _, values in creates]
+        ).scalars().all()
+        for (index, _), article_id in zip(creates, new_ids):
+            results[index] = {'index': index, 'op': 'create', 'status': 201, 'id': article_id}
+    changed = [dict(values, id=article_id, updated_at=now) for _, article_id, values in updates if values]
+    if changed:
+        db.session.execute(update(Article), changed)
+    for index, article_id, _ in updates:
+        results[index] = {'index': index, 'op': 'update', 'status': 200, 'id': article_id}
+    if deletes:
+        db.session.execute(
+            delete(Article).where(Article.id.in_([article_id for _, article_id in deletes])),
+            execution_options={'synchronize_session': False}
+        )
+        for index, article_id in deletes:
+            results[index] = {'index': index, 'op': 'delete', 'status': 200, 'id': article_id}
+    db.session.commit()
+
+    for _, article_id, _ in updates:
+        invalidate_article_cache(article_id, affects_lists=False)
+    for _, article_id in deletes:
+        invalidate_article_cache(article_id, affects_lists=False)
+    if creates or updates or deletes:
+        invalidate_article_cache(None)
+    return results, True
+
+#Rewrite stored article content in batches so every row matches the compression setting
+def convert_article_storage(batch_size=STORAGE_BATCH_SIZE, progress=None):
+    """
+    Compresses the rows ARTICLE_COMPRESSION now covers and expands the
+    compressed rows it no longer does (e.g. once it is turned off), one
+    short transaction per batch. Only rows whose stored form changes are
+    written, and their updated_at is kept, so ETags and incremental exports
+    see no change. Returns (scanned, rewritten).
+    """
+    articles = Article.__table__
+    # Codec tag of a compressed row as hex, empty for a row stored as text
+    stored_tag = case(
+        (func.typeof(articles.c.content) == 'blob', func.hex(func.substr(articles.c.content, 1, 1))), else_=''
+    )
+    rewrite = articles.update().where(articles.c.id == bindparam('row_id')).values(
+        content=bindparam('stored'), updated_at=articles.c.updated_at
+    )
+    last_id = scanned = rewritten = 0
+    while True:
+        rows = db.session.execute(
+            select(articles.c.id, articles.c.content, stored_tag.label('tag'))
+            .where(articles.c.id > last_id).order_by(articles.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        changed = []
+        for row in rows:
+            stored = text_compression.compress(row.content)
+            tag = stored[:1] if isinstance(stored, bytes) else b''
+            if tag != bytes.fromhex(row.tag):
+                changed.append({'row_id': row.id, 'stored': stored})
+        if changed:
+            db.session.execute(rewrite, changed)
+        db.session.commit()
+        last_id = rows[-1].id
+        scanned += len(rows)
+        rewritten += len(changed)
+        if progress:
+            progress(scanned, rewritten)
+    return scanned, rewritten
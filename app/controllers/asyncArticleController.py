@@ -0,0 +1,53 @@
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
+from app.models import Article, User
+from app.controllers.articleController import article_load_options, author_load_option
+from app.utils.responseCache import SHARED_VERSIONS_QUERY, versions_in_order
+
+# Async read paths used in ASYNC_MODE; each takes the AsyncSession handed out by async_db.run()
+
+#Obtain one article by id (with the author joined in when included)
+async def get_article_by_id(session, article_id, include=()):
+    options = [author_load_option(joinedload)] if 'author' in include else []
+    return await session.get(Article, article_id, options=options)
+
+#Obtain only the fields needed for visibility checks and cache validation
+async def get_article_meta(session, article_id, include=()):
+    query = select(Article.id, Article.user_id, Article.is_published, Article.updated_at)
+    if 'author' in include:
+        query = query.outerjoin(User, User.id == Article.user_id).add_columns(
+            User.updated_at.label('author_updated_at')
+        )
+    return (await session.execute(query.where(Article.id == article_id))).first()
+
+#Obtain many articles by id with one IN query (ids that do not exist are simply absent)
+async def get_articles_by_ids(session, article_ids, fields=None, include=()):
+    query = select(Article).where(Article.id.in_(article_ids)).options(
+        *article_load_options(fields, required=('id', 'user_id', 'is_published'), include=include)
+    )
+    return (await session.execute(query)).scalars().all()
+
+# Get articles by user
+async def get_articles_by_user(session, user_id, fields=None, include=()):
+    query = select(Article).where(Article.user_id == user_id).options(
+        *article_load_options(fields, include=include)
+    )
+    return (await session.execute(query)).scalars().all()
+
+# Get one page of published articles, newest first, using keyset pagination
+async def get_published_articles_page(session, limit, cursor=None, fields=None, include=()):
+    query = select(Article).where(Article.is_published.is_(True)).options(
+        *article_load_options(fields, required=('id', 'created_at'), include=include)
+    )
+    if cursor:
+        created_at, article_id = cursor
+        query = query.where(tuple_(Article.created_at, Article.id) < tuple_(created_at, article_id))
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1)
+    articles = (await session.execute(query)).scalars().all()
+    has_more = len(articles) > limit
+    return articles[:limit], has_more
+
+# Get the shared response cache versions of names (run on the primary)
+async def get_cache_versions(session, names):
+    return versions_in_order(names, (await session.execute(SHARED_VERSIONS_QUERY, {'names': names})).all())
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+from app.models import User
+from app.utils.principalCache import SHARED_GENERATION_QUERY
+
+# Async read paths used in ASYNC_MODE; each takes the AsyncSession handed out by async_db.run()
+
+#Obtain all users
+async def get_all_users(session):
+    return (await session.execute(select(User).filter_by(is_active=True))).scalars().all()
+
+#Obtain one user by id
+async def get_user_by_id(session, user_id):
+    return (await session.execute(select(User).filter_by(id=user_id, is_active=True))).scalars().first()
+
+# Get users by role
+async def get_users_by_role(session, role):
+    return (await session.execute(select(User).filter_by(role=role, is_active=True))).scalars().all()
+
+# Get the shared principal cache generation (run on the primary)
+async def get_principal_generation(session):
+    return (await session.execute(SHARED_GENERATION_QUERY)).scalar() or 0
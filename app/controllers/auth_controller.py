@@ -1,7 +1,8 @@
 import jwt
 import datetime
 from flask import current_app
-from app.utils.passwordHash import verify_password
+from app import db
+from app.utils.passwordHash import verify_password, hash_password, needs_rehash, HashingPoolBusy
 from app.controllers.userController import get_user_by_email
 
 #Authenticate a user
@@ -11,6 +12,14 @@ def authenticate_user(email,password):
         return None,"User not found"
     if not verify_password(password,user.password_hash):
         return None, "Incorrect password"
+
+    # Upgrade hashes made with an older work factor while we have the plaintext
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except HashingPoolBusy:
+            pass  # Try again on a later login rather than fail this one
     
     # Create a JWT token
     payload ={
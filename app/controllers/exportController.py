@@ -0,0 +1,38 @@
+from sqlalchemy import select
+from app import db
+from app.models import Article, User
+
+# Columns included in exports; password hashes never leave the database
+EXPORT_COLUMNS = {
+    'articles': (
+        Article.id, Article.title, Article.content, Article.created_at,
+        Article.updated_at, Article.user_id, Article.is_published
+    ),
+    'users': (
+        User.id, User.username, User.email, User.profile_image_url, User.role,
+        User.created_at, User.updated_at, User.is_active
+    ),
+}
+
+EXPORT_BATCH_SIZE = 1000
+
+
+#Iterate over every row of an export as plain dicts, fetching in batches
+def iter_export(kind, updated_since=None, updated_until=None, batch_size=EXPORT_BATCH_SIZE):
+    columns = EXPORT_COLUMNS[kind]
+    model = Article if kind == 'articles' else User
+    statement = select(*columns).order_by(model.id)
+    if updated_since:
+        statement = statement.where(model.updated_at >= updated_since)
+    if updated_until:
+        statement = statement.where(model.updated_at < updated_until)
+
+    # Server-side cursor where the driver supports it; rows arrive batch_size at a time
+    result = db.session.execute(
+        statement.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    try:
+        for row in result:
+            yield dict(row._mapping)
+    finally:
+        result.close()
@@ -0,0 +1,169 @@
+import csv
+import json
+import os
+from sqlalchemy import insert, select, or_
+from app import db
+from app.models import User, Article, ImportCheckpoint
+from app.utils.passwordHash import hash_password_batch
+from app.controllers.statsController import adjust_article_stats, adjust_user_count, article_deltas
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_FORMATS = ('jsonl', 'csv')
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+
+
+#Read records from a JSONL or CSV file one at a time
+def read_records(path, fmt=None):
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+#Key under which the progress of one import source is stored
+def checkpoint_source(kind, path):
+    return f"{kind}:{os.path.abspath(path)}"
+
+
+#Obtain how many records of a source were already committed
+def get_checkpoint(source):
+    checkpoint = ImportCheckpoint.query.filter_by(source=source).first()
+    return checkpoint.position if checkpoint else 0
+
+
+#Forget the progress of a source so the next import starts over
+def reset_checkpoint(source):
+    ImportCheckpoint.query.filter_by(source=source).delete()
+    db.session.commit()
+
+
+def _as_bool(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _as_user_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _user_rows(records, executor):
+    complete = [
+        record for record in records
+        if record.get('username') and record.get('email') and (record.get('password') or record.get('password_hash'))
+    ]
+    skipped = len(records) - len(complete)
+
+    # Usernames and emails are unique: find the ones already stored with one query, so
+    # that records reusing one (there or earlier in the batch) are skipped, not fatal
+    taken_usernames, taken_emails = set(), set()
+    if complete:
+        usernames = {record['username'] for record in complete}
+        emails = {record['email'] for record in complete}
+        for username, email in db.session.execute(
+                select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails)))):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    rows, plain = [], []
+    for record in complete:
+        if record['username'] in taken_usernames or record['email'] in taken_emails:
+            skipped += 1
+            continue
+        taken_usernames.add(record['username'])
+        taken_emails.add(record['email'])
+        row = {
+            'username': record['username'],
+            'email': record['email'],
+            'password_hash': record.get('password_hash'),
+            'profile_image_url': record.get('profile_image_url') or 'default.png',
+            'role': record.get('role') or 'user',
+            'is_active': _as_bool(record.get('is_active')),
+        }
+        if not row['password_hash']:
+            plain.append((len(rows), record['password']))
+        rows.append(row)
+    if plain:
+        hashes = hash_password_batch([password for _, password in plain], executor)
+        for (position, _), password_hash in zip(plain, hashes):
+            rows[position]['password_hash'] = password_hash
+    return rows, skipped
+
+
+def _article_rows(records):
+    # Resolve author emails, and check the given user ids exist, for the whole batch with one query each
+    emails = {record['author_email'] for record in records if record.get('author_email') and not record.get('user_id')}
+    authors = {}
+    if emails:
+        authors = dict(db.session.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+    user_ids = {_as_user_id(record['user_id']) for record in records if record.get('user_id')} - {None}
+    known_ids = set()
+    if user_ids:
+        known_ids = set(db.session.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+
+    rows, skipped = [], 0
+    for record in records:
+        if record.get('user_id'):
+            # A malformed or unknown id would fail the whole batch on int() or the foreign key
+            user_id = _as_user_id(record['user_id'])
+            user_id = user_id if user_id in known_ids else None
+        else:
+            user_id = authors.get(record.get('author_email'))
+        if not record.get('title') or not record.get('content') or not user_id:
+            skipped += 1
+            continue
+        rows.append({
+            'title': record['title'],
+            'content': record['content'],
+            'user_id': user_id,
+            'is_published': _as_bool(record.get('is_published')),
+        })
+    return rows, skipped
+
+
+#Insert one batch and advance the checkpoint in the same transaction
+def import_batch(kind, records, source, position, executor=None):
+    """
+    Insert a batch of user or article records with a single executemany
+    statement. The checkpoint moves forward in the same transaction, so a
+    crash either keeps both the rows and the new position or neither.
+    Returns (inserted, skipped).
+    """
+    if kind == 'users':
+        model = User
+        rows, skipped = _user_rows(records, executor)
+    else:
+        model = Article
+        rows, skipped = _article_rows(records)
+
+    try:
+        if rows:
+            db.session.execute(insert(model), rows)
+            if kind == 'users':
+                adjust_user_count(sum(1 for row in rows if row['is_active']))
+            else:
+                deltas = article_deltas()
+                for row in rows:
+                    deltas[row['user_id']][0] += 1
+                    deltas[row['user_id']][1] += 1 if row['is_published'] else 0
+                adjust_article_stats(deltas)
+        checkpoint = ImportCheckpoint.query.filter_by(source=source).first()
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(source=source)
+            db.session.add(checkpoint)
+        checkpoint.position = position + len(records)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows), skipped
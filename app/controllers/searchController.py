@@ -0,0 +1,113 @@
+from sqlalchemy import event, text, DDL
+from app import db
+from app.models import Article
+
+# External-content FTS5 index over articles(title, content), kept in sync by triggers. Content
+# may be stored compressed, so the index reads it as text through article_text(): the triggers
+# directly, snippet() and rebuilds through the articles_fts_source view
+SEARCH_INDEX_DDL = (
+    "CREATE VIEW IF NOT EXISTS articles_fts_source AS "
+    "SELECT id, title, article_text(content) AS content FROM articles",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, content, content='articles_fts_source', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+    "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, article_text(new.content)); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, article_text(old.content)); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, article_text(old.content)); "
+    "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, article_text(new.content)); END",
+)
+
+SEARCH_BATCH_SIZE = 5000
+SNIPPET_TOKENS = 16
+
+for statement in SEARCH_INDEX_DDL:
+    event.listen(Article.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+
+#Check whether the current database can serve full-text search
+def search_supported():
+    return db.engine.dialect.name == 'sqlite'
+
+
+#Turn free text into an FTS5 query: every term must match, a trailing * keeps prefix search
+def build_match_query(raw_query):
+    terms = []
+    for term in raw_query.split():
+        prefix = term.endswith('*')
+        term = term.rstrip('*')
+        if not term:
+            continue
+        quoted = '"' + term.replace('"', '""') + '"'
+        terms.append(quoted + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+#Search articles ranked by bm25, with keyset pagination over (rank, id)
+def search_articles(raw_query, limit, cursor=None, author_id=None, published=True):
+    match = build_match_query(raw_query)
+    if not match:
+        return [], False
+
+    conditions = ["articles_fts MATCH :match"]
+    params = {'match': match, 'limit': limit + 1}
+    if published is not None:
+        conditions.append("articles.is_published = :published")
+        params['published'] = published
+    if author_id is not None:
+        conditions.append("articles.user_id = :author_id")
+        params['author_id'] = author_id
+    if cursor:
+        conditions.append(
+            "(bm25(articles_fts) > :cursor_rank "
+            "OR (bm25(articles_fts) = :cursor_rank AND articles.id > :cursor_id))"
+        )
+        params['cursor_rank'], params['cursor_id'] = cursor
+
+    sql = text(
+        "SELECT articles.id, articles.title, articles.created_at, articles.updated_at, "
+        "articles.user_id, articles.is_published, bm25(articles_fts) AS rank, "
+        f"snippet(articles_fts, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}) AS snippet "
+        "FROM articles_fts JOIN articles ON articles.id = articles_fts.rowid "
+        f"WHERE {' AND '.join(conditions)} "
+        "ORDER BY rank, articles.id LIMIT :limit"
+    ).columns(created_at=db.DateTime, updated_at=db.DateTime, is_published=db.Boolean)
+    rows = db.session.execute(sql, params).mappings().all()
+    has_more = len(rows) > limit
+    return [dict(row) for row in rows[:limit]], has_more
+
+
+#Rebuild the search index from the articles table in batches of short transactions
+def rebuild_search_index(batch_size=SEARCH_BATCH_SIZE, progress=None):
+    for statement in SEARCH_INDEX_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('delete-all')"))
+    db.session.commit()
+
+    last_id = 0
+    indexed = 0
+    while True:
+        ids = db.session.execute(
+            text("SELECT id FROM articles WHERE id > :last_id ORDER BY id LIMIT :batch_size"),
+            {'last_id': last_id, 'batch_size': batch_size}
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(
+            text(
+                "INSERT INTO articles_fts(rowid, title, content) "
+                "SELECT id, title, content FROM articles_fts_source WHERE id BETWEEN :first AND :last"
+            ),
+            {'first': ids[0], 'last': ids[-1]}
+        )
+        db.session.commit()
+        last_id = ids[-1]
+        indexed += len(ids)
+        if progress:
+            progress(indexed)
+    db.session.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')"))
+    db.session.commit()
+    return indexed
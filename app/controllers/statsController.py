@@ -0,0 +1,129 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, select, update
+from app import db
+from app.models import Article, User, UserArticleStats, SiteStats
+
+SITE_STATS_ID = 1
+
+#Add deltas to one counter row, creating it on first use (runs in the caller's transaction)
+def _bump(model, key_column, key, **deltas):
+    now = datetime.utcnow()
+    columns = model.__table__.c
+    result = db.session.execute(
+        update(model).where(key_column == key)
+        .values({**{name: columns[name] + delta for name, delta in deltas.items()}, 'updated_at': now}),
+        execution_options={'synchronize_session': False}
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(model).values({key_column.key: key, 'updated_at': now, **deltas}))
+
+#Collect per-author changes to the article counters
+def article_deltas():
+    return defaultdict(lambda: [0, 0])
+
+#Apply per-author article count changes to the author and site counters
+def adjust_article_stats(deltas):
+    """
+    deltas maps user_id to [articles, published] changes. Call before the
+    commit of the write they describe, so counters and rows move together.
+    """
+    total_articles = total_published = 0
+    for user_id, (articles, published) in deltas.items():
+        if articles or published:
+            _bump(UserArticleStats, UserArticleStats.user_id, user_id,
+                  article_count=articles, published_count=published)
+            total_articles += articles
+            total_published += published
+    if total_articles or total_published:
+        _bump(SiteStats, SiteStats.id, SITE_STATS_ID, article_count=total_articles, published_count=total_published)
+
+#Record users becoming active (positive) or inactive (negative)
+def adjust_user_count(delta):
+    if delta:
+        _bump(SiteStats, SiteStats.id, SITE_STATS_ID, user_count=delta)
+
+#Drop the counters of a user about to be hard deleted, along with their share of the site totals
+def forget_user_stats(user_id, was_active):
+    stats = db.session.get(UserArticleStats, user_id)
+    articles, published = (stats.article_count, stats.published_count) if stats else (0, 0)
+    if stats:
+        db.session.delete(stats)
+    if articles or published or was_active:
+        _bump(SiteStats, SiteStats.id, SITE_STATS_ID,
+              user_count=-1 if was_active else 0, article_count=-articles, published_count=-published)
+
+def _counts_dict(articles, published, updated_at):
+    return {
+        'articles': articles,
+        'published': published,
+        'drafts': articles - published,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+#Obtain the article counters of one user
+def get_user_stats(user_id):
+    stats = db.session.get(UserArticleStats, user_id) or UserArticleStats(article_count=0, published_count=0)
+    return dict(_counts_dict(stats.article_count, stats.published_count, stats.updated_at), user_id=user_id)
+
+#Obtain the site wide counters
+def get_site_stats():
+    stats = db.session.get(SiteStats, SITE_STATS_ID) or SiteStats(user_count=0, article_count=0, published_count=0)
+    return dict(_counts_dict(stats.article_count, stats.published_count, stats.updated_at), users=stats.user_count)
+
+#Count everything from scratch (full scans, for rebuild and verification only)
+def compute_stats():
+    """Returns (per-user {user_id: (articles, published)}, (users, articles, published))"""
+    published = func.sum(case((Article.is_published.is_(True), 1), else_=0))
+    per_user = {
+        user_id: (articles, int(published_count or 0))
+        for user_id, articles, published_count in db.session.execute(
+            select(Article.user_id, func.count(), published).group_by(Article.user_id)
+        )
+    }
+    users = db.session.execute(select(func.count()).select_from(User).where(User.is_active.is_(True))).scalar()
+    articles = sum(counts[0] for counts in per_user.values())
+    published_total = sum(counts[1] for counts in per_user.values())
+    return per_user, (users, articles, published_total)
+
+#Compare the stored counters with fresh counts
+def verify_stats():
+    """Returns a list of mismatch descriptions, empty when every counter is right"""
+    per_user, (users, articles, published) = compute_stats()
+    stored = {
+        stats.user_id: (stats.article_count, stats.published_count)
+        for stats in db.session.execute(select(UserArticleStats)).scalars()
+    }
+    mismatches = []
+    for user_id in sorted(set(per_user) | set(stored)):
+        expected = per_user.get(user_id, (0, 0))
+        actual = stored.get(user_id, (0, 0))
+        if expected != actual:
+            mismatches.append(f"user {user_id}: stored articles/published {actual}, counted {expected}")
+    site = db.session.get(SiteStats, SITE_STATS_ID)
+    actual = (site.user_count, site.article_count, site.published_count) if site else (0, 0, 0)
+    if actual != (users, articles, published):
+        mismatches.append(f"site: stored users/articles/published {actual}, counted {(users, articles, published)}")
+    return mismatches
+
+#Replace every counter with fresh counts in one transaction
+def rebuild_stats():
+    """
+    Recount from the articles and users tables. Writes that commit while
+    the counts run can be missed on databases that allow them, so run it
+    when traffic is low and check the result with verify_stats().
+    """
+    per_user, (users, articles, published) = compute_stats()
+    now = datetime.utcnow()
+    db.session.execute(delete(UserArticleStats))
+    db.session.execute(delete(SiteStats))
+    if per_user:
+        db.session.execute(insert(UserArticleStats), [
+            {'user_id': user_id, 'article_count': counts[0], 'published_count': counts[1], 'updated_at': now}
+            for user_id, counts in per_user.items()
+        ])
+    db.session.execute(insert(SiteStats).values(
+        id=SITE_STATS_ID, user_count=users, article_count=articles, published_count=published, updated_at=now
+    ))
+    db.session.commit()
+    return len(per_user), (users, articles, published)
@@ -1,7 +1,17 @@
+from datetime import datetime
+from sqlalchemy import update, select
 from app.models import User
 from app.utils.passwordHash import hash_password
+from app.utils.principalCache import principal_cache
+from app.utils.responseCache import response_cache
+from app.controllers.statsController import adjust_user_count
 from app import db
 
+#Drop cached article responses that embed a user's public fields
+def invalidate_author_cache():
+    response_cache.invalidate_namespace('article-author')
+    response_cache.invalidate_namespace('articles')
+
 #Obtain all users
 def get_all_users():
     return User.query.filter_by(is_active=True).all()
@@ -10,6 +20,10 @@ def get_all_users():
 def get_user_by_id(user_id):
     return User.query.filter_by(id=user_id, is_active=True).first()
 
+#Obtain many active users by id with one IN query
+def get_users_by_ids(user_ids):
+    return User.query.filter(User.id.in_(user_ids), User.is_active.is_(True)).all()
+
 #Obtain one user by email
 def get_user_by_email(email):
     return User.query.filter_by(email=email, is_active=True).first()
@@ -26,25 +40,51 @@ def create_user(username,email,password,profile_image_url="default.png", role="u
     )
 
     db.session.add(new_user)
+    adjust_user_count(1)
     db.session.commit()
     return new_user
 
+# Reasons update_user did not apply, mapped to statuses by the routes
+USER_NOT_FOUND = 'User not found'
+USER_MODIFIED = 'User has been modified'
+
 #Update an existing user
-def update_user(user_id,username=None,email=None,profile_image_url=None, role=None):
-    user = User.query.get(user_id)
-    if not user:
-        return None
-    if username:
-        user.username = username
-    if email:
-        user.email = email
-    if profile_image_url:
-        user.profile_image_url = profile_image_url
-    if role:
-        user.role = role
+def update_user(user_id,username=None,email=None,profile_image_url=None, role=None, expected_updated_at=None):
+    """
+    Returns (user, error) where error is one of the constants above.
+    expected_updated_at makes the write conditional on the version the
+    caller checked (If-Match): one UPDATE ... WHERE id = ? AND updated_at = ?,
+    so of two concurrent writers that checked the same version only the
+    first applies.
+    """
+    values = {
+        name: value for name, value in
+        (('username', username), ('email', email), ('profile_image_url', profile_image_url), ('role', role))
+        if value
+    }
+    where = [User.id == user_id]
+    if expected_updated_at is not None:
+        where.append(User.updated_at == expected_updated_at)
+    if values:
+        statement = update(User).where(*where).values(dict(values, updated_at=datetime.utcnow())).returning(User)
+        user = db.session.execute(
+            statement, execution_options={'synchronize_session': False, 'populate_existing': True}
+        ).scalars().first()
+    else:
+        # Nothing to change, so leave updated_at (and with it the ETag) alone
+        user = db.session.execute(select(User).where(*where)).scalars().first()
+    if user is None:
+        db.session.rollback()
+        exists = expected_updated_at is not None and db.session.get(User, user_id) is not None
+        return None, USER_MODIFIED if exists else USER_NOT_FOUND
 
+    # The returned row is already current, so keep the commit from expiring it into a reload
+    db.session.expunge(user)
     db.session.commit()
-    return user
+    principal_cache.invalidate(user_id)
+    if username or profile_image_url:
+        invalidate_author_cache()
+    return user, None
 
 
 #Delete an existing user (soft delete)
@@ -52,17 +92,11 @@ def delete_user(user_id):
     user = User.query.get(user_id)
     if not user:
         return False
+    if user.is_active:
+        adjust_user_count(-1)
     user.is_active = False
     db.session.commit()
-    return True
-
-# Hard delete user (admin only)
-def hard_delete_user(user_id):
-    user = User.query.get(user_id)
-    if not user:
-        return False
-    db.session.delete(user)
-    db.session.commit()
+    principal_cache.invalidate(user_id)
     return True
 
 # Create admin user
@@ -80,4 +114,5 @@ def update_user_role(user_id, new_role):
         return None
     user.role = new_role
     db.session.commit()
+    principal_cache.invalidate(user_id)
     return user
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, exists, or_, and_, select, update
+from app import db
+from app.models import User, Article, UserDeletionJob
+from app.utils.principalCache import principal_cache
+from app.controllers.articleController import invalidate_article_cache
+from app.controllers.statsController import adjust_article_stats, adjust_user_count, forget_user_stats
+from app.controllers.userController import invalidate_author_cache
+
+HARD_DELETE_CHUNK_SIZE = 500
+UNFINISHED_STATUSES = ('pending', 'running', 'failed')
+
+
+#Name under which this process claims jobs
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+#Obtain one deletion job by id
+def get_deletion_job(job_id):
+    return db.session.get(UserDeletionJob, job_id)
+
+#Obtain the most recent deletion jobs
+def get_deletion_jobs(limit=50):
+    return UserDeletionJob.query.order_by(UserDeletionJob.id.desc()).limit(limit).all()
+
+#Schedule the hard delete of a user (returns the job, or None when the user does not exist)
+def schedule_user_deletion(user_id, requested_by=None):
+    """
+    The user is deactivated right away, so they can no longer sign in or
+    write, and the job row is what the background worker picks up. Asking
+    again for a user with an unfinished job returns that job, restarting it
+    if it failed.
+    """
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    job = UserDeletionJob.query.filter(
+        UserDeletionJob.user_id == user_id, UserDeletionJob.status.in_(UNFINISHED_STATUSES)
+    ).first()
+    if job is None:
+        job = UserDeletionJob(user_id=user_id, requested_by=requested_by, status='pending', articles_deleted=0)
+        db.session.add(job)
+    elif job.status == 'failed':
+        job.status = 'pending'
+        job.error = None
+    if user.is_active:
+        user.is_active = False
+        adjust_user_count(-1)
+    db.session.commit()
+    principal_cache.invalidate(user_id)
+    return job
+
+#Claim the oldest job that is pending or was abandoned by its worker
+def claim_next_job(worker, stale_seconds):
+    """
+    The claim is a guarded UPDATE, so when several processes poll the table
+    each job is taken by one of them. A running job whose heartbeat is older
+    than stale_seconds belonged to a process that died and is taken over.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    claimable = or_(
+        UserDeletionJob.status == 'pending',
+        and_(UserDeletionJob.status == 'running', UserDeletionJob.heartbeat_at < stale_before),
+    )
+    candidates = db.session.execute(
+        select(UserDeletionJob.id).where(claimable).order_by(UserDeletionJob.id)
+    ).scalars().all()
+    for job_id in candidates:
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(UserDeletionJob).where(UserDeletionJob.id == job_id, claimable)
+            .values(status='running', worker=worker, heartbeat_at=now, updated_at=now),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+def _record_progress(job_id, worker, **values):
+    """Update a job this worker still holds; False when another worker took it over"""
+    now = datetime.utcnow()
+    return db.session.execute(
+        update(UserDeletionJob).where(UserDeletionJob.id == job_id, UserDeletionJob.worker == worker)
+        .values(heartbeat_at=now, updated_at=now, **values),
+        execution_options={'synchronize_session': False}
+    ).rowcount == 1
+
+#Delete one chunk of a user's articles in its own short transaction
+def delete_article_chunk(job_id, user_id, worker, chunk_size=HARD_DELETE_CHUNK_SIZE):
+    """Returns the number of articles deleted, or None when the job was taken over"""
+    chunk = select(Article.id).where(Article.user_id == user_id).order_by(Article.id).limit(chunk_size)
+    rows = db.session.execute(
+        delete(Article).where(Article.id.in_(chunk)).returning(Article.id, Article.is_published),
+        execution_options={'synchronize_session': False}
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+    published = sum(1 for row in rows if row.is_published)
+    adjust_article_stats({user_id: [-len(rows), -published]})
+    if not _record_progress(job_id, worker, articles_deleted=UserDeletionJob.articles_deleted + len(rows)):
+        db.session.rollback()
+        return None
+    db.session.commit()
+
+    for row in rows:
+        invalidate_article_cache(row.id, affects_lists=False)
+    if published:
+        invalidate_article_cache(None)
+    return len(rows)
+
+#Delete the user row once no article refers to it
+def finish_user_deletion(job_id, user_id, worker):
+    """Returns False when articles are still left (e.g. written during the job), so more chunks are needed"""
+    forget_user_stats(user_id, was_active=False)
+    removed = db.session.execute(
+        delete(User).where(User.id == user_id, ~exists().where(Article.user_id == user_id)),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if not removed and db.session.get(User, user_id) is not None:
+        db.session.rollback()
+        return False
+    if not _record_progress(job_id, worker, status='done', finished_at=datetime.utcnow()):
+        db.session.rollback()
+        return True
+    db.session.commit()
+    principal_cache.invalidate(user_id)
+    invalidate_author_cache()
+    return True
+
+#Run a claimed job to completion, chunk by chunk
+def run_deletion_job(job_id, worker, chunk_size=HARD_DELETE_CHUNK_SIZE, pause_seconds=0, stop=None):
+    """
+    Deletes the user's articles chunk_size at a time, each chunk with its
+    stats change and the job's progress in one short transaction, sleeping
+    pause_seconds between chunks so other writers get the database. Safe to
+    re-run after a crash: it only ever deletes what is left. Stops early,
+    leaving the job to be resumed, when stop is set or another worker has
+    taken the job over. Returns the job's status when it stopped; a failed
+    job keeps the error and is restarted by scheduling the deletion again.
+    """
+    user_id = db.session.execute(select(UserDeletionJob.user_id).where(UserDeletionJob.id == job_id)).scalar()
+    try:
+        while not (stop and stop.is_set()):
+            deleted = delete_article_chunk(job_id, user_id, worker, chunk_size)
+            if deleted is None:
+                return 'running'
+            if deleted == 0:
+                if finish_user_deletion(job_id, user_id, worker):
+                    return 'done'
+                continue
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        return 'running'
+    except Exception as error:
+        db.session.rollback()
+        _record_progress(job_id, worker, status='failed', error=str(error)[:1000])
+        db.session.commit()
+        return 'failed'
+
+#Claim and run every job that is waiting, returning {job_id: status} for the jobs run
+def run_pending_deletions(worker, chunk_size, pause_seconds, stale_seconds, stop=None):
+    ran = {}
+    while not (stop and stop.is_set()):
+        job_id = claim_next_job(worker, stale_seconds)
+        if job_id is None:
+            break
+        ran[job_id] = run_deletion_job(job_id, worker, chunk_size, pause_seconds, stop)
+    return ran
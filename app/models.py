@@ -1,10 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.utils.dbRouting import RoutingSession
+from sqlalchemy.orm import validates
+from app.utils.textCompression import CompressedText
 from datetime import datetime
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+EXCERPT_LENGTH = 200
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Serves role listings; soft-deleted users are left out of the index
+        db.Index(
+            'ix_users_active_role', 'role',
+            sqlite_where=db.text('is_active = 1'), postgresql_where=db.text('is_active')
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), nullable=False, unique=True)
@@ -13,10 +25,14 @@ class User(db.Model):
     profile_image_url = db.Column(db.String(255), default="default.png")
     role = db.Column(db.String(20), default="user")  # user, admin
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
     # Relation: One user have many posts
-    articles = db.relationship('Article', backref='author', lazy=True)
+    articles = db.relationship('Article', back_populates='author', lazy=True)
+
+    # Fields other users may see when a user is embedded in another resource
+    PUBLIC_FIELDS = ('id', 'username', 'profile_image_url')
 
     def to_dict(self):
         """Convert user object to dictionary for JSON serialization"""
@@ -27,9 +43,14 @@ class User(db.Model):
             'profile_image_url': self.profile_image_url,
             'role': self.role,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_active': self.is_active
         }
 
+    def to_public_dict(self):
+        """Compact public projection used when a user is embedded (e.g. article authors)"""
+        return {field: getattr(self, field) for field in self.PUBLIC_FIELDS}
+
     def is_admin(self):
         """Check if user has admin privileges"""
         return self.role == 'admin'
@@ -39,30 +60,178 @@ class User(db.Model):
 
 
 
+def content_values(content):
+    """Column values a statement writing an article's content sets: the content and what is derived from it"""
+    return {
+        'content': content,
+        'excerpt': content[:EXCERPT_LENGTH] if content is not None else None,
+        'content_length': len(content) if content is not None else None,
+    }
+
+
+def _from_content(context, column):
+    # Insert default derived from the content being inserted (executemany rows included)
+    return content_values(context.get_current_parameters().get('content'))[column]
+
+
 class Article(db.Model):
     __tablename__ = 'articles'
+    __table_args__ = (
+        # Serves keyset pagination of the public article feed
+        db.Index('ix_articles_published_created_id', 'is_published', 'created_at', 'id'),
+        # Serves per-author listings and counts, and the foreign key check when a user is deleted
+        db.Index('ix_articles_user_published', 'user_id', 'is_published'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(CompressedText, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_published = db.Column(db.Boolean, default=True)
 
     # Foreign key to user
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    author = db.relationship('User', back_populates='articles')
+
+    # Leading part and length of the content, stored on write so summaries never read the body
+    excerpt = db.Column(db.String(EXCERPT_LENGTH), default=lambda context: _from_content(context, 'excerpt'))
+    content_length = db.Column(db.Integer, default=lambda context: _from_content(context, 'content_length'))
+
+    # Fields clients may request with ?fields=
+    FIELDS = (
+        'id', 'title', 'content', 'excerpt', 'content_length', 'created_at', 'updated_at', 'user_id', 'is_published'
+    )
+    # Fields returned by to_dict() when none are requested
+    DEFAULT_FIELDS = ('id', 'title', 'content', 'created_at', 'updated_at', 'user_id', 'is_published')
+    # Projection used by list endpoints, which never need the full content
+    SUMMARY_FIELDS = ('id', 'title', 'excerpt', 'content_length', 'created_at', 'updated_at', 'user_id', 'is_published')
+    # Related resources clients may embed with ?include=
+    INCLUDES = ('author',)
+
+    @validates('content')
+    def _derive_from_content(self, key, content):
+        values = content_values(content)
+        self.excerpt, self.content_length = values['excerpt'], values['content_length']
+        return content
+
+    def to_dict(self, fields=None, include=()):
+        """
+        Convert article object to dictionary for JSON serialization.
+        Only the given fields are read, so columns deferred at query time
+        are never lazy loaded. Related resources named in include are
+        embedded and should be eager loaded by the query.
+        """
+        data = {}
+        for field in fields or self.DEFAULT_FIELDS:
+            value = getattr(self, field)
+            data[field] = value.isoformat() if isinstance(value, datetime) else value
+        if 'author' in include:
+            data['author'] = self.author.to_public_dict() if self.author else None
+        return data
+
+    def __repr__(self):
+        return f"<Article {self.title}>"
+
+
+class UserArticleStats(db.Model):
+    __tablename__ = 'user_article_stats'
+
+    # Kept current by the write paths (see statsController); a missing row means all zeros
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    published_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<UserArticleStats {self.user_id}: {self.article_count}/{self.published_count}>"
+
+
+class SiteStats(db.Model):
+    __tablename__ = 'site_stats'
+
+    id = db.Column(db.Integer, primary_key=True)  # Single row, id 1
+    user_count = db.Column(db.Integer, nullable=False, default=0)  # Active users
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    published_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SiteStats {self.user_count} users, {self.article_count}/{self.published_count} articles>"
+
+
+class ImportCheckpoint(db.Model):
+    __tablename__ = 'import_checkpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(512), nullable=False, unique=True)  # "<kind>:<absolute path>"
+    position = db.Column(db.Integer, nullable=False, default=0)  # Records committed so far
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ImportCheckpoint {self.source} @ {self.position}>"
+
+
+class UserDeletionJob(db.Model):
+    __tablename__ = 'user_deletion_jobs'
+    __table_args__ = (
+        # Serves the worker's search for pending and abandoned jobs
+        db.Index('ix_user_deletion_jobs_status', 'status'),
+    )
+
+    STATUSES = ('pending', 'running', 'done', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: the job outlives the user it deletes
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    requested_by = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    articles_deleted = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    # Process running the job, and when it last reported progress (stale means abandoned)
+    worker = db.Column(db.String(128))
+    heartbeat_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
 
     def to_dict(self):
-        """Convert article object to dictionary for JSON serialization"""
+        """Convert job to dictionary for JSON serialization"""
         return {
             'id': self.id,
-            'title': self.title,
-            'content': self.content,
+            'user_id': self.user_id,
+            'requested_by': self.requested_by,
+            'status': self.status,
+            'articles_deleted': self.articles_deleted,
+            'error': self.error,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'user_id': self.user_id,
-            'is_published': self.is_published
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
         }
 
     def __repr__(self):
-        return f"<Article {self.title}>"
\ No newline at end of file
+        return f"<UserDeletionJob {self.id} user {self.user_id} {self.status}>"
+
+
+class ReplicationHeartbeat(db.Model):
+    __tablename__ = 'replication_heartbeat'
+
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last time the primary wrote it
+
+
+class PrincipalGeneration(db.Model):
+    __tablename__ = 'principal_generation'
+
+    id = db.Column(db.Integer, primary_key=True)  # Single row, id 1
+    # Bumped whenever a user changes, so every process drops its cached principals
+    generation = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ResponseCacheVersion(db.Model):
+    __tablename__ = 'response_cache_versions'
+
+    # A response cache namespace ("articles") or entry ("article:42")
+    name = db.Column(db.String(255), primary_key=True)
+    # Bumped on every invalidation, so every process stops serving what it cached before
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -1,36 +1,335 @@
-from flask import Blueprint, jsonify, request, g
+from collections import namedtuple
+from datetime import datetime
+from flask import Blueprint, jsonify, request, g, current_app
 from app.controllers.articleController import (
-    get_all_articles, get_article_by_id, create_article, update_article, delete_article
+    get_article_by_id, create_article, update_article, delete_article,
+    get_published_articles_page, get_article_meta, get_articles_by_user, bulk_apply_articles,
+    get_articles_by_ids, toggle_publish_status,
+    ARTICLE_NOT_FOUND, ACCESS_DENIED, ARTICLE_MODIFIED, ARTICLE_CONFLICT
 )
+from app.controllers.searchController import search_articles, search_supported
+from app.models import Article
 from app.controllers.userController import get_user_by_id
-from app.utils.auth import login_required, admin_required, check_resource_ownership
+from app.controllers.statsController import get_site_stats
+from app.utils.auth import (
+    login_required, admin_required, check_resource_ownership, optional_token_user_id, load_principal
+)
+from app.utils.dbRouting import read_replica
+from app.utils.pagination import (
+    parse_limit, encode_cursor, decode_cursor, encode_rank_cursor, decode_rank_cursor, next_page_link
+)
+from app.utils.fields import parse_fields, parse_batch_ids
+from app.utils.responseCache import response_cache
+from app.utils.conditional import (
+    resource_etag, is_not_modified, precondition_failed, with_validators, not_modified_response
+)
+
+
+def article_etag(article):
+    return resource_etag('article', article.id, article.updated_at)
+
+
+def article_validators(article, include=(), author_updated_at=None):
+    """
+    ETag and Last-Modified of an article representation. An embedded author
+    is part of the representation, so its updated_at feeds both validators.
+    """
+    if 'author' not in include:
+        return article_etag(article), article.updated_at
+    variant = f"author:{author_updated_at.isoformat() if author_updated_at else ''}"
+    etag = resource_etag('article', article.id, article.updated_at, variant)
+    last_modified = max(filter(None, (article.updated_at, author_updated_at)), default=None)
+    return etag, last_modified
+
+
+def json_body_response(body):
+    """Wrap an already serialized JSON body in a response"""
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+
+def set_next_page_headers(response, next_cursor):
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = next_page_link(request.base_url, request.args, next_cursor)
+    return response
+
+# Status of each reason an ownership-checked article write was not applied
+WRITE_ERROR_STATUS = {ARTICLE_NOT_FOUND: 404, ACCESS_DENIED: 403, ARTICLE_MODIFIED: 412, ARTICLE_CONFLICT: 409}
+
+
+def write_error_response(error):
+    return jsonify({'error': error}), WRITE_ERROR_STATUS[error]
+
+
+def checked_version(article_id):
+    """
+    For writes sent with If-Match: (updated_at the write must still find, error
+    response). Without If-Match there is nothing to read up front, (None, None).
+    """
+    if not request.if_match:
+        return None, None
+    meta = get_article_meta(article_id)
+    if not meta:
+        return None, write_error_response(ARTICLE_NOT_FOUND)
+    if not check_resource_ownership(meta.user_id, g.user):
+        return None, write_error_response(ACCESS_DENIED)
+    if precondition_failed(article_etag(meta)):
+        return None, write_error_response(ARTICLE_MODIFIED)
+    return meta.updated_at, None
+
+
+def visible_to(article, viewer):
+    """Published articles are public; drafts are shown to their owner and to admins"""
+    return article.is_published or (viewer is not None and check_resource_ownership(article.user_id, viewer))
+
+
+def batch_article_results(ids, articles, viewer, fields, include):
+    """
+    One entry per requested id, in request order: the article, or a 404
+    marker when it does not exist or is a draft the viewer may not see
+    (the same rule as GET /api/articles/<id>).
+    """
+    by_id = {article.id: article for article in articles}
+    results = []
+    for article_id in ids:
+        article = by_id.get(article_id)
+        if article and visible_to(article, viewer):
+            results.append(article.to_dict(fields, include))
+        else:
+            results.append({'id': article_id, 'status': 404, 'error': 'Article not found'})
+    return results
+
+def drafts_viewer_id(articles):
+    """
+    User id of the optional bearer token when some of articles are drafts,
+    whose visibility depends on the viewer; None otherwise, so requests for
+    published articles never decode the token.
+    """
+    if any(not article.is_published for article in articles):
+        return optional_token_user_id()
+    return None
+
+# Request parsing and response building of the article read handlers, shared
+# with their async versions in asyncRead.py so that only the queries differ
+
+def parse_include():
+    """?include= of the article read endpoints: (include, error_response)"""
+    include, error = parse_fields(request.args.get('include'), Article.INCLUDES, (), kind='include')
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    return include, None
+
+
+def parse_article_fields():
+    """?fields= (summary fields by default) and ?include=: (fields, include, error_response)"""
+    fields, error = parse_fields(request.args.get('fields'), Article.FIELDS, Article.SUMMARY_FIELDS)
+    if error:
+        return None, None, (jsonify({'error': error}), 400)
+    include, error_response = parse_include()
+    return fields, include, error_response
+
+
+# What get_articles loads: a page after cursor, or the articles in ids for the ?ids= form
+ArticlePage = namedtuple('ArticlePage', 'limit cursor fields include ids cache_key cache_version')
+
+
+def parse_articles_page():
+    """
+    Parse the query of GET /api/articles/. Returns (page, error_response);
+    page.cache_version is left to fill in before cached_articles_page()
+    (the ?ids= form is not cached).
+    """
+    limit, error = parse_limit(request.args.get('limit'))
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    fields, include, error_response = parse_article_fields()
+    if error_response:
+        return None, error_response
+    if 'ids' in request.args:
+        ids, error_response = parse_batch_ids(request.args['ids'])
+        if error_response:
+            return None, error_response
+        return ArticlePage(limit, None, fields, include, ids, None, None), None
+    raw_cursor = request.args.get('cursor', '')
+    cursor, error = decode_cursor(raw_cursor)
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    cache_key = f"{limit}:{raw_cursor}:{','.join(fields)}:{','.join(include)}"
+    return ArticlePage(limit, cursor, fields, include, None, cache_key, None), None
+
+
+def cached_articles_page(page):
+    """The cached response for page if it is still current at page.cache_version, else None"""
+    cached = response_cache.get('articles', page.cache_key, page.cache_version)
+    if not cached:
+        return None
+    meta, body = cached
+    return set_next_page_headers(json_body_response(body), meta['next_cursor'])
+
+
+def begin_articles_page():
+    """
+    Parse the query of GET /api/articles/ and look in the response cache.
+    Returns (page, response): response answers the request already (an
+    error or a cache hit), otherwise page says what to load.
+    """
+    page, error_response = parse_articles_page()
+    if error_response or page.ids is not None:
+        return page, error_response
+    page = page._replace(cache_version=response_cache.version('articles', page.cache_key))
+    return page, cached_articles_page(page)
+
+
+def articles_page_response(page, articles, has_more):
+    """Response for a loaded page of articles, stored in the response cache"""
+    next_cursor = None
+    if has_more:
+        last = articles[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    response = jsonify([article.to_dict(page.fields, page.include) for article in articles])
+    response_cache.set(
+        'articles', page.cache_key, response.get_data(as_text=True), page.cache_version, next_cursor=next_cursor
+    )
+    return set_next_page_headers(response, next_cursor)
+
+
+def articles_batch_response(page, articles, viewer):
+    """Response for the ?ids= form: up to BATCH_MAX_IDS articles, in request order"""
+    return jsonify(batch_article_results(page.ids, articles, viewer, page.fields, page.include))
+
+
+# What get_article loads, and where its response is cached
+ArticleRead = namedtuple('ArticleRead', 'article_id include namespace cache_version')
+
+
+def parse_article_read(article_id):
+    """
+    Parse the query of GET /api/articles/<id>. Returns (read, error_response);
+    read.cache_version is left to fill in before cached_article().
+    """
+    include, error_response = parse_include()
+    if error_response:
+        return None, error_response
+    # Representations embedding the author are cached apart, as author changes invalidate them
+    namespace = 'article-author' if include else 'article'
+    return ArticleRead(article_id, include, namespace, None), None
+
+
+def cached_article(read):
+    """The cached response (or 304) for read if it is still current at read.cache_version, else None"""
+    cached = response_cache.get(read.namespace, read.article_id, read.cache_version)
+    if not cached:
+        return None
+    meta, body = cached
+    last_modified = datetime.fromisoformat(meta['last_modified']) if meta['last_modified'] else None
+    if is_not_modified(meta['etag'], last_modified):
+        return not_modified_response(meta['etag'], last_modified)
+    return with_validators(json_body_response(body), meta['etag'], last_modified)
+
+
+def begin_article(article_id):
+    """
+    Parse the query of GET /api/articles/<id> and look in the response
+    cache. Returns (read, response) like begin_articles_page().
+    """
+    read, error_response = parse_article_read(article_id)
+    if error_response:
+        return None, error_response
+    # Published articles are served from the response cache when possible
+    read = read._replace(cache_version=response_cache.version(read.namespace, article_id))
+    return read, cached_article(read)
+
+
+def article_meta_response(read, meta, viewer):
+    """
+    Check visibility and freshness from an article's metadata before its
+    content is loaded: the 404 or 304 response, or None to go on.
+    """
+    if not meta or not visible_to(meta, viewer):
+        return jsonify({"error": "Article not found"}), 404
+    etag, last_modified = article_validators(meta, read.include, getattr(meta, 'author_updated_at', None))
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return None
+
+
+def article_response(read, meta, article):
+    """Response for a loaded article; published ones are stored in the response cache"""
+    if not article:
+        return jsonify({"error": "Article not found"}), 404
+    etag, last_modified = article_validators(article, read.include, getattr(meta, 'author_updated_at', None))
+    response = jsonify(article.to_dict(include=read.include))
+    if article.is_published:
+        response_cache.set(
+            read.namespace, read.article_id, response.get_data(as_text=True), read.cache_version, etag=etag,
+            last_modified=last_modified.isoformat() if last_modified else None
+        )
+    return with_validators(response, etag, last_modified)
 
 article_bp = Blueprint('article', __name__, url_prefix='/api/articles')
 
 # Get all articles
 @article_bp.route('/', methods=['GET'])
+@read_replica
 def get_articles():
-    """Get all published articles (public)"""
-    articles = get_all_articles()
-    # Filter to only show published articles for non-authenticated users
-    if not hasattr(g, 'user'):
-        articles = [article for article in articles if article.is_published]
-    return jsonify([article.to_dict() for article in articles])
+    """Get published articles, newest first, paginated with ?limit= and ?cursor= (public)"""
+    page, response = begin_articles_page()
+    if response:
+        return response
+    if page.ids is not None:
+        articles = get_articles_by_ids(page.ids, page.fields, page.include)
+        viewer_id = drafts_viewer_id(articles)
+        return articles_batch_response(page, articles, load_principal(viewer_id) if viewer_id else None)
+    articles, has_more = get_published_articles_page(page.limit, page.cursor, page.fields, page.include)
+    return articles_page_response(page, articles, has_more)
+
+# Full-text search over published articles
+@article_bp.route('/search', methods=['GET'])
+def search():
+    """Search published articles by title and content, best matches first (public)"""
+    if not search_supported():
+        return jsonify({'error': 'Search is not available on this database'}), 501
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    limit, error = parse_limit(request.args.get('limit'))
+    if error:
+        return jsonify({'error': error}), 400
+    cursor, error = decode_rank_cursor(request.args.get('cursor'))
+    if error:
+        return jsonify({'error': error}), 400
+    author_id = request.args.get('author')
+    if author_id is not None:
+        try:
+            author_id = int(author_id)
+        except ValueError:
+            return jsonify({'error': 'author must be a user id'}), 400
+
+    results, has_more = search_articles(query, limit, cursor, author_id=author_id)
+    next_cursor = None
+    if has_more:
+        last = results[-1]
+        next_cursor = encode_rank_cursor(last['rank'], last['id'])
+    for result in results:
+        for key in ('created_at', 'updated_at'):
+            result[key] = result[key].isoformat() if result[key] else None
+    return set_next_page_headers(jsonify(results), next_cursor)
 
 # Get an article by id
 @article_bp.route('/<int:article_id>', methods=['GET'])
+@read_replica
 def get_article(article_id):
-    """Get article by ID (public for published articles)"""
-    article = get_article_by_id(article_id)
-    if not article:
-        return jsonify({"error": "Article not found"}), 404
-    
-    # Check if user can access unpublished articles
-    if not article.is_published and (not hasattr(g, 'user') or 
-        not check_resource_ownership(article.user_id, g.user)):
-        return jsonify({"error": "Article not found"}), 404
-    
-    return jsonify(article.to_dict())
+    """Get article by ID (public for published articles), embedding the author with ?include=author"""
+    read, response = begin_article(article_id)
+    if response:
+        return response
+    meta = get_article_meta(article_id, read.include)
+    # This route is public, so a draft's owner or an admin is known only from an optional token
+    viewer_id = drafts_viewer_id([meta]) if meta else None
+    response = article_meta_response(read, meta, load_principal(viewer_id) if viewer_id else None)
+    if response:
+        return response
+    return article_response(read, meta, get_article_by_id(article_id, read.include))
 
 # Create an article
 @article_bp.route('/', methods=['POST'])
@@ -49,73 +348,95 @@ def create_new_article():
     article = create_article(title, content, user_id, is_published)
     return jsonify(article.to_dict()), 201
 
+# Apply many article changes at once
+@article_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_articles():
+    """Create, update and delete many articles in one transaction (owner or admin per item)"""
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    max_operations = current_app.config['BULK_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        return jsonify({'error': f'At most {max_operations} operations per request'}), 413
+
+    results, applied = bulk_apply_articles(operations, g.user, atomic=bool(data.get('atomic')))
+    return jsonify({'applied': applied, 'results': results}), 200 if applied else 409
+
 # Update an article
 @article_bp.route('/<int:article_id>', methods=['PUT'])
 @login_required
 def update_an_article(article_id):
     """Update article (owner or admin only)"""
-    article = get_article_by_id(article_id)
-    if not article:
-        return jsonify({'error': 'Article not found'}), 404
-    
-    # Check if user can update this article
-    if not check_resource_ownership(article.user_id, g.user):
-        return jsonify({'error': 'Access denied'}), 403
-    
+    # Reject the write if the client edited a stale version (If-Match)
+    expected_updated_at, error_response = checked_version(article_id)
+    if error_response:
+        return error_response
+
     data = request.get_json()
     title = data.get('title')
     content = data.get('content')
     is_published = data.get('is_published')
-    
-    article, error = update_article(article_id, title, content, is_published)
+
+    # Ownership is checked by the UPDATE itself
+    article, error = update_article(article_id, g.user, title, content, is_published, expected_updated_at)
     if error:
-        return jsonify({'error': error}), 404
-    return jsonify(article.to_dict())
+        return write_error_response(error)
+    return with_validators(jsonify(article.to_dict()), article_etag(article), article.updated_at)
 
 # Delete an article
 @article_bp.route('/<int:article_id>', methods=['DELETE'])
 @login_required
 def delete_an_article(article_id):
     """Delete article (owner or admin only)"""
-    article = get_article_by_id(article_id)
-    if not article:
-        return jsonify({'error': 'Article not found'}), 404
-    
-    # Check if user can delete this article
-    if not check_resource_ownership(article.user_id, g.user):
-        return jsonify({'error': 'Access denied'}), 403
-    
-    deleted = delete_article(article_id)
-    if not deleted:
-        return jsonify({'error': 'Article Not Found'}), 404
+    error = delete_article(article_id, g.user)
+    if error:
+        return write_error_response(error)
     return jsonify({'message': 'Article deleted'}), 200
 
 # Get user's articles
 @article_bp.route('/my-articles', methods=['GET'])
 @login_required
 def get_my_articles():
-    """Get current user's articles"""
-    articles = get_all_articles()
-    user_articles = [article for article in articles if article.user_id == g.user.id]
-    return jsonify([article.to_dict() for article in user_articles])
+    """Get current user's articles (summary fields unless ?fields= is given, ?include=author supported)"""
+    fields, include, error_response = parse_article_fields()
+    if error_response:
+        return error_response
+    articles = get_articles_by_user(g.user.id, fields, include)
+    return jsonify([article.to_dict(fields, include) for article in articles])
 
 # Publish/Unpublish article
 @article_bp.route('/<int:article_id>/publish', methods=['PUT'])
 @login_required
 def toggle_article_publish(article_id):
     """Toggle article publish status (owner or admin only)"""
-    article = get_article_by_id(article_id)
-    if not article:
-        return jsonify({'error': 'Article not found'}), 404
-    
-    # Check if user can modify this article
-    if not check_resource_ownership(article.user_id, g.user):
-        return jsonify({'error': 'Access denied'}), 403
-    
+    expected_updated_at, error_response = checked_version(article_id)
+    if error_response:
+        return error_response
+
     data = request.get_json()
-    is_published = data.get('is_published', not article.is_published)
-    
-    article, error = update_article(article_id, is_published=is_published)
+    is_published = data.get('is_published')
+    if is_published is None:
+        article, error = toggle_publish_status(article_id, g.user, expected_updated_at)
+    else:
+        article, error = update_article(
+            article_id, g.user, is_published=is_published, expected_updated_at=expected_updated_at
+        )
     if error:
-        return jsonify({'error': error}), 404
-    return jsonify(article.to_dict())
\ No newline at end of file
+        return write_error_response(error)
+    return with_validators(jsonify(article.to_dict()), article_etag(article), article.updated_at)
+
+# Response cache statistics
+@article_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Get hit/miss/eviction counters of the public article response cache (admin only)"""
+    return jsonify(response_cache.stats())
+
+# Article statistics
+@article_bp.route('/stats', methods=['GET'])
+@read_replica
+def get_article_stats():
+    """Get site wide article and active user counts (public), read from maintained counters"""
+    return jsonify(get_site_stats())
@@ -0,0 +1,112 @@
+from flask import jsonify, g
+from app.controllers import asyncArticleController, asyncUserController
+from app.routes.article import (
+    parse_articles_page, cached_articles_page, articles_page_response, articles_batch_response,
+    parse_article_read, cached_article, article_meta_response, article_response, parse_article_fields,
+    drafts_viewer_id
+)
+from app.routes.user import conditional_user_response
+from app.utils.asyncDb import async_db
+from app.utils.auth import login_required, admin_required, check_resource_ownership, load_principal_async
+from app.utils.dbRouting import read_replica
+from app.utils.responseCache import response_cache, DatabaseVersions
+
+# Async versions of the article and user read handlers, installed by create_app in
+# ASYNC_MODE under the endpoints of the sync handlers they replace
+
+
+async def cache_version(namespace, key):
+    """response_cache.version() that reads counters kept in the database through async_db"""
+    if isinstance(response_cache.versions, DatabaseVersions):
+        return await async_db.run(
+            asyncArticleController.get_cache_versions, response_cache.version_names(namespace, key), primary=True
+        )
+    return response_cache.version(namespace, key)
+
+
+@read_replica
+async def get_articles():
+    """Get published articles, newest first, paginated with ?limit= and ?cursor= (public)"""
+    page, response = parse_articles_page()
+    if response:
+        return response
+    if page.ids is not None:
+        articles = await async_db.run(asyncArticleController.get_articles_by_ids, page.ids, page.fields, page.include)
+        viewer_id = drafts_viewer_id(articles)
+        return articles_batch_response(page, articles, await load_principal_async(viewer_id) if viewer_id else None)
+    page = page._replace(cache_version=await cache_version('articles', page.cache_key))
+    response = cached_articles_page(page)
+    if response:
+        return response
+    articles, has_more = await async_db.run(
+        asyncArticleController.get_published_articles_page, page.limit, page.cursor, page.fields, page.include
+    )
+    return articles_page_response(page, articles, has_more)
+
+
+@read_replica
+async def get_article(article_id):
+    """Get article by ID (public for published articles), embedding the author with ?include=author"""
+    read, response = parse_article_read(article_id)
+    if response:
+        return response
+    read = read._replace(cache_version=await cache_version(read.namespace, article_id))
+    response = cached_article(read)
+    if response:
+        return response
+    meta = await async_db.run(asyncArticleController.get_article_meta, article_id, read.include)
+    viewer_id = drafts_viewer_id([meta]) if meta else None
+    response = article_meta_response(read, meta, await load_principal_async(viewer_id) if viewer_id else None)
+    if response:
+        return response
+    return article_response(
+        read, meta, await async_db.run(asyncArticleController.get_article_by_id, article_id, read.include)
+    )
+
+
+@login_required
+async def get_my_articles():
+    """Get current user's articles (summary fields unless ?fields= is given, ?include=author supported)"""
+    fields, include, error_response = parse_article_fields()
+    if error_response:
+        return error_response
+    articles = await async_db.run(asyncArticleController.get_articles_by_user, g.user.id, fields, include)
+    return jsonify([article.to_dict(fields, include) for article in articles])
+
+
+@admin_required
+@read_replica
+async def get_users():
+    """Get all active users (admin only)"""
+    users = await async_db.run(asyncUserController.get_all_users)
+    return jsonify([user.to_dict() for user in users])
+
+
+@login_required
+async def get_user(user_id):
+    """Get user by ID (owner or admin only)"""
+    user = await async_db.run(asyncUserController.get_user_by_id, user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    if not check_resource_ownership(user_id, g.user):
+        return jsonify({'error': 'Access denied'}), 403
+    return conditional_user_response(user)
+
+
+@admin_required
+async def get_users_by_role_endpoint(role):
+    """Get users by role (admin only)"""
+    if role not in ['user', 'admin']:
+        return jsonify({'error': 'Invalid role. Must be "user" or "admin"'}), 400
+    users = await async_db.run(asyncUserController.get_users_by_role, role)
+    return jsonify([user.to_dict() for user in users])
+
+
+ASYNC_VIEWS = {
+    'article.get_articles': get_articles,
+    'article.get_article': get_article,
+    'article.get_my_articles': get_my_articles,
+    'user.get_users': get_users,
+    'user.get_user': get_user,
+    'user.get_users_by_role_endpoint': get_users_by_role_endpoint,
+}
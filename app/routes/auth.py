@@ -1,10 +1,14 @@
 from flask import Blueprint, jsonify, request
 from app.controllers.auth_controller import authenticate_user
 from app.controllers.userController import create_user
+from app.utils.rateLimit import limiter, configured_limit, login_key
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @auth_bp.route('/login', methods=['POST'])
+# Per client and account, on top of (not instead of) the blueprint's per-client limit,
+# so rotating the email between attempts does not escape throttling
+@limiter.limit(configured_limit('RATELIMIT_LOGIN'), key_func=login_key, override_defaults=False)
 def login():
     data = request.get_json()
     email = data.get('email')
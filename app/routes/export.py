@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from app.controllers.exportController import iter_export, EXPORT_COLUMNS
+from app.utils.auth import admin_required
+from app.utils.streaming import encode_records, parse_datetime_arg, EXPORT_FORMATS
+
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+# Stream a full export of articles or users
+@export_bp.route('/<kind>', methods=['GET'])
+@admin_required
+def export_records(kind):
+    """Stream every article or user as NDJSON or a JSON array (admin only)"""
+    if kind not in EXPORT_COLUMNS:
+        return jsonify({'error': 'Unknown export. Must be "articles" or "users"'}), 404
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Must be "ndjson" or "json"'}), 400
+    updated_since, error = parse_datetime_arg(request.args.get('updated_since'), 'updated_since')
+    if error:
+        return jsonify({'error': error}), 400
+    updated_until, error = parse_datetime_arg(request.args.get('updated_until'), 'updated_until')
+    if error:
+        return jsonify({'error': error}), 400
+
+    records = iter_export(kind, updated_since, updated_until)
+    return Response(
+        stream_with_context(encode_records(records, fmt)),
+        mimetype=MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename={kind}.{fmt}'}
+    )
@@ -0,0 +1,25 @@
+import hmac
+from flask import Blueprint, Response, request, jsonify, current_app
+from app.utils.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.before_request
+def require_scraper():
+    """
+    Serve metrics only to holders of METRICS_TOKEN or to the addresses in
+    METRICS_ALLOWED_IPS. request.remote_addr is the proxy's address behind a
+    reverse proxy, so only list addresses that reach the app directly.
+    """
+    if request.remote_addr in current_app.config['METRICS_ALLOWED_IPS']:
+        return None
+    token = current_app.config['METRICS_TOKEN']
+    auth_header = request.headers.get('Authorization', '')
+    if token and hmac.compare_digest(auth_header.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+        return None
+    return jsonify({'error': 'Access denied'}), 403
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose process metrics in the Prometheus text format"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
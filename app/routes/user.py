@@ -1,14 +1,59 @@
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, jsonify, request, g, url_for
 from app.controllers.userController import (
-    get_all_users, get_user_by_id, update_user, delete_user, hard_delete_user,
-    update_user_role, get_users_by_role
+    get_all_users, get_user_by_id, update_user, delete_user,
+    update_user_role, get_users_by_role, get_users_by_ids, USER_NOT_FOUND, USER_MODIFIED
 )
+from app.controllers.statsController import get_user_stats
+from app.controllers.userDeletionController import schedule_user_deletion, get_deletion_job
+from app.utils.deletionWorker import deletion_worker
 from app.utils.auth import login_required, admin_required, owner_required, check_resource_ownership
+from app.utils.dbRouting import read_replica
+from app.utils.fields import parse_batch_ids
+from app.utils.conditional import (
+    resource_etag, is_not_modified, precondition_failed, with_validators, not_modified_response
+)
+
+
+def user_etag(user):
+    return resource_etag('user', user.id, user.updated_at)
+
+
+def conditional_user_response(user):
+    """Serialize a user, or answer 304 when the client already has this version"""
+    etag = user_etag(user)
+    if is_not_modified(etag, user.updated_at):
+        return not_modified_response(etag, user.updated_at)
+    return with_validators(jsonify(user.to_dict()), etag, user.updated_at)
+
+# Status of each reason update_user did not apply
+UPDATE_ERROR_STATUS = {USER_NOT_FOUND: 404, USER_MODIFIED: 412}
+
+
+def checked_user_version(user_id):
+    """
+    For writes sent with If-Match: (updated_at the write must still find, error
+    response), checked against the stored row. Without If-Match, (None, None).
+    """
+    if not request.if_match:
+        return None, None
+    current = get_user_by_id(user_id)
+    if not current:
+        return None, (jsonify({'error': USER_NOT_FOUND}), 404)
+    if precondition_failed(user_etag(current)):
+        return None, (jsonify({'error': USER_MODIFIED}), 412)
+    return current.updated_at, None
+
+
+def updated_user_response(user, error):
+    if error:
+        return jsonify({'error': error}), UPDATE_ERROR_STATUS[error]
+    return with_validators(jsonify(user.to_dict()), user_etag(user), user.updated_at)
 
 user_bp = Blueprint('user', __name__, url_prefix='/api/users')
 
 @user_bp.route('/', methods=['GET'])
 @admin_required
+@read_replica
 def get_users():
     """Get all active users (admin only)"""
     users = get_all_users()
@@ -26,7 +71,39 @@ def get_user(user_id):
     if not check_resource_ownership(user_id, g.user):
         return jsonify({'error': 'Access denied'}), 403
     
-    return jsonify(user.to_dict())
+    return conditional_user_response(user)
+
+@user_bp.route('/batch', methods=['POST'])
+@login_required
+@read_replica
+def get_users_batch():
+    """Get many users by ID in one query, in request order (owner or admin per item)"""
+    data = request.get_json(silent=True)
+    ids, error_response = parse_batch_ids(data.get('ids') if isinstance(data, dict) else None)
+    if error_response:
+        return error_response
+
+    users = {user.id: user for user in get_users_by_ids(ids)}
+    results = []
+    for user_id in ids:
+        user = users.get(user_id)
+        if not user:
+            results.append({'id': user_id, 'status': 404, 'error': 'User not found'})
+        elif not check_resource_ownership(user_id, g.user):
+            results.append({'id': user_id, 'status': 403, 'error': 'Access denied'})
+        else:
+            results.append(user.to_dict())
+    return jsonify(results)
+
+@user_bp.route('/<int:user_id>/stats', methods=['GET'])
+@login_required
+def get_user_article_stats(user_id):
+    """Get a user's article counts, published and draft (owner or admin only)"""
+    if not get_user_by_id(user_id):
+        return jsonify({'error': 'User not found'}), 404
+    if not check_resource_ownership(user_id, g.user):
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(get_user_stats(user_id))
 
 @user_bp.route('/<int:user_id>', methods=['PUT'])
 @login_required
@@ -36,6 +113,11 @@ def update_a_user(user_id):
     if not check_resource_ownership(user_id, g.user):
         return jsonify({'error': 'Access denied'}), 403
     
+    # Reject the write if the client edited a stale version (If-Match)
+    expected_updated_at, error_response = checked_user_version(user_id)
+    if error_response:
+        return error_response
+
     data = request.get_json()
     username = data.get('username')
     email = data.get('email')
@@ -46,10 +128,7 @@ def update_a_user(user_id):
     if g.user.is_admin() and 'role' in data:
         role = data.get('role')
     
-    user = update_user(user_id, username, email, profile_image_url, role)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    return jsonify(user.to_dict())
+    return updated_user_response(*update_user(user_id, username, email, profile_image_url, role, expected_updated_at))
 
 @user_bp.route('/<int:user_id>', methods=['DELETE'])
 @admin_required
@@ -63,11 +142,23 @@ def delete_a_user(user_id):
 @user_bp.route('/<int:user_id>/hard-delete', methods=['DELETE'])
 @admin_required
 def hard_delete_a_user(user_id):
-    """Hard delete user (admin only)"""
-    deleted = hard_delete_user(user_id)
-    if not deleted:
+    """Permanently delete user and their articles in the background (admin only)"""
+    job = schedule_user_deletion(user_id, g.user.id)
+    if not job:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify({'message': 'User permanently deleted'}), 200
+    deletion_worker.wake()
+    response = jsonify({'message': 'User deletion scheduled', 'job': job.to_dict()})
+    response.headers['Location'] = url_for('user.get_user_deletion_job', job_id=job.id)
+    return response, 202
+
+@user_bp.route('/deletion-jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_user_deletion_job(job_id):
+    """Get the status and progress of a hard delete (admin only)"""
+    job = get_deletion_job(job_id)
+    if not job:
+        return jsonify({'error': 'Deletion job not found'}), 404
+    return jsonify(job.to_dict())
 
 @user_bp.route('/<int:user_id>/role', methods=['PUT'])
 @admin_required
@@ -98,18 +189,26 @@ def get_users_by_role_endpoint(role):
 @login_required
 def get_current_user_profile():
     """Get current user's profile"""
-    return jsonify(g.user.to_dict())
+    # g.user may be a principal cache snapshot, older than the row the validators describe
+    user = get_user_by_id(g.user.id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    return conditional_user_response(user)
 
 @user_bp.route('/profile', methods=['PUT'])
 @login_required
 def update_current_user_profile():
     """Update current user's profile"""
+    # Check If-Match against the stored row, not the possibly cached g.user
+    expected_updated_at, error_response = checked_user_version(g.user.id)
+    if error_response:
+        return error_response
+
     data = request.get_json()
     username = data.get('username')
     email = data.get('email')
     profile_image_url = data.get('profile_image_url')
     
-    user = update_user(g.user.id, username, email, profile_image_url)
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    return jsonify(user.to_dict())
\ No newline at end of file
+    return updated_user_response(
+        *update_user(g.user.id, username, email, profile_image_url, expected_updated_at=expected_updated_at)
+    )
\ No newline at end of file
@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import os
+import threading
+from flask import g
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from app.utils.dbRouting import replica_lag, REPLICA_BIND
+from app.utils.engine import engine_options, sqlite_pragmas, install_sqlite_pragmas
+from app.utils.metrics import instrument_engine
+
+PRIMARY_BIND = 'primary'
+
+# asyncio driver used for each backend in ASYNC_MODE
+ASYNC_DRIVERS = {
+    'sqlite': ('sqlite+aiosqlite', 'aiosqlite'),
+    'postgresql': ('postgresql+asyncpg', 'asyncpg'),
+    'mysql': ('mysql+aiomysql', 'aiomysql'),
+}
+
+
+def async_url(database_uri):
+    """Swap the driver of a database URL for its asyncio counterpart"""
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"ASYNC_MODE does not support {backend} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend][0])
+
+
+class AsyncDatabase:
+    """
+    Async engines and sessions for the read paths served in ASYNC_MODE.
+    Pooled asyncio connections belong to the event loop that opened them,
+    so the engines, every AsyncSession and the async views themselves run
+    on one long-running loop per process, driven by a background thread.
+    Request threads only wait for their view's task, and the in-flight
+    queries of all requests share a few pooled connections on that loop.
+    """
+
+    def __init__(self):
+        self.urls = {}
+        self.options = {}
+        self.pragmas = []
+        self.metrics = False
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.shutdown()
+        self.urls = {PRIMARY_BIND: async_url(app.config['SQLALCHEMY_DATABASE_URI'])}
+        if app.config.get('REPLICA_DATABASE_URL'):
+            self.urls[REPLICA_BIND] = async_url(app.config['REPLICA_DATABASE_URL'])
+        for url in self.urls.values():
+            try:
+                url.get_dialect().import_dbapi()
+            except ImportError as error:
+                package = ASYNC_DRIVERS[url.get_backend_name()][1]
+                raise RuntimeError(f"ASYNC_MODE needs the '{package}' package installed") from error
+        self.options = engine_options(app.config)
+        self.pragmas = sqlite_pragmas(app.config)
+        self.metrics = app.config.get('METRICS_ENABLED', False)
+        # Flask would otherwise start a thread and an event loop for every async view call
+        app.async_to_sync = self.async_to_sync
+
+    def async_to_sync(self, func):
+        """
+        Run an async view as a task on the engine loop and wait for it. The
+        task runs in a copy of the calling thread's context, so Flask's
+        request and g are available to it.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), self._get_loop()).result()
+        return wrapper
+
+    async def run(self, fn, *args, primary=False):
+        """
+        Await fn(session, *args) with a fresh AsyncSession on the engine loop.
+        Handlers marked @read_replica read from the replica while it is fresh,
+        unless primary is set.
+        """
+        bind = PRIMARY_BIND
+        if not primary and g.get('read_replica') and REPLICA_BIND in self.urls:
+            from app.models import db
+            if replica_lag.is_fresh(db.engines[REPLICA_BIND]):
+                bind = REPLICA_BIND
+                g.replica_read = True
+        loop = self._get_loop()
+        coroutine = self._run(bind, fn, args)
+        if asyncio.get_running_loop() is loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def shutdown(self):
+        """Dispose of the engines and stop the loop thread"""
+        with self._lock:
+            loop, engines = self._loop, list(self._engines.values())
+            if loop is not None and self._pid == os.getpid():
+                async def dispose():
+                    for engine in engines:
+                        await engine.dispose()
+                asyncio.run_coroutine_threadsafe(dispose(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                self._thread.join()
+                loop.close()
+            self._loop, self._thread, self._pid, self._engines = None, None, None, {}
+
+    async def _run(self, bind, fn, args):
+        async with AsyncSession(self._engine(bind), expire_on_commit=False) as session:
+            return await fn(session, *args)
+
+    def _engine(self, bind):
+        # Only ever called on the engine loop, so no locking is needed
+        engine = self._engines.get(bind)
+        if engine is None:
+            engine = create_async_engine(self.urls[bind], **self.options)
+            install_sqlite_pragmas(engine.sync_engine, self.pragmas)
+            if self.metrics:
+                instrument_engine(engine.sync_engine, bind)
+            self._engines[bind] = engine
+        return engine
+
+    def _get_loop(self):
+        # Started lazily and keyed by process id so that forked workers each run their own
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name='async-db', daemon=True)
+                    thread.start()
+                    self._loop, self._thread, self._pid, self._engines = loop, thread, os.getpid(), {}
+        return self._loop
+
+
+async_db = AsyncDatabase()
@@ -1,13 +1,82 @@
 import jwt
 import functools
+import inspect
 from flask import request, jsonify, g, current_app
 from app.controllers.userController import get_user_by_id
+from app.utils.principalCache import principal_cache, shared_generation
+
+def load_principal(user_id):
+    """
+    Resolve the user a token was issued to, serving it from the principal
+    cache when possible and falling back to the database.
+    """
+    if principal_cache.sync_due():
+        principal_cache.sync(shared_generation())
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    generation = principal_cache.generation
+    user = get_user_by_id(user_id)
+    if user:
+        principal_cache.set(user_id, user, generation)
+    return user
+
+async def load_principal_async(user_id):
+    """load_principal for async views: cache misses go through async_db"""
+    # Imported here so that sync deployments never load the asyncio engine modules
+    from app.controllers import asyncUserController
+    from app.utils.asyncDb import async_db
+    if principal_cache.sync_due():
+        principal_cache.sync(await async_db.run(asyncUserController.get_principal_generation, primary=True))
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    generation = principal_cache.generation
+    user = await async_db.run(asyncUserController.get_user_by_id, user_id)
+    if user:
+        principal_cache.set(user_id, user, generation)
+    return user
+
+def async_auth_required(f, admin=False):
+    """
+    login_required / admin_required for async views (ASYNC_MODE), so a
+    principal cache miss does not block on a synchronous query.
+    """
+    @functools.wraps(f)
+    async def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if auth_header is None:
+            return jsonify({'error': 'Token is missing'}), 401
+        try:
+            token = auth_header.split(" ")[1]
+        except IndexError:
+            return jsonify({'error': 'Invalid token format'}), 401
+        if not token:
+            return jsonify({'error': 'Token is missing'}), 401
+
+        try:
+            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token has expired'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'error': 'Invalid token'}), 401
+        current_user = await load_principal_async(data['user_id'])
+        if not current_user:
+            return jsonify({'error': 'Invalid token'}), 401
+        if admin and getattr(current_user, 'role', None) != 'admin':
+            return jsonify({'error': 'Admin privileges required'}), 403
+        g.user = current_user
+        return await f(*args, **kwargs)
+    return decorated_function
 
 def login_required(f):
     """
     Decorator to require authentication for protected routes.
     Extracts JWT token from Authorization header and validates it.
     """
+    if inspect.iscoroutinefunction(f):
+        return async_auth_required(f)
+
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         token = None
@@ -24,7 +93,7 @@ def login_required(f):
         
         try:
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = get_user_by_id(data['user_id'])
+            current_user = load_principal(data['user_id'])
             if not current_user:
                 return jsonify({'error': 'Invalid token'}), 401
             g.user = current_user
@@ -41,6 +110,9 @@ def admin_required(f):
     Decorator to require admin privileges for protected routes.
     Checks if the current user has admin role.
     """
+    if inspect.iscoroutinefunction(f):
+        return async_auth_required(f, admin=True)
+
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         # First ensure user is logged in
@@ -58,7 +130,7 @@ def admin_required(f):
         
         try:
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = get_user_by_id(data['user_id'])
+            current_user = load_principal(data['user_id'])
             if not current_user:
                 return jsonify({'error': 'Invalid token'}), 401
             
@@ -97,7 +169,7 @@ def owner_required(f):
         
         try:
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = get_user_by_id(data['user_id'])
+            current_user = load_principal(data['user_id'])
             if not current_user:
                 return jsonify({'error': 'Invalid token'}), 401
             
@@ -118,6 +190,24 @@ def owner_required(f):
         
     return decorated_function
 
+def optional_token_user_id():
+    """
+    User id carried by a valid bearer token, or None, for public endpoints
+    that show more to signed-in callers. A missing or invalid token reads
+    as anonymous rather than failing the request.
+    """
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+    parts = auth_header.split(" ")
+    if len(parts) < 2 or not parts[1]:
+        return None
+    try:
+        data = jwt.decode(parts[1], current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    return data.get('user_id')
+
 def get_current_user():
     """
     Helper function to get the current authenticated user from Flask's g object.
@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import threading
+from flask import request
+from app.utils.conditional import encoded_etag, matching_request_etag
+from app.utils.responseCache import LRUBackend
+
+# Bodies worth compressing; streamed exports are left alone whatever their type
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html')
+
+
+def _gzip_codec(level):
+    # mtime=0 keeps the output identical for identical bodies
+    return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli_codec(level):
+    try:
+        import brotli
+    except ImportError as error:
+        raise RuntimeError("COMPRESSION_ENCODINGS 'br' needs the 'brotli' package installed") from error
+    return lambda data: brotli.compress(data, quality=level)
+
+
+def _zstd_codec(level):
+    try:
+        import zstandard
+    except ImportError as error:
+        raise RuntimeError("COMPRESSION_ENCODINGS 'zstd' needs the 'zstandard' package installed") from error
+    # A ZstdCompressor must not be shared between threads
+    local = threading.local()
+
+    def compress(data):
+        compressor = getattr(local, 'compressor', None)
+        if compressor is None:
+            compressor = local.compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.compress(data)
+    return compress
+
+
+# Content codings by name: codec factory and the setting holding its level
+CODECS = {
+    'gzip': (_gzip_codec, 'COMPRESSION_GZIP_LEVEL'),
+    'br': (_brotli_codec, 'COMPRESSION_BROTLI_LEVEL'),
+    'zstd': (_zstd_codec, 'COMPRESSION_ZSTD_LEVEL'),
+}
+
+
+def build_codecs(config):
+    """Compression functions for COMPRESSION_ENCODINGS, in the server's order of preference"""
+    codecs = {}
+    for encoding in config.get('COMPRESSION_ENCODINGS', '').split(','):
+        encoding = encoding.strip()
+        if not encoding:
+            continue
+        if encoding not in CODECS:
+            raise ValueError(f"Unknown compression encoding: {encoding}")
+        factory, level_setting = CODECS[encoding]
+        codecs[encoding] = factory(config[level_setting])
+    return codecs
+
+
+class ResponseCompression:
+    """
+    Compresses response bodies with the best content coding the client
+    accepts (Accept-Encoding), as an after_request hook. Bodies of public
+    responses (anonymous GETs) are kept compressed in a per-process LRU
+    keyed by a digest of the body, so a payload the response cache keeps
+    serving is compressed once per coding rather than on every request.
+    """
+
+    def __init__(self):
+        self.codecs = {}
+        self.min_size = 1024
+        self.cache = None
+        self._reset_counters()
+
+    def init_app(self, app):
+        self.codecs = build_codecs(app.config)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', self.min_size)
+        max_bytes = app.config.get('COMPRESSION_CACHE_MAX_BYTES', 0)
+        self.cache = LRUBackend(max_bytes) if max_bytes else None
+        self._reset_counters()
+        if self.codecs:
+            app.after_request(self.compress_response)
+
+    def negotiate(self):
+        """Coding to use for the current request, or None for the identity body"""
+        best, best_quality = None, 0
+        for encoding in self.codecs:
+            quality = request.accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, encoding, body, shared=False):
+        """Compressed body, served from the cache for shared (public) bodies when possible"""
+        key = None
+        if shared and self.cache is not None:
+            key = f"{encoding}:{hashlib.sha1(body).hexdigest()}"
+            data = self.cache.get(key)
+            if data is not None:
+                self.cache_hits += 1
+                return data
+        data = self.codecs[encoding](body)
+        self.compressed += 1
+        if key is not None:
+            self.cache.set(key, data)
+        return data
+
+    def compress_response(self, response):
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+        if response.status_code == 304:
+            # Answer with the validator the client holds, which may be an encoded variant's
+            etag, weak = response.get_etag()
+            if etag:
+                response.set_etag(matching_request_etag(etag) or etag, weak)
+            return response
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        shared = request.method == 'GET' and 'Authorization' not in request.headers
+        data = self.compress(encoding, body, shared)
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            # Each coding is a different representation, so it needs its own ETag
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        return response
+
+    def stats(self):
+        return {
+            'encodings': list(self.codecs),
+            'compressed': self.compressed,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'cache_bytes': self.cache.size if self.cache is not None else 0,
+        }
+
+    def _reset_counters(self):
+        self.compressed = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+response_compression = ResponseCompression()
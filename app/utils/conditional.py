@@ -0,0 +1,72 @@
+import hashlib
+from flask import request, make_response
+
+
+def resource_etag(kind, resource_id, updated_at, variant=None):
+    """Build a strong ETag for a resource version from its id and updated_at"""
+    stamp = updated_at.isoformat() if updated_at else ''
+    raw = f"{kind}:{resource_id}:{stamp}:{variant or ''}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+
+# Content codings whose representations get the coding appended to their ETag
+CONTENT_CODINGS = ('gzip', 'br', 'zstd')
+
+
+def encoded_etag(etag, encoding):
+    """ETag of a compressed representation: the identity ETag with the coding appended"""
+    return f"{etag}-{encoding}"
+
+
+def _validates(tag, etag):
+    """True when a request tag names this resource version, whatever its content coding"""
+    base, _, coding = tag.rpartition('-')
+    return tag == etag or (base == etag and coding in CONTENT_CODINGS)
+
+
+def _etags_match(etags, etag, weak):
+    if etags.star_tag:
+        return True
+    return any(_validates(tag, etag) for tag in etags.as_set(include_weak=weak))
+
+
+def matching_request_etag(etag):
+    """The If-None-Match tag that validated this version, as the client sent it"""
+    for tag in request.if_none_match.as_set(include_weak=True):
+        if _validates(tag, etag):
+            return tag
+    return None
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Check the request's If-None-Match / If-Modified-Since headers against the
+    current validators. If-None-Match wins when both are sent (RFC 9110 13.2.2).
+    """
+    if request.if_none_match:
+        return _etags_match(request.if_none_match, etag, weak=True)
+    if request.if_modified_since and last_modified:
+        # HTTP dates only carry whole seconds
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def precondition_failed(etag):
+    """Check the request's If-Match header, True when it does not match the current ETag"""
+    if not request.if_match:
+        return False
+    return not _etags_match(request.if_match, etag, weak=False)
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach ETag and Last-Modified headers to a response"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    """Build an empty 304 response carrying the validators"""
+    response = make_response('', 304)
+    return with_validators(response, etag, last_modified)
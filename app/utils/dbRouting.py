@@ -0,0 +1,138 @@
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from flask import g, has_app_context, current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of handlers marked with @read_replica to the
+    replica bind. Flushes and INSERT/UPDATE/DELETE statements always go to
+    the primary, and once a request has written to the primary its later
+    reads stay there too (read-after-write).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause):
+        if not has_app_context() or not g.get('read_replica'):
+            return False
+        if self._flushing or isinstance(clause, UpdateBase):
+            g.wrote_primary = True
+            return False
+        if g.get('wrote_primary') or REPLICA_BIND not in self._db.engines:
+            return False
+        if not replica_lag.is_fresh(self._db.engines[REPLICA_BIND]):
+            return False
+        g.replica_read = True
+        return True
+
+
+class ReplicaLag:
+    """
+    Tracks how far the replica is behind, using the heartbeat row that the
+    primary writes and replication carries over. The measurement is cached
+    for REPLICA_LAG_CHECK_INTERVAL seconds per process.
+    """
+
+    def __init__(self):
+        self._checked_at = 0.0
+        self._fresh = False
+        self._lock = threading.Lock()
+
+    def is_fresh(self, engine):
+        max_lag = current_app.config.get('REPLICA_MAX_LAG', 5)
+        if not max_lag:
+            return True
+        interval = current_app.config.get('REPLICA_LAG_CHECK_INTERVAL', 1)
+        now = time.monotonic()
+        if now - self._checked_at < interval:
+            return self._fresh
+        with self._lock:
+            if now - self._checked_at >= interval:
+                lag = self.measure(engine)
+                self._fresh = lag is not None and lag <= max_lag
+                self._checked_at = now
+        return self._fresh
+
+    @staticmethod
+    def measure(engine):
+        """Seconds since the replica's last heartbeat, or None when unknown"""
+        try:
+            with engine.connect() as connection:
+                beat_at = connection.execute(
+                    text("SELECT beat_at FROM replication_heartbeat WHERE id = 1")
+                ).scalar()
+        except SQLAlchemyError:
+            return None
+        if beat_at is None:
+            return None
+        if isinstance(beat_at, str):
+            beat_at = datetime.fromisoformat(beat_at)
+        return (datetime.utcnow() - beat_at).total_seconds()
+
+    def reset(self):
+        self._checked_at = 0.0
+        self._fresh = False
+
+
+replica_lag = ReplicaLag()
+
+
+def read_replica(f):
+    """
+    Decorator marking a read-only route handler whose queries may be served
+    by the replica bind while it is within the configured staleness bound.
+    """
+    if inspect.iscoroutinefunction(f):
+        @functools.wraps(f)
+        async def async_decorated_function(*args, **kwargs):
+            g.read_replica = True
+            return await f(*args, **kwargs)
+        return async_decorated_function
+
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.read_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def read_from_replica():
+    """Whether the current request has read from the replica, so its results may lag the primary"""
+    return has_app_context() and bool(g.get('replica_read'))
+
+
+def write_heartbeat(session):
+    """Record the current time on the primary so replicas can report their lag"""
+    now = datetime.utcnow()
+    result = session.execute(text("UPDATE replication_heartbeat SET beat_at = :now WHERE id = 1"), {'now': now})
+    if result.rowcount == 0:
+        session.execute(text("INSERT INTO replication_heartbeat (id, beat_at) VALUES (1, :now)"), {'now': now})
+    session.commit()
+
+
+def sync_sqlite_replica(primary_engine, replica_engine):
+    """
+    Stand-in replicator for local setups: copy the primary SQLite database
+    into the replica file with the online backup API.
+    """
+    source = sqlite3.connect(primary_engine.url.database)
+    target = sqlite3.connect(replica_engine.url.database)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
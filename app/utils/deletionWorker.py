@@ -0,0 +1,65 @@
+import os
+import threading
+
+
+class DeletionWorker:
+    """
+    In-process background thread running user hard-delete jobs.
+    The user_deletion_jobs table is the queue: wake() signals that a job was
+    scheduled, and the thread also polls the table every poll_seconds, so
+    jobs left pending or abandoned by a process that died are resumed by
+    whichever worker process looks next. No external queue is needed.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self.shutdown()
+        self.app = app
+        # The CLI may run before the migrations that create the job table, and
+        # runs jobs itself with `manage.py deletion-jobs --run`
+        self.enabled = app.config.get('HARD_DELETE_WORKER', True) and not os.environ.get('FLASK_RUN_FROM_CLI')
+        if self.enabled:
+            self._wake = threading.Event()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._wake, self._stop), name='user-deletion', daemon=True
+            )
+            self._thread.start()
+
+    def wake(self):
+        """Have the thread look for jobs now rather than at its next poll"""
+        self._wake.set()
+
+    def shutdown(self, timeout=None):
+        """Stop the thread after its current chunk; an unfinished job is resumed later"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, wake, stop):
+        from app.controllers.userDeletionController import run_pending_deletions, worker_name
+        config = self.app.config
+        worker = worker_name()
+        while not stop.is_set():
+            wake.clear()
+            try:
+                with self.app.app_context():
+                    run_pending_deletions(
+                        worker, config['HARD_DELETE_CHUNK_SIZE'], config['HARD_DELETE_PAUSE_MS'] / 1000,
+                        config['HARD_DELETE_STALE_SECONDS'], stop
+                    )
+            except Exception:
+                # e.g. the job table is missing until migrations run; try again at the next poll
+                self.app.logger.exception("User deletion worker could not run pending jobs")
+            wake.wait(config['HARD_DELETE_POLL_SECONDS'])
+
+
+deletion_worker = DeletionWorker()
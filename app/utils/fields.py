@@ -0,0 +1,63 @@
+from flask import jsonify, current_app
+
+
+def parse_fields(raw_fields, allowed, default, kind='field'):
+    """
+    Parse a comma separated ?fields= (or ?include=) query parameter,
+    returning (fields, error). Falls back to default when the parameter is
+    absent or blank; a value naming no field at all is an error.
+    """
+    if raw_fields is None or raw_fields.strip() == '':
+        return tuple(default), None
+    fields = []
+    for field in raw_fields.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in allowed:
+            return None, f"Unknown {kind} '{field}'. Allowed {kind}s: {', '.join(allowed)}"
+        if field not in fields:
+            fields.append(field)
+    # Only separators (?fields=,): an empty selection would fall back to the full default fields
+    if not fields:
+        return None, f"No {kind} given. Allowed {kind}s: {', '.join(allowed)}"
+    return tuple(fields), None
+
+def _id_items(raw_ids):
+    """Items of an ids parameter: a comma separated string is split, anything else is returned as is"""
+    if isinstance(raw_ids, str):
+        return [part.strip() for part in raw_ids.split(',') if part.strip()]
+    return raw_ids
+
+def parse_ids(raw_ids):
+    """
+    Parse ids given as a comma separated string (?ids=1,2,3) or a JSON list,
+    returning (ids, error). Repeated ids are kept once, in first-seen order.
+    """
+    raw_ids = _id_items(raw_ids)
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return None, "ids must be a non-empty list of integers"
+    ids = {}
+    for raw_id in raw_ids:
+        if isinstance(raw_id, bool):
+            return None, "ids must be a non-empty list of integers"
+        try:
+            ids[int(raw_id)] = None
+        except (TypeError, ValueError):
+            return None, "ids must be a non-empty list of integers"
+    return list(ids), None
+
+def parse_batch_ids(raw_ids):
+    """
+    parse_ids for the batch endpoints, returning (ids, error_response) with
+    error_response None when the list is usable. Lists longer than
+    BATCH_MAX_IDS are rejected before their items are parsed.
+    """
+    raw_ids = _id_items(raw_ids)
+    max_ids = current_app.config['BATCH_MAX_IDS']
+    if isinstance(raw_ids, list) and len(raw_ids) > max_ids:
+        return None, (jsonify({'error': f'At most {max_ids} ids per request'}), 413)
+    ids, error = parse_ids(raw_ids)
+    if error:
+        return None, (jsonify({'error': error}), 400)
+    return ids, None
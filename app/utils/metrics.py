@@ -0,0 +1,299 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def render(self):
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {child.value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback  # Returns {label values tuple: value}, evaluated at scrape time
+
+    def render(self):
+        if self.callback:
+            for values, value in self.callback().items():
+                self.labels(*values).set(value)
+        return super().render()
+
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def render(self):
+        lines = self.header()
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), child.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                labels = _format_labels(self.labelnames, values, ('le', le))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by blueprint and endpoint',
+    ('blueprint', 'endpoint', 'method')
+))
+REQUESTS = registry.register(Counter(
+    'http_requests_total', 'Requests by endpoint and status code', ('blueprint', 'endpoint', 'method', 'status')
+))
+IN_FLIGHT = registry.register(Gauge('http_requests_in_flight', 'Requests currently being served'))
+REQUEST_SQL_STATEMENTS = registry.register(Histogram(
+    'http_request_sql_statements', 'SQL statements executed per request', ('blueprint', 'endpoint'),
+    buckets=SQL_COUNT_BUCKETS
+))
+REQUEST_SQL_SECONDS = registry.register(Histogram(
+    'http_request_sql_duration_seconds', 'Time spent in SQL per request', ('blueprint', 'endpoint')
+))
+SQL_STATEMENTS = registry.register(Counter('sql_statements_total', 'SQL statements executed', ('bind',)))
+SQL_SECONDS = registry.register(Counter('sql_duration_seconds_total', 'Time spent executing SQL', ('bind',)))
+BCRYPT_SECONDS = registry.register(Histogram(
+    'bcrypt_duration_seconds', 'Time spent hashing or verifying passwords', ('operation',),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+))
+
+
+def _pool_stats():
+    from app.models import db
+    stats = {}
+    for bind_key, engine in db.engines.items():
+        for state in ('size', 'checkedout', 'overflow', 'checkedin'):
+            method = getattr(engine.pool, state, None)
+            if method is not None:
+                stats[(bind_key or 'primary', state)] = method()
+    return stats
+
+
+def _response_cache_stats():
+    from app.utils.responseCache import response_cache
+    stats = response_cache.stats()
+    return {(key,): stats[key] or 0 for key in ('hits', 'misses', 'evictions', 'bytes')}
+
+
+DB_POOL = registry.register(Gauge(
+    'db_pool_connections', 'Connection pool usage by bind and state', ('bind', 'state'), callback=_pool_stats
+))
+RESPONSE_CACHE = registry.register(Gauge(
+    'response_cache', 'Public article response cache counters', ('stat',), callback=_response_cache_stats
+))
+
+
+class _RequestState:
+    __slots__ = ('started', 'sql_statements', 'sql_seconds')
+
+    def __init__(self, started):
+        self.started = started
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+
+
+# Per-request state lives in a context variable so the hot path avoids Flask's proxies
+_current_request = ContextVar('metrics_request', default=None)
+# Histogram children per (blueprint, endpoint, method), resolved once
+_endpoint_children = {}
+
+
+def _children_for(blueprint, endpoint, method):
+    key = (blueprint, endpoint, method)
+    children = _endpoint_children.get(key)
+    if children is None:
+        children = _endpoint_children.setdefault(key, (
+            REQUEST_LATENCY.labels(blueprint, endpoint, method),
+            REQUEST_SQL_STATEMENTS.labels(blueprint, endpoint),
+            REQUEST_SQL_SECONDS.labels(blueprint, endpoint),
+        ))
+    return children
+
+
+_IN_FLIGHT = IN_FLIGHT.labels()
+
+
+def _before_request():
+    _current_request.set(_RequestState(time.perf_counter()))
+    _IN_FLIGHT.inc()
+
+
+def _after_request(response):
+    state = _current_request.get()
+    if state is not None:
+        elapsed = time.perf_counter() - state.started
+        req = request._get_current_object()
+        blueprint = req.blueprint or ''
+        endpoint = req.endpoint or 'unmatched'
+        latency, sql_statements, sql_seconds = _children_for(blueprint, endpoint, req.method)
+        latency.observe(elapsed)
+        sql_statements.observe(state.sql_statements)
+        sql_seconds.observe(state.sql_seconds)
+        REQUESTS.labels(blueprint, endpoint, req.method, response.status_code).inc()
+    return response
+
+
+def _teardown_request(error=None):
+    if _current_request.get() is not None:
+        _current_request.set(None)
+        _IN_FLIGHT.dec()
+
+
+def instrument_engine(engine, bind_name):
+    """Count statements and SQL time on an engine, globally and per request"""
+    statements = SQL_STATEMENTS.labels(bind_name)
+    seconds = SQL_SECONDS.labels(bind_name)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+        statements.inc()
+        seconds.inc(elapsed)
+        state = _current_request.get()
+        if state is not None:
+            state.sql_statements += 1
+            state.sql_seconds += elapsed
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        started = context.connection.info.get('metrics_started') if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def install_metrics(app, db):
+    """
+    Install the request hooks and engine listeners. Must run before other
+    before_request hooks that may short-circuit (e.g. the rate limiter) so
+    every request is timed. Metrics are kept per process. The async engines
+    of ASYNC_MODE are created later, on their loop, and instrument
+    themselves (see asyncDb).
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            instrument_engine(engine, bind_key or 'primary')
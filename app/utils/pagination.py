@@ -0,0 +1,64 @@
+import base64
+import binascii
+from datetime import datetime
+from urllib.parse import urlencode
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse the ?limit= query parameter, returning (limit, error)"""
+    if raw_limit is None or raw_limit == '':
+        return default, None
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        return None, "limit must be an integer"
+    if limit < 1:
+        return None, "limit must be a positive integer"
+    return min(limit, maximum), None
+
+
+def _encode(key, row_id):
+    raw = f"{key}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode(cursor, parse_key):
+    if not cursor:
+        return None, None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        key, row_id = raw.rsplit('|', 1)
+        return (parse_key(key), int(row_id)), None
+    except (ValueError, UnicodeError, binascii.Error):
+        return None, "Invalid cursor"
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) keyset position as an opaque cursor string"""
+    return _encode(created_at.isoformat(), row_id)
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, returning ((created_at, id), error)"""
+    return _decode(cursor, datetime.fromisoformat)
+
+
+def encode_rank_cursor(rank, row_id):
+    """Encode a (search rank, id) keyset position as an opaque cursor string"""
+    return _encode(repr(float(rank)), row_id)
+
+
+def decode_rank_cursor(cursor):
+    """Decode a cursor produced by encode_rank_cursor, returning ((rank, id), error)"""
+    return _decode(cursor, float)
+
+
+def next_page_link(base_url, args, cursor):
+    """Build an RFC 8288 Link header value pointing at the next page"""
+    query = {key: value for key, value in args.items() if key != 'cursor'}
+    query['cursor'] = cursor
+    return f'<{base_url}?{urlencode(query)}>; rel="next"'
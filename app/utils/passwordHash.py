@@ -1,11 +1,150 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from app.utils.metrics import BCRYPT_SECONDS
 
-def hash_password(plain_password: str) -> str:
-    """Hash a password using bcrypt"""
-    hashed = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt())
+_HASH_SECONDS = BCRYPT_SECONDS.labels('hash')
+_VERIFY_SECONDS = BCRYPT_SECONDS.labels('verify')
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+class HashingPoolBusy(RuntimeError):
+    """Raised when the bcrypt pool already has as much work queued as it accepts"""
+
+
+class HashingPool:
+    """
+    Bounded worker pool for bcrypt work.
+    bcrypt releases the GIL while hashing, so a thread pool is enough to keep
+    the CPU-bound work off the request threads. At most workers + queue_size
+    jobs are admitted at once; anything beyond that is rejected with
+    HashingPoolBusy so the caller can shed load instead of piling up.
+    """
+
+    def __init__(self, workers=None, queue_size=None, rounds=DEFAULT_ROUNDS):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size if queue_size is not None else self.workers * 4
+        self.rounds = rounds
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.shutdown()
+        self.workers = app.config.get('BCRYPT_POOL_WORKERS') or os.cpu_count() or 1
+        queue_size = app.config.get('BCRYPT_POOL_QUEUE_SIZE')
+        self.queue_size = queue_size if queue_size is not None else self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+        target_ms = app.config.get('BCRYPT_TARGET_MS')
+        if target_ms:
+            self.rounds = calibrate_rounds(target_ms)
+        else:
+            self.rounds = app.config.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS)
+        app.config['BCRYPT_ROUNDS'] = self.rounds
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy("Password hashing capacity exceeded")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _get_executor(self):
+        # Created lazily so that forked server workers each start their own threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='bcrypt'
+                    )
+        return self._executor
+
+
+hashing_pool = HashingPool()
+
+
+def _hash(plain_password: str, rounds: int) -> str:
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt(rounds))
+    _HASH_SECONDS.observe(time.perf_counter() - start)
     return hashed.decode('utf-8')
 
 
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    start = time.perf_counter()
+    result = bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    _VERIFY_SECONDS.observe(time.perf_counter() - start)
+    return result
+
+
+def hash_password(plain_password: str) -> str:
+    """Hash a password using bcrypt at the configured work factor"""
+    return hashing_pool.run(_hash, plain_password, hashing_pool.rounds)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hashed password"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'),hashed_password.encode('utf-8'))
\ No newline at end of file
+    return hashing_pool.run(_verify, plain_password, hashed_password)
+
+
+def hash_password_batch(plain_passwords, executor=None, rounds=None):
+    """
+    Hash many passwords at once, spread over executor (e.g. a
+    ProcessPoolExecutor for bulk imports) or serially when none is given.
+    """
+    rounds = rounds or hashing_pool.rounds
+    if executor is None:
+        return [_hash(password, rounds) for password in plain_passwords]
+    chunksize = max(1, len(plain_passwords) // 64)
+    return list(executor.map(_hash, plain_passwords, [rounds] * len(plain_passwords), chunksize=chunksize))
+
+
+def hash_rounds(hashed_password: str) -> int:
+    """Return the work factor encoded in a bcrypt hash ($2b$<rounds>$...)"""
+    return int(hashed_password.split('$')[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check if a stored hash was made with a lower work factor than the current
+    one. Hashes are only ever upgraded: with BCRYPT_TARGET_MS each process
+    calibrates its own factor, and workers that settle on different values
+    must not rewrite each other's hashes on every login.
+    """
+    try:
+        return hash_rounds(hashed_password) < hashing_pool.rounds
+    except (IndexError, ValueError):
+        return True
+
+
+def calibrate_rounds(target_ms, minimum=MIN_ROUNDS, maximum=MAX_ROUNDS):
+    """
+    Pick the largest work factor whose hash time stays within target_ms.
+    Each extra round doubles the cost, so one timed hash at the minimum
+    factor is enough to extrapolate.
+    """
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(minimum))
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.001)
+    if elapsed_ms >= target_ms:
+        return minimum
+    extra = int(math.floor(math.log2(target_ms / elapsed_ms)))
+    return max(minimum, min(maximum, minimum + extra))
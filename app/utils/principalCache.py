@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect, text
+from app.models import db, User
+
+# The row every process shares; a missing row reads as generation 0
+SHARED_GENERATION_QUERY = text("SELECT generation FROM principal_generation WHERE id = 1")
+
+
+class PrincipalCache:
+    """
+    Bounded TTL/LRU cache of authenticated users keyed by user id.
+    Entries are detached copies of the User row, so they never trigger lazy
+    loads or leak state between request sessions, and leave out the
+    password hash. Writers must call invalidate() after committing a change
+    to a user. Besides dropping the local entry, that bumps the shared
+    principal_generation row in the database; every process compares it
+    with the value it last saw at most every sync_interval seconds (see
+    sync_due()) and empties its cache when another worker changed a user.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30, sync_interval=1):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._shared_generation = None
+        self._synced_at = 0.0
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('PRINCIPAL_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('PRINCIPAL_CACHE_TTL', self.ttl)
+        self.sync_interval = app.config.get('PRINCIPAL_CACHE_SYNC_INTERVAL', self.sync_interval)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    @property
+    def generation(self):
+        """Counter bumped on every invalidation, used to reject racing set() calls"""
+        return self._generation
+
+    def sync_due(self):
+        """Whether the shared generation should be read (and passed to sync()) before the next get()"""
+        return self.enabled and time.monotonic() - self._synced_at >= self.sync_interval
+
+    def sync(self, shared_generation):
+        """Empty the cache if the shared generation moved since the last sync"""
+        with self._lock:
+            if shared_generation != self._shared_generation:
+                self._generation += 1
+                self._entries.clear()
+                self._shared_generation = shared_generation
+            self._synced_at = time.monotonic()
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user, generation):
+        """Cache a copy of user unless an invalidation happened since generation was read"""
+        if not self.enabled:
+            return
+        snapshot = _snapshot(user)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+        bump_shared_generation()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._shared_generation = None
+            self._synced_at = 0.0
+
+
+def shared_generation():
+    """Current value of the shared generation, read from the primary"""
+    with db.engine.connect() as connection:
+        return connection.execute(SHARED_GENERATION_QUERY).scalar() or 0
+
+
+def bump_shared_generation():
+    """Tell the principal caches of every process to drop their entries"""
+    with db.engine.begin() as connection:
+        bumped = connection.execute(
+            text("UPDATE principal_generation SET generation = generation + 1 WHERE id = 1")
+        ).rowcount
+        if not bumped:
+            connection.execute(text("INSERT INTO principal_generation (id, generation) VALUES (1, 1)"))
+
+
+def _snapshot(user):
+    """Copy the column values of a User, except the password hash, into a new, session-less instance"""
+    values = {
+        attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs if attr.key != 'password_hash'
+    }
+    return User(**values)
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,25 @@
+import functools
+from flask import current_app, request
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from app.utils import rateLimitStorage  # noqa: F401  Registers the sqlite:// storage scheme
+
+limiter = Limiter(key_func=get_remote_address)
+
+
+@functools.lru_cache(maxsize=None)
+def configured_limit(name):
+    """
+    Return a callable reading a limit string from config at request time.
+    The same callable is returned for a setting, so limits that create_app()
+    applies again to a blueprint (several apps in one process) compare equal
+    and are counted once.
+    """
+    return lambda: current_app.config[name]
+
+
+def login_key():
+    """Key login attempts by client address and target account"""
+    data = request.get_json(silent=True) or {}
+    email = str(data.get('email', '')).strip().lower()
+    return f"{get_remote_address()}:{email}"
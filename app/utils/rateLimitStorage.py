@@ -0,0 +1,146 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS rate_limits ("
+    "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+)
+
+# Atomically add to a counter, restarting it when the stored one has expired
+INCR_SQL = (
+    "INSERT INTO rate_limits (key, value, expires_at) VALUES (:key, :amount, :expires_at) "
+    "ON CONFLICT(key) DO UPDATE SET "
+    "value = CASE WHEN rate_limits.expires_at <= :now THEN :amount ELSE rate_limits.value + :amount END, "
+    "expires_at = CASE WHEN rate_limits.expires_at <= :now THEN :expires_at ELSE rate_limits.expires_at END "
+    "RETURNING value"
+)
+
+# Fraction of writes that also purge expired counters
+CLEANUP_PROBABILITY = 0.01
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit storage in a local SQLite file, shared by every worker process
+    on the host without running a separate server.
+    Registered for ``sqlite:///path/to/file.db`` storage URIs. Each process
+    and thread keeps its own connection in WAL mode; counters are updated
+    with single upsert statements, and sliding window acquisition runs in an
+    IMMEDIATE transaction so concurrent workers cannot overshoot the limit.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        self.path = uri.split("://", 1)[1][1:] if "://" in uri else uri
+        self.busy_timeout = int(options.get("busy_timeout", 5000))
+        self._local = threading.local()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().execute(SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # Connections must not cross a fork, so they are keyed by process id too
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # Counters do not need to survive a power loss
+            connection.execute(f"PRAGMA busy_timeout={self.busy_timeout}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _incr(self, connection, key, expiry, amount, now):
+        value = connection.execute(
+            INCR_SQL, {"key": key, "amount": amount, "expires_at": now + expiry, "now": now}
+        ).fetchone()[0]
+        if random.random() < CLEANUP_PROBABILITY:
+            connection.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return value
+
+    def _get(self, connection, key, now):
+        row = connection.execute(
+            "SELECT value, expires_at FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return 0, None
+        return row[0], row[1]
+
+    def incr(self, key, expiry, amount=1):
+        return self._incr(self._connection(), key, expiry, amount, time.time())
+
+    def get(self, key):
+        return self._get(self._connection(), key, time.time())[0]
+
+    def get_expiry(self, key):
+        now = time.time()
+        expires_at = self._get(self._connection(), key, now)[1]
+        return expires_at if expires_at is not None else now
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        cursor = self._connection().execute("DELETE FROM rate_limits")
+        return cursor.rowcount
+
+    def clear(self, key):
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        connection = self._connection()
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            previous_count, previous_ttl, current_count, _ = self._sliding_window_info(
+                connection, previous_key, current_key, expiry, now
+            )
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            if int(weighted_count) + amount > limit:
+                connection.execute("COMMIT")
+                return False
+            self._incr(connection, current_key, 2 * expiry, amount, now)
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window_info(self._connection(), previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._connection().execute(
+            "DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key)
+        )
+
+    def _sliding_window_info(self, connection, previous_key, current_key, expiry, now):
+        previous_count = self._get(connection, previous_key, now)[0]
+        current_count = self._get(connection, current_key, now)[0]
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
@@ -0,0 +1,349 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+from app.models import db
+from app.utils.dbRouting import read_from_replica
+
+# Invalidation counters every process shares; a missing row reads as version 0
+SHARED_VERSIONS_QUERY = text(
+    "SELECT name, version FROM response_cache_versions WHERE name IN :names"
+).bindparams(bindparam('names', expanding=True))
+
+
+class LRUBackend:
+    """
+    In-process LRU store capped by the total size of the cached values.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+
+class LocalSharedStore:
+    """
+    Minimal stand-in for a Redis client (get/set/delete/incr), used for
+    tests and single-host setups without a cache server.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._values.pop(key, None) is not None)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._values.get(key, (0, None))
+            value = int(value) + 1
+            self._values[key] = (value, expires_at)
+            return value
+
+    def flushdb(self):
+        with self._lock:
+            self._values.clear()
+
+
+class SharedBackend:
+    """
+    Store backed by a Redis-compatible client so every worker sees the same
+    entries and invalidations.
+    """
+
+    evictions = 0  # Evictions happen inside the shared server
+
+    def __init__(self, client, shared=True):
+        self.client = client
+        # False for the in-process stand-in, whose entries and counters no other worker sees
+        self.shared = shared
+
+    def get(self, key):
+        value = self.client.get(key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def incr(self, key):
+        return int(self.client.incr(key))
+
+    def get_counter(self, key):
+        return int(self.client.get(key) or 0)
+
+    def clear(self):
+        self.client.flushdb()
+
+    @property
+    def size(self):
+        return None
+
+
+def create_backend(config):
+    """Build the cache backend selected by RESPONSE_CACHE_BACKEND"""
+    kind = config.get('RESPONSE_CACHE_BACKEND', 'lru')
+    if kind == 'lru':
+        return LRUBackend(config.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    if kind == 'shared':
+        url = config.get('RESPONSE_CACHE_URL', 'memory://')
+        if url.startswith('memory://'):
+            return SharedBackend(LocalSharedStore(), shared=False)
+        try:
+            import redis
+        except ImportError as error:
+            raise RuntimeError("RESPONSE_CACHE_URL needs the 'redis' package installed") from error
+        return SharedBackend(redis.Redis.from_url(url))
+    if kind == 'none':
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {kind}")
+
+
+def versions_in_order(names, rows):
+    """The versions of names, in order, from the (name, version) rows SHARED_VERSIONS_QUERY returned"""
+    versions = dict(rows)
+    return [versions.get(name, 0) for name in names]
+
+
+class DatabaseVersions:
+    """
+    Invalidation counters kept in the response_cache_versions table of the
+    primary database, for backends whose contents only one process sees.
+    """
+
+    def get(self, names):
+        with db.engine.connect() as connection:
+            return versions_in_order(names, connection.execute(SHARED_VERSIONS_QUERY, {'names': names}).all())
+
+    def incr(self, name):
+        for _ in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    bumped = connection.execute(
+                        text("UPDATE response_cache_versions SET version = version + 1 WHERE name = :name"),
+                        {'name': name}
+                    ).rowcount
+                    if not bumped:
+                        connection.execute(
+                            text("INSERT INTO response_cache_versions (name, version) VALUES (:name, 1)"),
+                            {'name': name}
+                        )
+                return
+            except IntegrityError:
+                continue  # Another process created the row first; bump it instead
+
+
+class BackendVersions:
+    """
+    Invalidation counters kept next to the entries in a shared backend.
+    """
+
+    def __init__(self, backend, prefix='rc'):
+        self.backend = backend
+        self.prefix = prefix
+
+    def get(self, names):
+        return [self.backend.get_counter(f"{self.prefix}:ver:{name}") for name in names]
+
+    def incr(self, name):
+        self.backend.incr(f"{self.prefix}:ver:{name}")
+
+
+def create_versions(backend, prefix='rc'):
+    """Where the invalidation counters of a backend live: in it if every worker shares it, else in the database"""
+    if backend is None:
+        return None
+    if getattr(backend, 'shared', False):
+        return BackendVersions(backend, prefix)
+    return DatabaseVersions()
+
+
+class ResponseCache:
+    """
+    Cache of serialized public responses.
+    Entries live in namespaces and are invalidated through version counters:
+    invalidate() bumps the counter of one entry, invalidate_namespace() the
+    counter of the whole namespace. Readers take version() once, before
+    looking in the cache and querying; set() stores it with the entry and
+    get() only returns entries stored at that version, so a body read before
+    a write is never served after that write's invalidation, and outdated
+    entries age out of the backend. Responses of requests that read from the
+    replica may lag the primary by up to replica_max_lag seconds, so they
+    are cached for at most that long (and not at all when the lag is
+    unbounded).
+
+    The counters must be seen by every worker. With a shared backend they
+    live in it; with the per-process LRU backend (or the "memory://"
+    stand-in) they live in the response_cache_versions table of the primary,
+    which costs a read one small query but keeps the other workers from
+    serving a body that was changed, unpublished or deleted elsewhere.
+    """
+
+    def __init__(self, backend=None, ttl=300, prefix='rc', versions=None, replica_max_lag=5):
+        self.backend = backend
+        self.versions = versions or create_versions(backend, prefix)
+        self.ttl = ttl
+        self.replica_max_lag = replica_max_lag
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.backend = create_backend(app.config)
+        self.versions = create_versions(self.backend, self.prefix)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.replica_max_lag = app.config.get('REPLICA_MAX_LAG', self.replica_max_lag)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get(self, namespace, key, version):
+        """Return (meta, body) for a response cached at version (as read by version()), or None"""
+        if not self.enabled:
+            return None
+        raw = self.backend.get(self._key(namespace, key))
+        if raw is not None:
+            stored_version, meta, body = raw.split('\n', 2)
+            # Otherwise written before an invalidation, in this worker or another one
+            if json.loads(stored_version) == version:
+                self.hits += 1
+                return json.loads(meta), body
+        self.misses += 1
+        return None
+
+    def version(self, namespace, key):
+        """Invalidation counters of an entry, to read once per request before get() and the query"""
+        if not self.enabled:
+            return None
+        return self.versions.get(self.version_names(namespace, key))
+
+    def version_names(self, namespace, key):
+        """Names of the counters version() reads: the namespace's and the entry's"""
+        return [namespace, f"{namespace}:{key}"]
+
+    def set(self, namespace, key, body, version, **meta):
+        """Cache a response along with the version that was read before building it"""
+        if not self.enabled:
+            return
+        ttl = self.ttl
+        if read_from_replica():
+            # The body may predate a write whose invalidation already happened; kept for the
+            # whole TTL it would outlive REPLICA_MAX_LAG, so it may only be as stale as the replica
+            if not self.replica_max_lag:
+                return
+            ttl = min(ttl, math.ceil(self.replica_max_lag))
+        raw = '\n'.join((json.dumps(version), json.dumps(meta, separators=(',', ':')), body))
+        self.backend.set(self._key(namespace, key), raw, ttl)
+
+    def invalidate(self, namespace, key):
+        if self.enabled:
+            self.versions.incr(f"{namespace}:{key}")
+            self.backend.delete(self._key(namespace, key))
+
+    def invalidate_namespace(self, namespace):
+        if self.enabled:
+            self.versions.incr(namespace)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__ if self.enabled else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions if self.enabled else 0,
+            'bytes': self.backend.size if self.enabled else 0,
+        }
+
+    def _key(self, namespace, key):
+        return f"{self.prefix}:{namespace}:{key}"
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,49 @@
+import functools
+import os
+import re
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+SCHEMA_STARTUP_MODES = ('create', 'verify', 'off')
+
+_REVISION = re.compile(r"^(revision|down_revision)\s*=\s*(.+)$", re.MULTILINE)
+_REVISION_ID = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+@functools.lru_cache(maxsize=None)
+def migration_head(versions_dir):
+    """
+    Head revision of the Alembic scripts in versions_dir, read from their
+    revision identifiers without importing Alembic or running the scripts.
+    """
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith('.py') or name.startswith('__'):
+            continue
+        with open(os.path.join(versions_dir, name), encoding='utf-8') as script:
+            for key, value in _REVISION.findall(script.read()):
+                ids = _REVISION_ID.findall(value)
+                (revisions if key == 'revision' else parents).update(ids)
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected one migration head in {versions_dir}, found {sorted(heads) or 'none'}")
+    return heads.pop()
+
+
+def verify_schema(engine, versions_dir):
+    """
+    Check with a single query that the database is at the migration head.
+    Raises RuntimeError naming both revisions when it is not.
+    """
+    head = migration_head(versions_dir)
+    try:
+        with engine.connect() as connection:
+            current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        current = None
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'} but the migrations head is {head}; "
+            "run the migrations (alembic upgrade head) before starting the app"
+        )
+    return head
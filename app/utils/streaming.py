@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+
+CHUNK_SIZE = 64 * 1024
+EXPORT_FORMATS = ('ndjson', 'json')
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(record):
+    return json.dumps(record, default=_default, separators=(',', ':'))
+
+
+def encode_records(records, fmt='ndjson', chunk_size=CHUNK_SIZE):
+    """
+    Encode an iterable of dicts as NDJSON or as a JSON array, yielding text
+    chunks of roughly chunk_size characters so only one chunk is held at a time.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    buffer = []
+    size = 0
+    if fmt == 'json':
+        buffer.append('[')
+    first = True
+    for record in records:
+        if fmt == 'ndjson':
+            piece = _dumps(record) + '\n'
+        else:
+            piece = ('' if first else ',\n') + _dumps(record)
+        first = False
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if fmt == 'json':
+        buffer.append(']\n')
+    if buffer:
+        yield ''.join(buffer)
+
+
+def parse_datetime_arg(raw_value, name):
+    """Parse an optional ISO 8601 query parameter, returning (datetime, error)"""
+    if not raw_value:
+        return None, None
+    try:
+        value = datetime.fromisoformat(raw_value)
+    except ValueError:
+        return None, f"{name} must be an ISO 8601 datetime"
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value, None
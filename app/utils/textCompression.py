@@ -0,0 +1,132 @@
+import threading
+import zlib
+from sqlalchemy import Text, event
+from sqlalchemy.types import TypeDecorator
+
+# First byte of a compressed value, naming the codec that wrote it
+CODEC_TAGS = {'zlib': b'\x01', 'zstd': b'\x02'}
+
+_zstd = threading.local()
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as error:
+        raise RuntimeError("ARTICLE_COMPRESSION 'zstd' needs the 'zstandard' package installed") from error
+    return zstandard
+
+
+def _zlib_compress(level):
+    return lambda data: zlib.compress(data, level)
+
+
+def _zstd_compress(level):
+    zstandard = _zstandard()
+
+    # A ZstdCompressor must not be shared between threads
+    def compress(data):
+        compressor = getattr(_zstd, 'compressor', None)
+        if compressor is None:
+            compressor = _zstd.compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.compress(data)
+    return compress
+
+
+def _zstd_decompress(data):
+    decompressor = getattr(_zstd, 'decompressor', None)
+    if decompressor is None:
+        decompressor = _zstd.decompressor = _zstandard().ZstdDecompressor()
+    return decompressor.decompress(data)
+
+
+# Storage codecs by name: compressor factory (taking the level) and decompressor
+CODECS = {
+    'zlib': (_zlib_compress, zlib.decompress),
+    'zstd': (_zstd_compress, _zstd_decompress),
+}
+_DECOMPRESSORS = {CODEC_TAGS[name]: decompress for name, (_, decompress) in CODECS.items()}
+
+
+def decompress_text(value):
+    """Text of a stored value: plain text is returned as is, a compressed blob is expanded"""
+    if not isinstance(value, bytes):
+        return value
+    decompress = _DECOMPRESSORS.get(value[:1])
+    if decompress is None:
+        raise ValueError("Stored text has an unknown compression tag")
+    return decompress(value[1:]).decode('utf-8')
+
+
+class TextCompression:
+    """
+    Compression of large text values at rest, configured from
+    ARTICLE_COMPRESSION. Values whose UTF-8 encoding is at least min_size
+    bytes are stored as a BLOB (codec tag + compressed bytes) when that is
+    smaller; everything else stays plain TEXT, so rows written before
+    compression was enabled, or after it is disabled, read back the same.
+    """
+
+    def __init__(self):
+        self.codec = None
+        self.min_size = 4096
+        self._compress = None
+
+    def init_app(self, app):
+        self.codec = app.config.get('ARTICLE_COMPRESSION') or None
+        if self.codec and self.codec not in CODECS:
+            raise ValueError(f"Unknown ARTICLE_COMPRESSION codec: {self.codec}")
+        self.min_size = app.config.get('ARTICLE_COMPRESSION_MIN_SIZE', self.min_size)
+        self._compress = CODECS[self.codec][0](app.config['ARTICLE_COMPRESSION_LEVEL']) if self.codec else None
+
+    def compress(self, text):
+        """Value to store for text: compressed bytes, or the text itself when not worth it"""
+        if self._compress is None or not isinstance(text, str):
+            return text
+        data = text.encode('utf-8')
+        if len(data) < self.min_size:
+            return text
+        packed = CODEC_TAGS[self.codec] + self._compress(data)
+        return packed if len(packed) < len(data) else text
+
+
+text_compression = TextCompression()
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column compressed at rest on SQLite, per text_compression. Other
+    databases store it as plain text (PostgreSQL already compresses large
+    values itself). Compressed rows hold a BLOB, so SQL that reads the
+    column as text goes through the article_text() function instead.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name != 'sqlite':
+            return value
+        return text_compression.compress(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+    def coerce_compared_value(self, op, value):
+        # Values compared with the column (LIKE patterns and such) are never compressed
+        return Text()
+
+
+def register_text_functions(dbapi_connection):
+    """Add article_text(value) to a SQLite connection: the text of a possibly compressed value"""
+    dbapi_connection.create_function('article_text', 1, decompress_text, deterministic=True)
+
+
+def install_text_functions(engine):
+    """Register article_text() on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def add_functions(dbapi_connection, connection_record):
+        register_text_functions(dbapi_connection)
@@ -0,0 +1,13 @@
+"""
+ASGI entry point for async mode: uvicorn asgi:app --workers 4
+The server reads request bodies and writes responses on its event loop, so
+slow clients no longer hold a handler thread; handlers run on a thread pool
+of ASGI_HANDLER_THREADS, and the async read handlers share one event loop
+per process for their database work.
+"""
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+from config import Config
+
+app = WSGIMiddleware(create_app(async_mode=True), workers=Config.ASGI_HANDLER_THREADS)
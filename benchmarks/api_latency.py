@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+API load and latency benchmark suite
+Seeds a reproducible synthetic dataset, then drives every route in
+routes/auth.py, routes/user.py and routes/article.py in-process through
+the Flask test client and, with --server, over HTTP against a multi-worker
+gunicorn server. Reports throughput, p50/p95/p99 latency and SQL statements
+per request as JSON, and exits non-zero when a result regresses beyond the
+stored baseline (written with --save-baseline).
+
+Usage: python benchmarks/api_latency.py [--users 1000] [--articles 10000] [--iterations 200]
+       [--server --workers 4 --concurrency 8] [--baseline PATH] [--save-baseline]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import bcrypt
+from sqlalchemy import event, text
+from config import Config
+
+PASSWORD = 'bench-password'
+SEED_CHUNK = 10000
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'api_latency.json')
+WORDS = (
+    'flask python database index query latency cache replica cursor search author '
+    'article benchmark server worker request response token session engine pool '
+    'migration schema column transaction commit publish draft title content excerpt'
+).split()
+
+# One request to send: token is None, 'admin' or the id of a logged in user; expected lists the success statuses
+Call = namedtuple('Call', 'method path body token expected')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def configure(database_uri, args):
+    Config.SQLALCHEMY_DATABASE_URI = database_uri
+    Config.RATELIMIT_ENABLED = False
+    Config.BCRYPT_ROUNDS = args.bcrypt_rounds
+    Config.BCRYPT_TARGET_MS = 0
+
+
+def seed(app, args):
+    """
+    Insert users and articles with executemany in chunks. Every user shares
+    one precomputed password hash, so seeding does no bcrypt work per row.
+    The last `spare` users own no articles and are consumed by the delete
+    scenarios.
+    """
+    from app.models import db, User, Article
+    rng = random.Random(args.seed)
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(args.bcrypt_rounds)).decode('utf-8')
+    now = datetime.utcnow()
+    total_users = args.users + spare_users(args)
+    paragraphs = [' '.join(rng.choice(WORDS) for _ in range(args.content_words)) for _ in range(500)]
+
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [{
+            'username': 'bench-admin', 'email': 'admin@bench.test', 'password_hash': password_hash,
+            'role': 'admin', 'created_at': now, 'updated_at': now, 'is_active': True,
+        }])
+        for start in range(0, total_users, SEED_CHUNK):
+            db.session.execute(User.__table__.insert(), [{
+                'username': f'user{i}', 'email': f'user{i}@bench.test', 'password_hash': password_hash,
+                'profile_image_url': 'default.png', 'role': 'user',
+                'created_at': now, 'updated_at': now, 'is_active': True,
+            } for i in range(start, min(start + SEED_CHUNK, total_users))])
+        db.session.commit()
+        # The admin is id 1, user{i} is id i + 2
+        first_author, last_author = 2, args.users + 1
+
+        started = now - timedelta(seconds=args.articles)
+        for start in range(0, args.articles, SEED_CHUNK):
+            db.session.execute(Article.__table__.insert(), [{
+                'title': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+                'content': rng.choice(paragraphs),
+                'user_id': rng.randint(first_author, last_author),
+                'is_published': rng.random() < 0.9,
+                'created_at': started + timedelta(seconds=i),
+                'updated_at': started + timedelta(seconds=i),
+            } for i in range(start, min(start + SEED_CHUNK, args.articles))])
+            db.session.commit()
+
+
+def spare_users(args):
+    # Two delete scenarios per mode, each consuming warmup + iterations users
+    return 4 * (args.warmup + args.iterations)
+
+
+class Context:
+    """Reproducible request parameters and the ids scenarios create and consume"""
+
+    def __init__(self, app, client, args, spares):
+        from app.models import db, User
+        self.rng = random.Random(args.seed)
+        self.counter = 0
+        self.created = []
+        self.spares = list(spares)
+        with app.app_context():
+            self.published = db.session.execute(
+                text('SELECT id FROM articles WHERE is_published ORDER BY id LIMIT 10000')
+            ).scalars().all()
+            author_ids = db.session.execute(
+                text('SELECT DISTINCT user_id FROM articles ORDER BY user_id LIMIT :n'), {'n': args.token_users}
+            ).scalars().all()
+            authors = db.session.query(User.id, User.email).filter(User.id.in_(author_ids)).all()
+            self.owned = {
+                user_id: db.session.execute(
+                    text('SELECT id FROM articles WHERE user_id = :u ORDER BY id LIMIT 100'), {'u': user_id}
+                ).scalars().all()
+                for user_id, _ in authors
+            }
+        self.tokens = {user_id: login(client, email) for user_id, email in authors}
+        self.admin_token = login(client, 'admin@bench.test')
+        page = client.get('/api/articles/?limit=20')
+        self.cursor = page.headers.get('X-Next-Cursor', '')
+
+    def next_id(self):
+        self.counter += 1
+        return self.counter
+
+    def user(self):
+        return self.rng.choice(sorted(self.tokens))
+
+
+def login(client, email):
+    response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+    return response.get_json()['token']
+
+
+def build_scenarios(run_id):
+    """Scenarios in execution order; create runs before delete so deletes have articles to remove"""
+    def as_user(ctx, method, path, body=None, expected=(200,)):
+        user_id = ctx.user()
+        return Call(method, path.format(user=user_id), body, user_id, expected)
+
+    def owned(ctx):
+        user_id = ctx.user()
+        return user_id, ctx.rng.choice(ctx.owned[user_id])
+
+    def bulk(ctx):
+        return as_user(ctx, 'POST', '/api/articles/bulk', {'operations': [
+            {'op': 'create', 'title': f'bulk {ctx.next_id()}', 'content': 'bulk content'} for _ in range(10)
+        ]})
+
+    def update_article(ctx):
+        user_id, article_id = owned(ctx)
+        return Call('PUT', f'/api/articles/{article_id}', {'title': f'edited {ctx.next_id()}'}, user_id, (200,))
+
+    def publish(ctx):
+        user_id, article_id = owned(ctx)
+        return Call('PUT', f'/api/articles/{article_id}/publish', {}, user_id, (200,))
+
+    def delete_article(ctx):
+        user_id, article_id = ctx.created.pop()
+        return Call('DELETE', f'/api/articles/{article_id}', None, user_id, (200,))
+
+    return [
+        ('auth.register', lambda ctx: Call('POST', '/api/auth/register', {
+            'username': f'reg-{run_id}-{ctx.next_id()}', 'email': f'reg-{run_id}-{ctx.counter}@bench.test',
+            'password': PASSWORD,
+        }, None, (201,))),
+        ('auth.login', lambda ctx: Call('POST', '/api/auth/login', {
+            'email': 'admin@bench.test', 'password': PASSWORD
+        }, None, (200,))),
+        ('articles.list', lambda ctx: Call('GET', '/api/articles/?limit=20', None, None, (200,))),
+        ('articles.list_next_page', lambda ctx: Call(
+            'GET', f'/api/articles/?limit=20&cursor={ctx.cursor}', None, None, (200,)
+        )),
+        ('articles.list_include_author', lambda ctx: Call(
+            'GET', '/api/articles/?limit=20&include=author', None, None, (200,)
+        )),
+        ('articles.search', lambda ctx: Call(
+            'GET', f'/api/articles/search?q={ctx.rng.choice(WORDS)}', None, None, (200, 501)
+        )),
+        ('articles.get', lambda ctx: Call(
+            'GET', f'/api/articles/{ctx.rng.choice(ctx.published)}', None, None, (200,)
+        )),
+        ('articles.my_articles', lambda ctx: as_user(ctx, 'GET', '/api/articles/my-articles')),
+        ('articles.create', lambda ctx: as_user(ctx, 'POST', '/api/articles/', {
+            'title': f'new {ctx.next_id()}', 'content': 'benchmark content'
+        }, (201,))),
+        ('articles.bulk', bulk),
+        ('articles.update', update_article),
+        ('articles.publish', publish),
+        ('articles.delete', delete_article),
+        ('articles.cache_stats', lambda ctx: Call('GET', '/api/articles/cache-stats', None, 'admin', (200,))),
+        ('users.list', lambda ctx: Call('GET', '/api/users/', None, 'admin', (200,))),
+        ('users.get', lambda ctx: as_user(ctx, 'GET', '/api/users/{user}')),
+        ('users.update', lambda ctx: as_user(ctx, 'PUT', '/api/users/{user}', {
+            'profile_image_url': f'avatar-{ctx.next_id()}.png'
+        })),
+        ('users.profile', lambda ctx: as_user(ctx, 'GET', '/api/users/profile')),
+        ('users.profile_update', lambda ctx: as_user(ctx, 'PUT', '/api/users/profile', {
+            'profile_image_url': f'avatar-{ctx.next_id()}.png'
+        })),
+        ('users.by_role', lambda ctx: Call('GET', '/api/users/role/admin', None, 'admin', (200,))),
+        ('users.role', lambda ctx: Call('PUT', f'/api/users/{ctx.user()}/role', {'role': 'user'}, 'admin', (200,))),
+        ('users.delete', lambda ctx: Call('DELETE', f'/api/users/{ctx.spares.pop()}', None, 'admin', (200,))),
+        ('users.hard_delete', lambda ctx: Call(
+            'DELETE', f'/api/users/{ctx.spares.pop()}/hard-delete', None, 'admin', (200,)
+        )),
+    ]
+
+
+def auth_headers(ctx, call):
+    if call.token is None:
+        return {}
+    token = ctx.admin_token if call.token == 'admin' else ctx.tokens[call.token]
+    return {'Authorization': f'Bearer {token}'}
+
+
+def remember_created(ctx, call, status, payload):
+    """Keep the ids of articles created by the benchmark so the delete scenario can remove them"""
+    if status not in call.expected or not isinstance(payload, dict):
+        return
+    if call.path == '/api/articles/' and call.method == 'POST':
+        ctx.created.append((call.token, payload['id']))
+    elif call.path == '/api/articles/bulk':
+        ctx.created.extend((call.token, result['id']) for result in payload['results'])
+
+
+def summarize(latencies_ms, errors, elapsed, statements=None):
+    report = {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'requests_per_second': round(len(latencies_ms) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(statistics.median(latencies_ms), 3),
+        'p95_ms': round(percentile(latencies_ms, 95), 3),
+        'p99_ms': round(percentile(latencies_ms, 99), 3),
+    }
+    if statements is not None:
+        report['sql_per_request'] = round(statistics.mean(statements), 2)
+    return report
+
+
+def run_test_client(app, args, spares, selected):
+    """Send each scenario's requests one at a time through the Flask test client"""
+    from app.models import db
+    client = app.test_client()
+    ctx = Context(app, client, args, spares)
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', count)
+
+    results = {}
+    for name, build in build_scenarios('client'):
+        if not selected(name):
+            continue
+        latencies, sql, errors = [], [], 0
+        elapsed = 0.0
+        for iteration in range(args.warmup + args.iterations):
+            call = build(ctx)
+            headers = auth_headers(ctx, call)
+            statements[0] = 0
+            start = time.perf_counter()
+            response = client.open(call.path, method=call.method, json=call.body, headers=headers)
+            duration = time.perf_counter() - start
+            remember_created(ctx, call, response.status_code, response.get_json(silent=True))
+            if iteration < args.warmup:
+                continue
+            elapsed += duration
+            latencies.append(duration * 1000)
+            sql.append(statements[0])
+            errors += response.status_code not in call.expected
+        results[name] = summarize(latencies, errors, elapsed, sql)
+
+    for engine in engines:
+        event.remove(engine, 'before_cursor_execute', count)
+    return results
+
+
+def start_server(database_uri, args):
+    if find_spec('gunicorn') is None:
+        raise SystemExit("--server needs gunicorn installed (pip install gunicorn)")
+    env = dict(
+        os.environ, DATABASE_URL=database_uri, RATELIMIT_ENABLED='false',
+        BCRYPT_ROUNDS=str(args.bcrypt_rounds), BCRYPT_TARGET_MS='0',
+    )
+    process = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn', '--workers', str(args.workers),
+        '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning', 'run:app',
+    ], cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=5)
+            connection.request('GET', '/api/articles/?limit=1')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit("gunicorn exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("gunicorn did not start within 60 seconds")
+
+
+def run_server(app, database_uri, args, spares, selected):
+    """Send each scenario's requests from concurrent keep-alive HTTP connections"""
+    ctx = Context(app, app.test_client(), args, spares)
+    process = start_server(database_uri, args)
+    lock = threading.Lock()
+    results = {}
+    try:
+        for name, build in build_scenarios('server'):
+            if not selected(name):
+                continue
+            count = args.warmup + args.iterations
+            if name == 'articles.delete':
+                count = min(count, len(ctx.created))
+            calls = [build(ctx) for _ in range(count)]
+            pending = list(enumerate(calls))
+            latencies, errors = [], [0]
+
+            def worker():
+                connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=60)
+                while True:
+                    with lock:
+                        if not pending:
+                            break
+                        iteration, call = pending.pop(0)
+                    headers = dict(auth_headers(ctx, call), **{'Content-Type': 'application/json'})
+                    body = json.dumps(call.body) if call.body is not None else None
+                    start = time.perf_counter()
+                    connection.request(call.method, call.path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    payload = response.read()
+                    duration = time.perf_counter() - start
+                    with lock:
+                        try:
+                            remember_created(ctx, call, response.status, json.loads(payload or b'null'))
+                        except ValueError:
+                            pass
+                        if iteration >= args.warmup:
+                            latencies.append(duration * 1000)
+                            errors[0] += response.status not in call.expected
+                connection.close()
+
+            started = time.perf_counter()
+            threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results[name] = summarize(latencies, errors[0], time.perf_counter() - started)
+    finally:
+        process.terminate()
+        process.wait()
+    return results
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """
+    Return one message per metric that regressed beyond the tolerance.
+    Latency only counts as regressed when it also grew by more than floor_ms,
+    so sub-millisecond jitter does not fail the run; p99 is reported but not
+    gated for the same reason.
+    """
+    regressions = []
+    for mode, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get(mode, {}).get(name)
+            if not previous:
+                continue
+            for key in ('p50_ms', 'p95_ms'):
+                if current[key] > previous[key] * (1 + tolerance) and current[key] - previous[key] > floor_ms:
+                    regressions.append(f"{mode} {name} {key}: {previous[key]} -> {current[key]}")
+            # In-process throughput is just the inverse of latency; only the server's is gated
+            if mode == 'server' and current['requests_per_second'] < previous['requests_per_second'] * (1 - tolerance):
+                regressions.append(
+                    f"{mode} {name} requests_per_second: "
+                    f"{previous['requests_per_second']} -> {current['requests_per_second']}"
+                )
+            # Statement counts are deterministic, so any real increase is a regression
+            if 'sql_per_request' in previous and current['sql_per_request'] > previous['sql_per_request'] + 0.5:
+                regressions.append(
+                    f"{mode} {name} sql_per_request: {previous['sql_per_request']} -> {current['sql_per_request']}"
+                )
+            if current['errors'] > previous['errors']:
+                regressions.append(f"{mode} {name} errors: {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--content-words', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help="SQLite file to seed (default: a temporary file)")
+    parser.add_argument('--reuse', action='store_true', help="Skip seeding when --database already has data")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--token-users', type=int, default=20)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4, help="Work factor for seeded passwords and logins")
+    parser.add_argument('--scenarios', help="Comma separated scenario name prefixes to run (default: all)")
+    parser.add_argument('--server', action='store_true', help="Also benchmark a gunicorn server over HTTP")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative slowdown before failing")
+    parser.add_argument('--floor-ms', type=float, default=1.0, help="Latency growth always tolerated")
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.database or os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    database_uri = f"sqlite:///{path}"
+    configure(database_uri, args)
+
+    from app import create_app
+    from app.models import db, User
+    app = create_app()
+
+    with app.app_context():
+        seeded = args.reuse and db.session.query(User.id).first() is not None
+    seed_seconds = None
+    if not seeded:
+        started = time.perf_counter()
+        seed(app, args)
+        seed_seconds = round(time.perf_counter() - started, 2)
+
+    first_spare = args.users + 2
+    spare_ids = list(range(first_spare, first_spare + spare_users(args)))
+    half = len(spare_ids) // 2
+    prefixes = tuple(args.scenarios.split(',')) if args.scenarios else ('',)
+
+    def selected(name):
+        return name.startswith(prefixes)
+
+    results = {'test_client': run_test_client(app, args, spare_ids[:half], selected)}
+    if args.server:
+        results['server'] = run_server(app, database_uri, args, spare_ids[half:], selected)
+
+    dataset = {'users': args.users, 'articles': args.articles, 'content_words': args.content_words, 'seed': args.seed}
+    report = {'dataset': dataset, 'seed_seconds': seed_seconds, 'results': results}
+
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'dataset': dataset, **results}, baseline_file, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('dataset') == dataset:
+            regressions = compare(results, baseline, args.tolerance, args.floor_ms)
+        else:
+            report['baseline_skipped'] = "baseline was recorded with a different dataset"
+    report['regressions'] = regressions
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Sync vs async serving concurrency benchmark
+Seeds a dataset, then serves it with the same number of processes from
+(a) gunicorn sync workers running run:app and (b) uvicorn running asgi:app
+(async mode). Each server gets the same read mix (article list and detail,
+user lookup, my-articles) at rising client concurrency, optionally while
+slow clients hold connections open. Reports throughput, p50/p99 latency,
+errors and resident memory of the whole server process tree, so results
+can be compared per MB.
+
+Usage: python benchmarks/async_concurrency.py [--processes 2] [--concurrency 8,32,128]
+       [--slow-clients 8] [--seconds 5]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from importlib.util import find_spec
+from sqlalchemy import text
+from api_latency import configure, seed, percentile, login
+
+SERVERS = {
+    'sync': lambda args: [
+        sys.executable, '-m', 'gunicorn', '--workers', str(args.processes), '--bind', f'127.0.0.1:{args.port}',
+        '--log-level', 'warning', 'run:app',
+    ],
+    'async': lambda args: [
+        sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(args.processes), '--port', str(args.port),
+        '--log-level', 'warning', '--no-access-log',
+    ],
+}
+REQUIRED_PACKAGES = {'sync': ('gunicorn',), 'async': ('uvicorn', 'a2wsgi', 'aiosqlite')}
+
+
+def tree_rss_mb(pid):
+    """Resident memory of a process and all of its descendants, read from /proc (Linux only)"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    parents[int(entry)] = int(stat.read().rsplit(')', 1)[1].split()[1])
+            except OSError:
+                continue
+    tree, frontier = {pid}, [pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [child for child, ppid in parents.items() if ppid == parent]
+        tree.update(children)
+        frontier.extend(children)
+    total_kb = 0
+    for member in tree:
+        try:
+            with open(f'/proc/{member}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def start_server(kind, database_uri, args):
+    missing = [package for package in REQUIRED_PACKAGES[kind] if find_spec(package) is None]
+    if missing:
+        raise SystemExit(f"The {kind} server needs {', '.join(missing)} installed")
+    env = dict(
+        os.environ, DATABASE_URL=database_uri, RATELIMIT_ENABLED='false', RESPONSE_CACHE_BACKEND='none',
+        BCRYPT_ROUNDS=str(args.bcrypt_rounds), BCRYPT_TARGET_MS='0', METRICS_ENABLED='false',
+    )
+    process = subprocess.Popen(SERVERS[kind](args), cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=5)
+            connection.request('GET', '/api/articles/?limit=1')
+            connection.getresponse().read()
+            connection.close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f"The {kind} server exited during startup")
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"The {kind} server did not start within 60 seconds")
+
+
+def hold_slow_client(port, stop):
+    """Open a connection and trickle a request into it, one header byte per second"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(b'GET /api/articles/?limit=1 HTTP/1.1\r\nHost: localhost\r\n')
+    try:
+        while not stop.wait(1):
+            sock.sendall(b'X')
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def drive(args, concurrency, requests_for):
+    """Run `concurrency` client threads for args.seconds and collect latencies"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def client(index):
+        rng = random.Random(args.seed + index)
+        connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=30)
+        samples, failed = [], 0
+        while time.perf_counter() < deadline:
+            path, headers = requests_for(rng)
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except OSError:
+                connection.close()
+                ok = False
+            samples.append((time.perf_counter() - start) * 1000)
+            failed += not ok
+        connection.close()
+        with lock:
+            latencies.extend(samples)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'concurrency': concurrency,
+        'requests_per_second': round(len(latencies) / args.seconds, 1),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+        'errors': errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--content-words', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    parser.add_argument('--processes', type=int, default=2, help="Server processes for both modes")
+    parser.add_argument('--concurrency', default='8,32,128', help="Comma separated client counts")
+    parser.add_argument('--slow-clients', type=int, default=0, help="Connections held open by trickling clients")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--modes', default='sync,async')
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    args.warmup, args.iterations = 0, 0
+
+    database_uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    configure(database_uri, args)
+    from app import create_app
+    from app.models import db
+    app = create_app()
+    seed(app, args)
+    client = app.test_client()
+    with app.app_context():
+        published = db.session.execute(
+            text('SELECT id FROM articles WHERE is_published ORDER BY id LIMIT 10000')
+        ).scalars().all()
+        authors = db.session.execute(
+            text('SELECT id, email FROM users WHERE id IN (SELECT DISTINCT user_id FROM articles) ORDER BY id LIMIT 20')
+        ).all()
+    tokens = {user_id: login(client, email) for user_id, email in authors}
+
+    def requests_for(rng):
+        kind = rng.random()
+        if kind < 0.4:
+            return '/api/articles/?limit=20', {}
+        if kind < 0.8:
+            return f'/api/articles/{rng.choice(published)}', {}
+        user_id = rng.choice(sorted(tokens))
+        headers = {'Authorization': f'Bearer {tokens[user_id]}'}
+        if kind < 0.9:
+            return f'/api/users/{user_id}', headers
+        return '/api/articles/my-articles', headers
+
+    results = {}
+    for kind in args.modes.split(','):
+        process = start_server(kind, database_uri, args)
+        stop = threading.Event()
+        slow = [
+            threading.Thread(target=hold_slow_client, args=(args.port, stop), daemon=True)
+            for _ in range(args.slow_clients)
+        ]
+        try:
+            for thread in slow:
+                thread.start()
+            runs = [drive(args, int(level), requests_for) for level in args.concurrency.split(',')]
+            results[kind] = {'rss_mb': tree_rss_mb(process.pid), 'runs': runs}
+        finally:
+            stop.set()
+            process.terminate()
+            process.wait()
+
+    print(json.dumps({
+        'processes': args.processes,
+        'slow_clients': args.slow_clients,
+        'seconds_per_run': args.seconds,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
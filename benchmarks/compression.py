@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Response compression cost benchmark
+Seeds a synthetic dataset, captures the bodies of the large list responses
+(public article feed, my-articles, admin user list) and compresses each with
+every installed coding at several levels, reporting bytes saved against CPU
+time per response. Then times the public feed end to end: uncompressed,
+compressed on every request, and served from the compressed-body cache.
+
+Usage: python benchmarks/compression.py [--users 500] [--articles 5000] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from config import Config
+from api_latency import configure, seed, login, percentile
+
+# Levels tried per coding, and the package each one needs
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 5, 11), 'zstd': (1, 3, 19)}
+PACKAGES = {'gzip': None, 'br': 'brotli', 'zstd': 'zstandard'}
+LEVEL_SETTINGS = {'gzip': 'COMPRESSION_GZIP_LEVEL', 'br': 'COMPRESSION_BROTLI_LEVEL', 'zstd': 'COMPRESSION_ZSTD_LEVEL'}
+
+
+def capture_bodies(client, app, db):
+    """Identity bodies of the list endpoints, as a client without Accept-Encoding gets them"""
+    with app.app_context():
+        author_id = db.session.execute(
+            text('SELECT user_id FROM articles GROUP BY user_id ORDER BY count(*) DESC LIMIT 1')
+        ).scalar()
+        author_email = db.session.execute(text('SELECT email FROM users WHERE id = :id'), {'id': author_id}).scalar()
+    author = {'Authorization': f'Bearer {login(client, author_email)}'}
+    admin = {'Authorization': f"Bearer {login(client, 'admin@bench.test')}"}
+    return {
+        'get_articles (limit=100)': client.get('/api/articles/?limit=100').get_data(),
+        'get_my_articles': client.get('/api/articles/my-articles', headers=author).get_data(),
+        'get_users': client.get('/api/users/', headers=admin).get_data(),
+    }
+
+
+def codec_costs(bodies, encodings, repeat):
+    from app.utils.compression import build_codecs
+    results = {}
+    for name, body in bodies.items():
+        rows = []
+        for encoding in encodings:
+            for level in LEVELS[encoding]:
+                compress = build_codecs({'COMPRESSION_ENCODINGS': encoding, LEVEL_SETTINGS[encoding]: level})[encoding]
+                start = time.process_time()
+                for _ in range(repeat):
+                    data = compress(body)
+                cpu_ms = (time.process_time() - start) * 1000 / repeat
+                rows.append({
+                    'encoding': encoding,
+                    'level': level,
+                    'bytes': len(data),
+                    'saved_pct': round(100 * (1 - len(data) / len(body)), 1),
+                    'cpu_ms': round(cpu_ms, 3),
+                    'kb_saved_per_cpu_ms': round((len(body) - len(data)) / 1024 / cpu_ms, 1) if cpu_ms else None,
+                })
+        results[name] = {'identity_bytes': len(body), 'codings': rows}
+    return results
+
+
+def time_requests(client, path, headers, iterations):
+    latencies, size = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        size = len(response.get_data())
+    return {
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'bytes': size,
+    }
+
+
+def end_to_end(client, compression, encoding, iterations):
+    """Public feed served from the response cache, with each way of producing the body"""
+    path = '/api/articles/?limit=100'
+    accept = {'Accept-Encoding': encoding}
+    cache = compression.cache
+    client.get(path, headers=accept)
+    results = {'identity': time_requests(client, path, {}, iterations)}
+    compression.cache = None
+    results[f'{encoding} per request'] = time_requests(client, path, accept, iterations)
+    compression.cache = cache
+    results[f'{encoding} cached'] = time_requests(client, path, accept, iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--content-words', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=50, help="Compressions per body and level")
+    parser.add_argument('--iterations', type=int, default=200, help="Requests per end to end variant")
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    iterations, args.warmup, args.iterations = args.iterations, 0, 0
+
+    configure(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'compression.db')}", args)
+    Config.METRICS_ENABLED = False
+    encodings = [encoding for encoding, package in PACKAGES.items() if package is None or find_spec(package)]
+    Config.COMPRESSION_ENCODINGS = ','.join(encodings)
+
+    from app import create_app
+    from app.models import db
+    from app.utils.compression import response_compression
+    app = create_app()
+    seed(app, args)
+    client = app.test_client()
+
+    bodies = capture_bodies(client, app, db)
+    report = {
+        'dataset': {'users': args.users, 'articles': args.articles, 'content_words': args.content_words},
+        'skipped': {encoding: f"install {package}" for encoding, package in PACKAGES.items() if encoding not in encodings},
+        'bodies': codec_costs(bodies, encodings, args.repeat),
+        'end_to_end': {
+            encoding: end_to_end(client, response_compression, encoding, iterations) for encoding in encodings
+        },
+        'compression_stats': response_compression.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Article content storage benchmark
+Seeds the same dataset of long articles once per ARTICLE_COMPRESSION setting
+(off, zlib and, when installed, zstd), then reports the database file size
+after VACUUM and the latency of the public list (excerpts only), single
+article (full content) and search endpoints. The seeded text comes from a
+small vocabulary, so it compresses better than real posts do.
+
+Usage: python benchmarks/content_storage.py [--articles 2000] [--content-words 3000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from config import Config
+from api_latency import configure, seed, percentile
+
+# Storage codecs tried, and the package each one needs
+PACKAGES = {'off': None, 'zlib': None, 'zstd': 'zstandard'}
+
+
+def time_requests(client, paths, iterations):
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = client.get(paths[i % len(paths)])
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, (paths[i % len(paths)], response.status_code)
+    return {'p50_ms': round(percentile(latencies, 50), 3), 'p95_ms': round(percentile(latencies, 95), 3)}
+
+
+def run_mode(codec, args, iterations):
+    path = os.path.join(tempfile.mkdtemp(), f'storage-{codec}.db')
+    configure(f"sqlite:///{path}", args)
+    Config.ARTICLE_COMPRESSION = '' if codec == 'off' else codec
+
+    from app import create_app
+    from app.models import db
+    app = create_app()
+    seed(app, args)
+    with app.app_context():
+        stored = dict(db.session.execute(
+            text("SELECT typeof(content), count(*) FROM articles GROUP BY typeof(content)")
+        ).all())
+        article_ids = db.session.execute(
+            text("SELECT id FROM articles WHERE is_published ORDER BY id LIMIT 1000")
+        ).scalars().all()
+        db.session.execute(text("VACUUM"))
+        db.session.commit()
+        db.engine.dispose()
+
+    rng = random.Random(args.seed)
+    client = app.test_client()
+    return {
+        'file_mb': round(os.path.getsize(path) / 1024 / 1024, 2),
+        'rows_compressed': stored.get('blob', 0),
+        'get_articles (limit=100)': time_requests(client, ['/api/articles/?limit=100'], iterations),
+        'get_article': time_requests(
+            client, [f'/api/articles/{rng.choice(article_ids)}' for _ in range(100)], iterations
+        ),
+        'search': time_requests(client, ['/api/articles/search?q=replica+cursor'], iterations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--content-words', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=200, help="Requests per endpoint and mode")
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    iterations, args.warmup, args.iterations = args.iterations, 0, 0
+    Config.METRICS_ENABLED = False
+    # Measure the database, not responses served from the cache
+    Config.RESPONSE_CACHE_BACKEND = 'none'
+
+    codecs = [codec for codec, package in PACKAGES.items() if package is None or find_spec(package)]
+    results = {codec: run_mode(codec, args, iterations) for codec in codecs}
+    report = {
+        'dataset': {'users': args.users, 'articles': args.articles, 'content_words': args.content_words},
+        'skipped': {codec: f"install {package}" for codec, package in PACKAGES.items() if codec not in codecs},
+        'modes': results,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
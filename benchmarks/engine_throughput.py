@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Database engine profile benchmark
+Runs concurrent reader and writer threads against the app's database for a
+fixed duration and reports operations per second and lock errors for each
+profile: SQLite with default settings, SQLite with the tuned PRAGMA profile,
+and the server database named by DATABASE_URL when one is set.
+
+Usage: python benchmarks/engine_throughput.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+from config import Config
+
+
+def run_profile(name, database_uri, tuned, args):
+    Config.SQLALCHEMY_DATABASE_URI = database_uri
+    Config.SQLITE_TUNING = tuned
+    Config.RATELIMIT_ENABLED = False
+
+    from app import create_app
+    from app.models import db, User, Article
+    app = create_app()
+
+    with app.app_context():
+        user = User(username=f'bench-{name}', email=f'bench-{name}@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        db.session.execute(Article.__table__.insert(), [
+            {'title': f'seed {i}', 'content': 'x' * 1000, 'user_id': user_id, 'is_published': True}
+            for i in range(args.seed)
+        ])
+        db.session.commit()
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def reader():
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                try:
+                    Article.query.filter_by(is_published=True).order_by(Article.id.desc()).limit(20).all()
+                    key = 'reads'
+                except OperationalError:
+                    db.session.rollback()
+                    key = 'errors'
+                db.session.remove()
+                with lock:
+                    counts[key] += 1
+
+    def writer():
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                try:
+                    db.session.add(Article(title='bench', content='y' * 1000, user_id=user_id))
+                    db.session.commit()
+                    key = 'writes'
+                except OperationalError:
+                    db.session.rollback()
+                    key = 'errors'
+                db.session.remove()
+                with lock:
+                    counts[key] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+    return {
+        'profile': name,
+        'reads_per_second': round(counts['reads'] / args.seconds, 1),
+        'writes_per_second': round(counts['writes'] / args.seconds, 1),
+        'lock_errors': counts['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=2000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    profiles = [
+        ('sqlite-default', f"sqlite:///{os.path.join(work_dir, 'default.db')}", False),
+        ('sqlite-tuned', f"sqlite:///{os.path.join(work_dir, 'tuned.db')}", True),
+    ]
+    server_url = os.getenv('DATABASE_URL')
+    if server_url and not server_url.startswith('sqlite'):
+        profiles.append(('server', server_url.replace('postgres://', 'postgresql://', 1), True))
+
+    results = [run_profile(name, uri, tuned, args) for name, uri, tuned in profiles]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
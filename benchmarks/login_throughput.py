@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+Fires concurrent POST /api/auth/login requests through the Flask test client
+and reports logins per second, latency percentiles and how many requests
+were shed with 503 by the bcrypt pool.
+
+Usage: python benchmarks/login_throughput.py [--requests 200] [--concurrency 16] [--rounds 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--queue-size', type=int, default=16)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp()
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    Config.RATELIMIT_ENABLED = False
+    Config.BCRYPT_ROUNDS = args.rounds
+    Config.BCRYPT_TARGET_MS = 0
+    Config.BCRYPT_POOL_QUEUE_SIZE = args.queue_size
+
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+    client.post('/api/auth/register', json={
+        'username': 'bench', 'email': 'bench@example.com', 'password': 'bench-password'
+    })
+
+    def login(_):
+        start = time.perf_counter()
+        response = app.test_client().post('/api/auth/login', json={
+            'email': 'bench@example.com', 'password': 'bench-password'
+        })
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(login, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    ok = [ms for status, ms in results if status == 200]
+    report = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'bcrypt_rounds': app.config['BCRYPT_ROUNDS'],
+        'pool_workers': app.config['BCRYPT_POOL_WORKERS'] or os.cpu_count(),
+        'succeeded': len(ok),
+        'shed_503': sum(1 for status, _ in results if status == 503),
+        'logins_per_second': round(len(ok) / elapsed, 2),
+        'p50_ms': round(statistics.median(ok), 2) if ok else None,
+        'p95_ms': round(percentile(ok, 95), 2) if ok else None,
+        'p99_ms': round(percentile(ok, 99), 2) if ok else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
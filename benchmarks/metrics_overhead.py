@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Metrics instrumentation overhead micro-benchmark
+Times the per-request hooks installed by install_metrics (before_request +
+after_request + teardown) and the per-statement SQL listeners in isolation,
+then the end-to-end difference on a trivial route through the test client.
+
+Usage: python benchmarks/metrics_overhead.py [--iterations 20000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Response
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from app.utils import metrics
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def make_app(instrumented):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db = SQLAlchemy(app)
+    if instrumented:
+        metrics.install_metrics(app, db)
+
+    @app.route('/ping')
+    def ping():
+        db.session.execute(text('SELECT 1'))
+        return 'pong'
+    return app, db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    app, db = make_app(instrumented=True)
+    response = Response('pong')
+    with app.test_request_context('/ping'):
+        def hooks():
+            metrics._before_request()
+            metrics._after_request(response)
+            metrics._teardown_request()
+        hooks_us = per_call_us(hooks, args.iterations)
+
+        connection = db.engine.connect()
+        sql_with = per_call_us(lambda: connection.execute(text('SELECT 1')), args.iterations)
+        connection.close()
+
+    plain_app, plain_db = make_app(instrumented=False)
+    with plain_app.app_context():
+        connection = plain_db.engine.connect()
+        sql_without = per_call_us(lambda: connection.execute(text('SELECT 1')), args.iterations)
+        connection.close()
+
+    requests = max(1, args.iterations // 10)
+    with app.app_context():
+        client = app.test_client()
+        request_with = per_call_us(lambda: client.get('/ping'), requests)
+    with plain_app.app_context():
+        client = plain_app.test_client()
+        request_without = per_call_us(lambda: client.get('/ping'), requests)
+
+    print(json.dumps({
+        'request_hooks_us': round(hooks_us, 2),
+        'sql_listener_us_per_statement': round(sql_with - sql_without, 2),
+        'end_to_end_request_us': {
+            'instrumented': round(request_with, 2),
+            'plain': round(request_without, 2),
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
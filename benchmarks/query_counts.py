@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+N+1 query check for the list and batch endpoints
+Seeds a SQLite database, then requests each endpoint at a small and a
+large page size (or batch size, or author with few and many articles),
+with and without ?include=author, and counts the SQL statements each
+request sends through the per-request metrics instrumentation. Prints the
+counts as JSON and exits non-zero when the count of a case depends on how
+many rows the response holds.
+
+Usage: python benchmarks/query_counts.py [--users 200] [--articles 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from config import Config
+from api_latency import configure, seed, login
+
+
+def cases(sample):
+    """(name, [(email, method, path, body), ...]): every variant of a case must send as many statements"""
+    small, large = sample['article_ids'][:2], sample['article_ids'][:50]
+    users_small, users_large = sample['user_ids'][:2], sample['user_ids'][:50]
+    admin = 'admin@bench.test'
+    listed = []
+    for include in ('', '&include=author'):
+        suffix = ' (include=author)' if include else ''
+        listed += [
+            (f'GET /api/articles/{suffix}', [
+                (None, 'GET', f'/api/articles/?limit={limit}{include}', None) for limit in (2, 100)
+            ]),
+            (f'GET /api/articles/?ids={suffix}', [
+                (None, 'GET', f'/api/articles/?ids={",".join(map(str, ids))}{include}', None) for ids in (small, large)
+            ]),
+            (f'GET /api/articles/my-articles{suffix}', [
+                (author, 'GET', f'/api/articles/my-articles{include.replace("&", "?")}', None) for author in sample['authors']
+            ]),
+        ]
+    return listed + [
+        ('GET /api/articles/search', [
+            (None, 'GET', f'/api/articles/search?q=index&limit={limit}', None) for limit in (2, 50)
+        ]),
+        ('POST /api/users/batch', [
+            (admin, 'POST', '/api/users/batch', {'ids': ids}) for ids in (users_small, users_large)
+        ]),
+    ]
+
+
+def statements_per_request(app, client, method, path, body, headers):
+    """Send one request and return how many statements the metrics saw it execute"""
+    from app.utils.metrics import REQUEST_SQL_STATEMENTS
+    endpoint, _ = app.url_map.bind('localhost').match(urlsplit(path).path, method)
+    counter = REQUEST_SQL_STATEMENTS.labels(endpoint.split('.')[0], endpoint)
+    before = counter.sum
+    response = client.open(path, method=method, json=body, headers=headers)
+    assert response.status_code == 200, (method, path, response.status_code)
+    return int(counter.sum - before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--content-words', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    args.warmup, args.iterations = 0, 0
+
+    configure(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'counts.db')}", args)
+    Config.METRICS_ENABLED = True
+    # Count what the database is asked for, not what the caches answer
+    Config.RESPONSE_CACHE_BACKEND = 'none'
+    Config.PRINCIPAL_CACHE_SIZE = 0
+
+    from app import create_app
+    from app.models import db
+    app = create_app()
+    seed(app, args)
+    with app.app_context():
+        authors = db.session.execute(text(
+            "SELECT u.email FROM users u JOIN articles a ON a.user_id = u.id GROUP BY u.id ORDER BY count(*), u.id"
+        )).scalars().all()
+        sample = {
+            'article_ids': db.session.execute(
+                text("SELECT id FROM articles WHERE is_published ORDER BY id LIMIT 50")
+            ).scalars().all(),
+            'user_ids': db.session.execute(text("SELECT id FROM users ORDER BY id LIMIT 50")).scalars().all(),
+            'authors': (authors[0], authors[-1]),
+        }
+
+    client = app.test_client()
+    tokens = {email: login(client, email) for email in ('admin@bench.test',) + sample['authors']}
+    report, failures = {}, []
+    for name, variants in cases(sample):
+        counts = []
+        for email, method, path, body in variants:
+            headers = {'Authorization': f'Bearer {tokens[email]}'} if email else {}
+            counts.append(statements_per_request(app, client, method, path, body, headers))
+        report[name] = counts
+        if len(set(counts)) > 1:
+            failures.append(f"{name}: {' vs '.join(map(str, counts))} statements")
+
+    print(json.dumps({
+        'dataset': {'users': args.users, 'articles': args.articles},
+        'statements': report,
+        'failures': failures,
+    }, indent=2))
+    if failures:
+        print(f"{len(failures)} endpoints send more statements for larger responses:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
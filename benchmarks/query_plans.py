@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Query plan audit for controller queries
+Migrates a fresh SQLite database to the head revision, seeds it, runs
+ANALYZE, then calls each controller read path and runs EXPLAIN QUERY PLAN
+on every statement it sends. Prints the plans as JSON, listing under
+"failures" the statements that scan a whole table (except queries in
+EXPECTED_SCANS, which read the whole table by design). The same audit
+runs as an assertion in tests/test_query_plans.py.
+
+Usage: python benchmarks/query_plans.py [--users 2000] [--articles 20000]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, text
+from config import Config
+from api_latency import configure, seed
+
+# "SCAN <table>" without an index is a full table scan (virtual tables and index scans read differently)
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+# Queries that return (or recount) every row, where a scan is the right plan
+EXPECTED_SCANS = {
+    'userController.get_all_users': 'lists every active user',
+    'exportController.iter_export': 'streams whole tables',
+    'statsController.compute_stats': 'recounts every row for stats-rebuild and stats-verify',
+}
+
+
+def controller_queries(sample):
+    """(name, call) pairs covering the read paths of the controllers"""
+    from app.controllers import articleController, userController, statsController, exportController
+    from app.controllers import auth_controller, searchController
+    from app.models import Article
+
+    def drain(iterator):
+        for _ in iterator:
+            pass
+
+    return [
+        ('userController.get_all_users', lambda: userController.get_all_users()),
+        ('userController.get_user_by_id', lambda: userController.get_user_by_id(sample['user_id'])),
+        ('userController.get_users_by_ids', lambda: userController.get_users_by_ids(
+            [sample['user_id'], sample['user_id'] + 1, sample['user_id'] + 2])),
+        ('userController.get_user_by_email', lambda: userController.get_user_by_email(sample['email'])),
+        ('userController.get_users_by_role', lambda: userController.get_users_by_role('admin')),
+        ('auth_controller.authenticate_user', lambda: auth_controller.authenticate_user(sample['email'], 'wrong')),
+        ('articleController.get_article_by_id', lambda: articleController.get_article_by_id(
+            sample['article_id'], include=('author',))),
+        ('articleController.get_article_meta', lambda: articleController.get_article_meta(
+            sample['article_id'], include=('author',))),
+        ('articleController.get_articles_by_ids', lambda: articleController.get_articles_by_ids(
+            [sample['article_id'], sample['article_id'] + 1, sample['article_id'] + 2],
+            Article.SUMMARY_FIELDS, include=('author',))),
+        ('articleController.get_articles_by_user', lambda: articleController.get_articles_by_user(
+            sample['user_id'], Article.SUMMARY_FIELDS, include=('author',))),
+        ('articleController.get_published_articles_by_user', lambda: articleController.get_published_articles_by_user(
+            sample['user_id'])),
+        ('articleController.get_published_articles_page', lambda: articleController.get_published_articles_page(
+            20, fields=Article.SUMMARY_FIELDS)),
+        ('articleController.get_published_articles_page (cursor)', lambda: articleController.get_published_articles_page(
+            20, sample['cursor'], Article.SUMMARY_FIELDS, include=('author',))),
+        ('statsController.get_user_stats', lambda: statsController.get_user_stats(sample['user_id'])),
+        ('statsController.get_site_stats', lambda: statsController.get_site_stats()),
+        ('statsController.compute_stats', lambda: statsController.compute_stats()),
+        ('searchController.search_articles', lambda: searchController.search_articles(
+            'index query', 20, author_id=sample['user_id'])),
+        ('exportController.iter_export', lambda: drain(exportController.iter_export('articles'))),
+    ]
+
+
+def audit(app, db, sample):
+    """Run every controller query, capturing its statements, then explain each one"""
+    report, failures = {}, []
+    for name, call in controller_queries(sample):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        with app.test_request_context():
+            event.listen(db.engine, 'before_cursor_execute', capture)
+            try:
+                call()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', capture)
+                db.session.rollback()
+
+            plans = []
+            with db.engine.connect() as connection:
+                for statement, parameters in statements:
+                    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                    details = [row[3] for row in rows]
+                    scans = [match.group(1) for match in map(FULL_SCAN.match, details) if match]
+                    plans.append({
+                        'sql': ' '.join(statement.split())[:160],
+                        'plan': details,
+                        'full_scans': scans,
+                        'temp_sort': any(TEMP_SORT.search(detail) for detail in details),
+                    })
+                    if scans and name not in EXPECTED_SCANS:
+                        failures.append(f"{name}: full scan of {', '.join(scans)}")
+        report[name] = plans
+    return report, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--content-words', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    args.warmup, args.iterations = 0, 0
+
+    workdir = tempfile.mkdtemp()
+    database_uri = f"sqlite:///{os.path.join(workdir, 'plans.db')}"
+    # Build the schema with the migrations, so the audit sees the indexes production gets
+    subprocess.run(
+        [sys.executable, 'manage.py', 'db', 'upgrade'], cwd=ROOT, capture_output=True, check=True,
+        env=dict(os.environ, DATABASE_URL=database_uri, DB_SCHEMA_STARTUP='off',
+                 RATELIMIT_STORAGE_URI='memory://'),
+    )
+    configure(database_uri, args)
+    Config.DB_SCHEMA_STARTUP = 'verify'
+    Config.RESPONSE_CACHE_BACKEND = 'none'
+    Config.METRICS_ENABLED = False
+
+    from app import create_app
+    from app.models import db, Article
+    app = create_app()
+    seed(app, args)
+    with app.app_context():
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+        sample = {
+            'user_id': db.session.execute(text('SELECT user_id FROM articles ORDER BY id LIMIT 1')).scalar(),
+            'article_id': db.session.execute(text('SELECT id FROM articles ORDER BY id LIMIT 1')).scalar(),
+            'email': 'user0@bench.test',
+            'cursor': tuple(
+                db.session.query(Article.created_at, Article.id).filter(Article.is_published.is_(True))
+                .order_by(Article.created_at.desc(), Article.id.desc()).offset(20).first()
+            ),
+        }
+
+    report, failures = audit(app, db, sample)
+    print(json.dumps({
+        'dataset': {'users': args.users, 'articles': args.articles},
+        'queries': report,
+        'failures': failures,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Rate limiter overhead micro-benchmark
+Measures the cost of one sliding-window rate limit check for each storage
+backend, both directly through the limits strategy and per request through
+a minimal Flask app (limiter enabled minus limiter disabled).
+
+Usage: python benchmarks/ratelimit_overhead.py [--iterations 5000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from app.utils import rateLimitStorage  # noqa: F401  Registers the sqlite:// storage scheme
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def request_us(storage_uri, enabled, iterations):
+    app = Flask(__name__)
+    app.config.update(
+        RATELIMIT_STORAGE_URI=storage_uri,
+        RATELIMIT_STRATEGY='sliding-window-counter',
+        RATELIMIT_ENABLED=enabled,
+    )
+    limiter = Limiter(key_func=get_remote_address, app=app)
+
+    @app.route('/ping')
+    @limiter.limit('1000000 per hour')
+    def ping():
+        return 'pong'
+
+    client = app.test_client()
+    client.get('/ping')
+    return per_call_us(lambda: client.get('/ping'), iterations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    backends = {
+        'memory': 'memory://',
+        'sqlite': f"sqlite:///{os.path.join(work_dir, 'ratelimit.db')}",
+    }
+    item = parse('1000000 per hour')
+    baseline = request_us('memory://', False, args.iterations)
+    results = []
+    for name, uri in backends.items():
+        strategy = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+        results.append({
+            'storage': name,
+            'hit_us': round(per_call_us(lambda: strategy.hit(item, 'bench'), args.iterations), 2),
+            'request_overhead_us': round(request_us(uri, True, args.iterations) - baseline, 2),
+        })
+    print(json.dumps({'request_without_limiter_us': round(baseline, 2), 'backends': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
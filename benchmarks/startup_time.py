@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Starts fresh interpreters against a database migrated to the head revision
+and times, for each DB_SCHEMA_STARTUP mode, importing the app package,
+create_app() and the first and second requests, plus the whole process. Also
+times importing manage.py, which CLI jobs pay before any command runs.
+
+Usage: python benchmarks/startup_time.py [--runs 10] [--modes create,verify]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+BOOT = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+client = app.test_client()
+status = client.get('/api/articles/?limit=20').status_code
+first = time.perf_counter()
+client.get('/api/articles/?limit=20')
+second = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first - created) * 1000,
+    'second_request_ms': (second - first) * 1000,
+    'status': status,
+    'modules': len(sys.modules),
+}))
+"""
+
+MANAGE = """
+import json, time
+start = time.perf_counter()
+import manage
+print(json.dumps({'import_ms': (time.perf_counter() - start) * 1000}))
+"""
+
+
+def spawn(code, env):
+    """Run code in a fresh interpreter, returning its JSON output and the process wall time"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    return json.loads(result.stdout.strip().splitlines()[-1]), wall_ms
+
+
+def summarize(samples):
+    return {
+        key: {'median': round(statistics.median(values), 1), 'min': round(min(values), 1)}
+        for key, values in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--modes', default='create,verify', help="DB_SCHEMA_STARTUP modes to time")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        RATELIMIT_STORAGE_URI=f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}",
+        BCRYPT_TARGET_MS='0', DB_SCHEMA_STARTUP='off',
+    )
+    subprocess.run(
+        [sys.executable, 'manage.py', 'db', 'upgrade'], cwd=ROOT, env=env, capture_output=True, check=True
+    )
+
+    results = {}
+    for mode in args.modes.split(','):
+        samples = {}
+        for _ in range(args.runs):
+            timings, wall_ms = spawn(BOOT, dict(env, DB_SCHEMA_STARTUP=mode))
+            if timings.pop('status') != 200:
+                raise SystemExit(f"First request failed with DB_SCHEMA_STARTUP={mode}")
+            timings['process_ms'] = wall_ms
+            for key, value in timings.items():
+                samples.setdefault(key, []).append(value)
+        results[mode] = summarize(samples)
+
+    samples = {}
+    for _ in range(args.runs):
+        timings, wall_ms = spawn(MANAGE, env)
+        samples.setdefault('import_ms', []).append(timings['import_ms'])
+        samples.setdefault('process_ms', []).append(wall_ms)
+    results['manage.py'] = summarize(samples)
+
+    print(json.dumps({'runs': args.runs, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Article write throughput benchmark
+Seeds a synthetic dataset, then runs owner updates, publish toggles and
+deletes from concurrent threads two ways: the read-then-write sequence the
+article routes used before (load the article, check ownership, modify it
+through the ORM, flush and commit) and the single-statement controllers
+(UPDATE/DELETE ... WHERE id = ? AND user_id = ? RETURNING). Reports
+operations per second, SQL statements per operation and lock errors as
+JSON, and exits non-zero if the stats counters drift.
+
+Usage: python benchmarks/write_throughput.py [--operations 1000] [--threads 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from config import Config
+from api_latency import configure, seed
+
+KINDS = ('update', 'toggle', 'delete')
+MODES = ('read_then_write', 'single_statement')
+
+
+def read_then_write(kind, article_id, user):
+    """The route and controller sequence before single-statement writes"""
+    from app.models import db
+    from app.controllers.articleController import get_article_by_id, invalidate_article_cache
+    from app.controllers.statsController import adjust_article_stats
+    from app.utils.auth import check_resource_ownership
+
+    article = get_article_by_id(article_id)
+    if not article or not check_resource_ownership(article.user_id, user):
+        return False
+    article = get_article_by_id(article_id)
+    was_published = article.is_published
+    if kind == 'delete':
+        db.session.delete(article)
+        adjust_article_stats({article.user_id: [-1, -1 if was_published else 0]})
+        db.session.commit()
+        invalidate_article_cache(article_id, was_published)
+        return True
+    if kind == 'update':
+        article.title = f'edited {article_id}'
+    else:
+        article.is_published = not was_published
+        adjust_article_stats({article.user_id: [0, 1 if article.is_published else -1]})
+    db.session.commit()
+    invalidate_article_cache(article_id)
+    article.to_dict()
+    return True
+
+
+def single_statement(kind, article_id, user):
+    from app.controllers.articleController import update_article, toggle_publish_status, delete_article
+
+    if kind == 'delete':
+        return delete_article(article_id, user) is None
+    if kind == 'update':
+        article, error = update_article(article_id, user, title=f'edited {article_id}')
+    else:
+        article, error = toggle_publish_status(article_id, user)
+    if error:
+        return False
+    article.to_dict()
+    return True
+
+
+def run(app, db, engine, mode, kind, targets, args):
+    """Run one kind of write over targets from args.threads threads"""
+    write = read_then_write if mode == 'read_then_write' else single_statement
+    counts = {'ok': 0, 'failed': 0, 'errors': 0, 'statements': 0}
+    lock = threading.Lock()
+
+    def count_statement(*_):
+        with lock:
+            counts['statements'] += 1
+
+    def worker(share):
+        with app.app_context():
+            for article_id, user_id in share:
+                user = SimpleNamespace(id=user_id, role='user')
+                try:
+                    key = 'ok' if write(kind, article_id, user) else 'failed'
+                except OperationalError:
+                    db.session.rollback()
+                    key = 'errors'
+                db.session.remove()
+                with lock:
+                    counts[key] += 1
+
+    shares = [targets[index::args.threads] for index in range(args.threads)]
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    event.remove(engine, 'before_cursor_execute', count_statement)
+
+    operations = len(targets)
+    return {
+        'operations': operations,
+        'ops_per_s': round(operations / elapsed, 1),
+        'statements_per_op': round(counts['statements'] / operations, 2),
+        'failed': counts['failed'],
+        'lock_errors': counts['errors'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--content-words', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--operations', type=int, default=1000, help="Writes of each kind per mode")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    args = parser.parse_args()
+    # seed() sizes its spare user pool from these
+    args.warmup, args.iterations = 0, 0
+    if args.articles < 2 * args.operations:
+        parser.error("--articles must be at least twice --operations, each mode deletes its own articles")
+
+    configure(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'writes.db')}", args)
+    Config.RESPONSE_CACHE_BACKEND = 'none'
+    Config.METRICS_ENABLED = False
+
+    from app import create_app
+    from app.models import db
+    from app.controllers.statsController import rebuild_stats, verify_stats
+    app = create_app()
+    seed(app, args)
+    with app.app_context():
+        rebuild_stats()
+        engine = db.engine
+        articles = [tuple(row) for row in db.session.execute(text('SELECT id, user_id FROM articles ORDER BY id'))]
+
+    results = {}
+    for index, mode in enumerate(MODES):
+        # Each mode edits and deletes its own half of the articles
+        own = articles[index::len(MODES)][:args.operations]
+        results[mode] = {kind: run(app, db, engine, mode, kind, own, args) for kind in KINDS}
+
+    with app.app_context():
+        mismatches = verify_stats()
+    speedup = {
+        kind: round(results['single_statement'][kind]['ops_per_s'] / results['read_then_write'][kind]['ops_per_s'], 2)
+        for kind in KINDS
+    }
+    print(json.dumps({
+        'dataset': {'users': args.users, 'articles': args.articles, 'seed': args.seed},
+        'threads': args.threads,
+        'results': results,
+        'speedup': speedup,
+        'stats_mismatches': mismatches,
+    }, indent=2))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,5 +3,119 @@ import os
 class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     SECRET_KEY = os.getenv("SECRET_KEY", "dev")
-    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'db/blogapi.db')}"
+    # Hosting providers often hand out postgres:// URLs, which SQLAlchemy does not accept
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'db/blogapi.db')}"
+    ).replace("postgres://", "postgresql://", 1)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Schema handling at startup: "create" runs db.create_all() (development), "verify" checks
+    # with one query that the database is at the migrations head (production), "off" skips both.
+    # The manage.py / flask CLI always skips both, so `db upgrade` works on a fresh database
+    DB_SCHEMA_STARTUP = os.getenv("DB_SCHEMA_STARTUP", "create")
+    MIGRATIONS_VERSIONS_DIR = os.path.join(BASE_DIR, "migrations", "versions")
+
+    # SQLite connection profile, applied with PRAGMAs on every connection
+    SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # Negative means KiB
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # Milliseconds
+
+    # Connection pool for server databases such as PostgreSQL
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Authenticated user cache used by the auth decorators (0 disables it)
+    PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+    PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+    # How often each process checks the shared principal_generation row for changes made by
+    # other workers (0 checks on every cache hit); bounds how long a revoked user stays cached
+    PRINCIPAL_CACHE_SYNC_INTERVAL = float(os.getenv("PRINCIPAL_CACHE_SYNC_INTERVAL", "1"))
+
+    # bcrypt work factor; when BCRYPT_TARGET_MS is set it is calibrated at startup instead, in each
+    # process (prefer `manage.py bcrypt-calibrate` once and set BCRYPT_ROUNDS for every worker)
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "0"))
+    # Hashing pool size (defaults to the CPU count) and how many jobs may wait for it
+    BCRYPT_POOL_WORKERS = int(os.getenv("BCRYPT_POOL_WORKERS", "0"))
+    BCRYPT_POOL_QUEUE_SIZE = int(os.getenv("BCRYPT_POOL_QUEUE_SIZE", "16"))
+
+    # Cache for public article responses: "lru" (per process), "shared" or "none". Entries of a
+    # per-process backend are checked against the response_cache_versions table on every read, so
+    # writes in one worker invalidate them in all of them
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "lru")
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    # Redis URL for the shared backend; "memory://" uses a local in-process stand-in
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "memory://")
+
+    # Response compression: codings offered, in order of preference ("br" needs the brotli
+    # package, "zstd" the zstandard package; empty disables compression)
+    COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "gzip")
+    # Bodies smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    # Levels per coding: gzip 1-9, brotli 0-11, zstd 1-22
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_LEVEL = int(os.getenv("COMPRESSION_BROTLI_LEVEL", "5"))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    # Compressed public response bodies kept per process, so they are not recompressed (0 disables)
+    COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # Article content compressed at rest on SQLite: "zlib", "zstd" (needs the zstandard package)
+    # or empty to store plain text; `manage.py compress-articles` converts existing rows
+    ARTICLE_COMPRESSION = os.getenv("ARTICLE_COMPRESSION", "")
+    # Content smaller than this many bytes (UTF-8) is stored as plain text
+    ARTICLE_COMPRESSION_MIN_SIZE = int(os.getenv("ARTICLE_COMPRESSION_MIN_SIZE", "4096"))
+    # zlib 0-9, zstd 1-22
+    ARTICLE_COMPRESSION_LEVEL = int(os.getenv("ARTICLE_COMPRESSION_LEVEL", "6"))
+
+    # Largest batch accepted by POST /api/articles/bulk
+    BULK_MAX_OPERATIONS = int(os.getenv("BULK_MAX_OPERATIONS", "1000"))
+    # Most ids resolved by GET /api/articles/?ids= and POST /api/users/batch
+    BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+    # Background hard deletes: articles removed per transaction and the pause between chunks
+    HARD_DELETE_CHUNK_SIZE = int(os.getenv("HARD_DELETE_CHUNK_SIZE", "500"))
+    HARD_DELETE_PAUSE_MS = int(os.getenv("HARD_DELETE_PAUSE_MS", "20"))
+    # Run jobs in a thread of each app process (off: run them with `manage.py deletion-jobs --run`)
+    HARD_DELETE_WORKER = os.getenv("HARD_DELETE_WORKER", "true").lower() == "true"
+    # How often idle workers look for jobs, and when a running job counts as abandoned
+    HARD_DELETE_POLL_SECONDS = float(os.getenv("HARD_DELETE_POLL_SECONDS", "30"))
+    HARD_DELETE_STALE_SECONDS = int(os.getenv("HARD_DELETE_STALE_SECONDS", "120"))
+
+    # Optional read replica; GET handlers marked @read_replica read from it
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    SQLALCHEMY_BINDS = {"replica": REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    # Fall back to the primary when the replica heartbeat is older than this (0 disables the check).
+    # Responses read from the replica are cached for at most this long (not at all when it is 0)
+    REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "1"))
+
+    # Rate limiting: a SQLite file shared by every worker on the host (or e.g. redis://...)
+    RATELIMIT_STORAGE_URI = os.getenv(
+        "RATELIMIT_STORAGE_URI", f"sqlite:///{os.path.join(BASE_DIR, 'db/ratelimit.db')}"
+    )
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+    RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter")
+    RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_DEFAULT = os.getenv("RATELIMIT_DEFAULT", "200 per day;50 per hour")
+    RATELIMIT_AUTH = os.getenv("RATELIMIT_AUTH", "5 per minute")  # Per client, whole auth blueprint
+    RATELIMIT_LOGIN = os.getenv("RATELIMIT_LOGIN", "5 per minute;20 per hour")  # Per client and account
+    RATELIMIT_API = os.getenv("RATELIMIT_API", "100 per hour")  # Per client, user/article/export routes
+
+    # Serve the article/user read endpoints with async handlers and AsyncSession (see asgi.py)
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+    # Threads running Flask handlers when served through asgi.py
+    ASGI_HANDLER_THREADS = int(os.getenv("ASGI_HANDLER_THREADS", "32"))
+
+    # Request/SQL/bcrypt instrumentation served at /metrics (Prometheus text format)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # /metrics answers only requests sent with "Authorization: Bearer <METRICS_TOKEN>", or from the
+    # addresses listed here. Neither is set by default, so it answers nobody until one is. Behind a
+    # reverse proxy every client comes from the proxy's address (often 127.0.0.1): use the token there
+    METRICS_ALLOWED_IPS = tuple(ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip.strip())
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
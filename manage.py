@@ -6,21 +6,29 @@ Handles database migrations, user creation, and other administrative tasks
 
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import click
 from flask.cli import FlaskGroup
-from app import create_app
-from app.models import db, User
-from app.controllers.userController import create_admin_user
-from app.utils.passwordHash import hash_password
 
-app = create_app()
-cli = FlaskGroup(app)
+def make_app():
+    """
+    Build the app on first use. FlaskGroup calls this only for commands that
+    need an app context, so the migration commands start without importing
+    the app; commands import what they use from it for the same reason.
+    """
+    from app import create_app
+    return create_app()
+
+cli = FlaskGroup(create_app=make_app)
 
 @cli.command("init-db")
 def init_db():
     """Initialize the database with tables"""
-    with app.app_context():
-        db.create_all()
-        print("Database initialized successfully!")
+    from app.models import db
+    db.create_all()
+    print("Database initialized successfully!")
 
 @cli.command("create-admin")
 def create_admin():
@@ -29,33 +37,33 @@ def create_admin():
     email = input("Enter admin email: ")
     password = input("Enter admin password: ")
     
-    with app.app_context():
-        try:
-            admin = create_admin_user(username, email, password)
-            print(f"Admin user '{admin.username}' created successfully!")
-        except Exception as e:
-            print(f"Error creating admin user: {e}")
-
-@cli.command("migrate")
+    from app.controllers.userController import create_admin_user
+    try:
+        admin = create_admin_user(username, email, password)
+        print(f"Admin user '{admin.username}' created successfully!")
+    except Exception as e:
+        print(f"Error creating admin user: {e}")
+
+@cli.command("migrate", with_appcontext=False)
 def migrate():
     """Run database migrations"""
     os.system("alembic upgrade head")
     print("Migrations completed successfully!")
 
-@cli.command("migrate-create")
+@cli.command("migrate-create", with_appcontext=False)
 def migrate_create():
     """Create a new migration"""
     message = input("Enter migration message: ")
     os.system(f"alembic revision --autogenerate -m '{message}'")
     print("Migration created successfully!")
 
-@cli.command("migrate-rollback")
+@cli.command("migrate-rollback", with_appcontext=False)
 def migrate_rollback():
     """Rollback the last migration"""
     os.system("alembic downgrade -1")
     print("Migration rolled back successfully!")
 
-@cli.command("migrate-history")
+@cli.command("migrate-history", with_appcontext=False)
 def migrate_history():
     """Show migration history"""
     os.system("alembic history")
@@ -65,25 +73,180 @@ def reset_db():
     """Reset the database (WARNING: This will delete all data)"""
     confirm = input("Are you sure you want to reset the database? This will delete ALL data! (yes/no): ")
     if confirm.lower() == 'yes':
-        with app.app_context():
-            db.drop_all()
-            db.create_all()
-            print("Database reset successfully!")
+        from app.models import db
+        db.drop_all()
+        db.create_all()
+        print("Database reset successfully!")
     else:
         print("Database reset cancelled.")
 
 @cli.command("list-users")
 def list_users():
     """List all users"""
-    with app.app_context():
-        users = User.query.all()
-        if users:
-            print("\nUsers:")
-            print("-" * 50)
-            for user in users:
-                print(f"ID: {user.id}, Username: {user.username}, Email: {user.email}, Role: {user.role}")
-        else:
-            print("No users found.")
+    from app.models import User
+    users = User.query.all()
+    if users:
+        print("\nUsers:")
+        print("-" * 50)
+        for user in users:
+            print(f"ID: {user.id}, Username: {user.username}, Email: {user.email}, Role: {user.role}")
+    else:
+        print("No users found.")
+
+@cli.command("export")
+@click.argument("kind", type=click.Choice(["articles", "users"]))
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "json"]), default="ndjson", help="Output format")
+@click.option("--output", "-o", type=click.File("w", lazy=False), default="-", help="Output file (default: stdout)")
+@click.option("--since", help="Only rows updated at or after this ISO 8601 datetime")
+@click.option("--until", help="Only rows updated before this ISO 8601 datetime")
+def export(kind, fmt, output, since, until):
+    """Stream all articles or users to a file as NDJSON or JSON"""
+    from app.controllers.exportController import iter_export
+    from app.utils.streaming import encode_records, parse_datetime_arg
+    updated_since, error = parse_datetime_arg(since, "--since")
+    if not error:
+        updated_until, error = parse_datetime_arg(until, "--until")
+    if error:
+        raise click.BadParameter(error)
+
+    for chunk in encode_records(iter_export(kind, updated_since, updated_until), fmt):
+        output.write(chunk)
+
+@cli.command("import")
+@click.argument("kind", type=click.Choice(["users", "articles"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["jsonl", "csv"]), help="Input format (default: from file extension)")
+@click.option("--batch-size", type=int, help="Records inserted per transaction (default: 5000)")
+@click.option("--workers", type=int, default=os.cpu_count(), help="Processes used to hash passwords")
+@click.option("--restart", is_flag=True, help="Ignore the saved checkpoint and start from the first record")
+def import_data(kind, path, fmt, batch_size, workers, restart):
+    """Bulk import users or articles from a JSONL or CSV file, resuming from the last checkpoint"""
+    from app.controllers.importController import (
+        read_records, checkpoint_source, get_checkpoint, reset_checkpoint, import_batch, IMPORT_BATCH_SIZE
+    )
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    source = checkpoint_source(kind, path)
+    if restart:
+        reset_checkpoint(source)
+    position = get_checkpoint(source)
+    if position:
+        print(f"Resuming {kind} import at record {position}")
+
+    records = islice(read_records(path, fmt), position, None)
+    executor = ProcessPoolExecutor(max_workers=workers) if kind == "users" and workers > 1 else None
+    started = time.perf_counter()
+    inserted = skipped = 0
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            try:
+                batch_inserted, batch_skipped = import_batch(kind, batch, source, position, executor)
+            except Exception as e:
+                print(f"Error importing records {position}-{position + len(batch)}: {e}")
+                print("Fix the input and run the command again to resume from this batch.")
+                sys.exit(1)
+            position += len(batch)
+            inserted += batch_inserted
+            skipped += batch_skipped
+            rate = inserted / max(time.perf_counter() - started, 1e-9)
+            print(f"{position} records processed, {inserted} inserted, {skipped} skipped ({rate:.0f}/s)")
+    finally:
+        if executor:
+            executor.shutdown()
+    print(f"Import of {kind} finished: {inserted} inserted, {skipped} skipped.")
+
+@cli.command("replica-sync")
+@click.option("--interval", type=float, default=1.0, help="Seconds between heartbeats")
+@click.option("--once", is_flag=True, help="Run a single heartbeat (and copy) then exit")
+def replica_sync(interval, once):
+    """Write the replication heartbeat; with two SQLite files, also copy the primary to the replica"""
+    from app.models import db
+    from app.utils.dbRouting import write_heartbeat, sync_sqlite_replica, REPLICA_BIND
+    replica = db.engines.get(REPLICA_BIND)
+    stand_in = replica is not None and db.engine.dialect.name == "sqlite" and replica.dialect.name == "sqlite"
+    while True:
+        write_heartbeat(db.session)
+        if stand_in:
+            sync_sqlite_replica(db.engine, replica)
+        if once:
+            break
+        time.sleep(interval)
+    print("Replica heartbeat written." if not stand_in else "Replica synced.")
+
+@cli.command("bcrypt-calibrate", with_appcontext=False)
+@click.option("--target-ms", type=int, default=250, help="Longest acceptable time for one hash")
+def bcrypt_calibrate(target_ms):
+    """Measure the bcrypt work factor for this host once, to configure every worker with BCRYPT_ROUNDS"""
+    from app.utils.passwordHash import calibrate_rounds
+    print(f"BCRYPT_ROUNDS={calibrate_rounds(target_ms)}")
+
+@cli.command("deletion-jobs")
+@click.option("--run", "run_jobs", is_flag=True, help="Run pending and abandoned jobs here before listing")
+@click.option("--chunk-size", type=int, help="Articles deleted per transaction (default: HARD_DELETE_CHUNK_SIZE)")
+def deletion_jobs(run_jobs, chunk_size):
+    """List recent user hard-delete jobs, optionally running the ones waiting"""
+    from flask import current_app
+    from app.controllers.userDeletionController import get_deletion_jobs, run_pending_deletions, worker_name
+    if run_jobs:
+        config = current_app.config
+        ran = run_pending_deletions(
+            worker_name(), chunk_size or config['HARD_DELETE_CHUNK_SIZE'], config['HARD_DELETE_PAUSE_MS'] / 1000,
+            config['HARD_DELETE_STALE_SECONDS']
+        )
+        print(f"Ran {len(ran)} deletion jobs.")
+    for job in get_deletion_jobs():
+        error = f" ({job.error})" if job.error else ""
+        print(f"{job.id}\tuser {job.user_id}\t{job.status}\t{job.articles_deleted} articles deleted{error}")
+
+@cli.command("search-rebuild")
+@click.option("--batch-size", type=int, help="Articles indexed per transaction (default: 5000)")
+def search_rebuild(batch_size):
+    """Rebuild the full-text search index from existing articles"""
+    from app.controllers.searchController import rebuild_search_index, search_supported, SEARCH_BATCH_SIZE
+    if not search_supported():
+        print("Full-text search is only available on SQLite.")
+        return
+    total = rebuild_search_index(batch_size or SEARCH_BATCH_SIZE, progress=lambda count: print(f"Indexed {count} articles..."))
+    print(f"Search index rebuilt: {total} articles indexed.")
+
+@cli.command("compress-articles")
+@click.option("--batch-size", type=int, help="Articles read per transaction (default: 500)")
+def compress_articles(batch_size):
+    """Store existing article content the way ARTICLE_COMPRESSION says, compressing or expanding rows"""
+    from flask import current_app
+    from app.controllers.articleController import convert_article_storage, STORAGE_BATCH_SIZE
+    codec = current_app.config['ARTICLE_COMPRESSION'] or "off"
+    scanned, rewritten = convert_article_storage(
+        batch_size or STORAGE_BATCH_SIZE,
+        progress=lambda scanned, rewritten: print(f"Scanned {scanned} articles, {rewritten} rewritten...")
+    )
+    print(f"Article storage converted (compression: {codec}): {rewritten} of {scanned} articles rewritten.")
+
+@cli.command("stats-rebuild")
+def stats_rebuild():
+    """Recount the per-user and site article statistics, then verify them"""
+    from app.controllers.statsController import rebuild_stats, verify_stats
+    authors, (users, articles, published) = rebuild_stats()
+    print(f"Stats rebuilt: {users} active users, {articles} articles ({published} published) by {authors} authors.")
+    mismatches = verify_stats()
+    for mismatch in mismatches:
+        print(f"Mismatch after rebuild (concurrent writes?): {mismatch}")
+    if mismatches:
+        sys.exit(1)
+
+@cli.command("stats-verify")
+def stats_verify():
+    """Check the maintained article statistics against fresh counts (exit status 1 on mismatch)"""
+    from app.controllers.statsController import verify_stats
+    mismatches = verify_stats()
+    for mismatch in mismatches:
+        print(mismatch)
+    if mismatches:
+        print(f"{len(mismatches)} counters are off; run `python manage.py stats-rebuild` to fix them.")
+        sys.exit(1)
+    print("All article statistics match.")
 
 if __name__ == '__main__':
     cli() 
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""add FTS5 full-text index over articles
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # FTS5 is SQLite only; other databases simply do not get search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+        "title, content, content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+        "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        "VALUES ('delete', old.id, old.title, old.content); "
+        "INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END"
+    )
+    # Large tables are better indexed afterwards with `python manage.py search-rebuild`
+    op.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS articles_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS articles_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS articles_fts_ai")
+    op.execute("DROP TABLE IF EXISTS articles_fts")
@@ -0,0 +1,53 @@
+"""add incrementally maintained article statistics counters
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_article_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('article_count', sa.Integer(), nullable=False),
+        sa.Column('published_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table(
+        'site_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_count', sa.Integer(), nullable=False),
+        sa.Column('article_count', sa.Integer(), nullable=False),
+        sa.Column('published_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Backfill from the existing rows; `python manage.py stats-rebuild` does the same later on
+    op.execute(
+        "INSERT INTO user_article_stats (user_id, article_count, published_count, updated_at) "
+        "SELECT user_id, COUNT(*), SUM(CASE WHEN is_published THEN 1 ELSE 0 END), CURRENT_TIMESTAMP "
+        "FROM articles GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO site_stats (id, user_count, article_count, published_count, updated_at) SELECT 1, "
+        "(SELECT COUNT(*) FROM users WHERE is_active), (SELECT COUNT(*) FROM articles), "
+        "(SELECT COUNT(*) FROM articles WHERE is_published), CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('site_stats')
+    op.drop_table('user_article_stats')
@@ -0,0 +1,40 @@
+"""index audit: per-author articles and active users by role
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_articles_by_user / get_published_articles_by_user, per-author stats and user deletes
+    op.create_index(
+        'ix_articles_user_published',
+        'articles',
+        ['user_id', 'is_published'],
+        unique=False
+    )
+    # get_users_by_role; partial so that soft-deleted users are not indexed
+    op.create_index(
+        'ix_users_active_role',
+        'users',
+        ['role'],
+        unique=False,
+        sqlite_where=sa.text('is_active = 1'),
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_active_role', table_name='users')
+    op.drop_index('ix_articles_user_published', table_name='articles')
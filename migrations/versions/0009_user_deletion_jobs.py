@@ -0,0 +1,42 @@
+"""add user_deletion_jobs table for background hard deletes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_deletion_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('articles_deleted', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('worker', sa.String(length=128), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_deletion_jobs_status', 'user_deletion_jobs', ['status'], unique=False)
+    op.create_index('ix_user_deletion_jobs_user_id', 'user_deletion_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_deletion_jobs_user_id', table_name='user_deletion_jobs')
+    op.drop_index('ix_user_deletion_jobs_status', table_name='user_deletion_jobs')
+    op.drop_table('user_deletion_jobs')
@@ -0,0 +1,119 @@
+"""store article excerpt and content_length, and index content through article_text()
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.textCompression import register_text_functions
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+EXCERPT_LENGTH = 200
+BATCH_SIZE = 5000
+
+FTS_TRIGGERS = ('articles_fts_ai', 'articles_fts_ad', 'articles_fts_au')
+
+
+def _batches(bind, where=''):
+    """Yield (first_id, last_id) ranges of at most BATCH_SIZE articles, in id order"""
+    last_id = 0
+    while True:
+        ids = bind.execute(
+            sa.text(f"SELECT id FROM articles WHERE id > :last_id {where} ORDER BY id LIMIT :batch_size"),
+            {'last_id': last_id, 'batch_size': BATCH_SIZE}
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids[0], ids[-1]
+        last_id = ids[-1]
+
+
+def _create_search_index(source, text_of):
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+        f"title, content, content='{source}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+        f"INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, {text_of('new')}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        f"VALUES ('delete', old.id, old.title, {text_of('old')}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, content) "
+        f"VALUES ('delete', old.id, old.title, {text_of('old')}); "
+        f"INSERT INTO articles_fts(rowid, title, content) VALUES (new.id, new.title, {text_of('new')}); END"
+    )
+    # Large tables are better indexed afterwards with `python manage.py search-rebuild`
+    op.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+
+def _drop_search_index():
+    for trigger in FTS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS articles_fts")
+    op.execute("DROP VIEW IF EXISTS articles_fts_source")
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('articles') as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=EXCERPT_LENGTH), nullable=True))
+        batch_op.add_column(sa.Column('content_length', sa.Integer(), nullable=True))
+
+    # Existing rows are all plain text until `manage.py compress-articles` runs
+    bind = op.get_bind()
+    for first, last in _batches(bind):
+        bind.execute(
+            sa.text(
+                "UPDATE articles SET excerpt = substr(content, 1, :excerpt_length), "
+                "content_length = length(content) WHERE id BETWEEN :first AND :last"
+            ),
+            {'excerpt_length': EXCERPT_LENGTH, 'first': first, 'last': last}
+        )
+
+    if bind.dialect.name != 'sqlite':
+        return
+    # The index reads content through article_text(), which expands compressed rows
+    register_text_functions(bind.connection.driver_connection)
+    _drop_search_index()
+    op.execute(
+        "CREATE VIEW IF NOT EXISTS articles_fts_source AS "
+        "SELECT id, title, article_text(content) AS content FROM articles"
+    )
+    _create_search_index('articles_fts_source', lambda row: f"article_text({row}.content)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # Expand compressed rows while the triggers can still read them
+        register_text_functions(bind.connection.driver_connection)
+        for first, last in _batches(bind, "AND typeof(content) = 'blob'"):
+            bind.execute(
+                sa.text(
+                    "UPDATE articles SET content = article_text(content) "
+                    "WHERE typeof(content) = 'blob' AND id BETWEEN :first AND :last"
+                ),
+                {'first': first, 'last': last}
+            )
+        _drop_search_index()
+
+    with op.batch_alter_table('articles') as batch_op:
+        batch_op.drop_column('content_length')
+        batch_op.drop_column('excerpt')
+
+    if bind.dialect.name == 'sqlite':
+        _create_search_index('articles', lambda row: f"{row}.content")
@@ -0,0 +1,30 @@
+"""add principal_generation table for cross-process principal cache invalidation
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'principal_generation',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO principal_generation (id, generation) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('principal_generation')
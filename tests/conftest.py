@@ -0,0 +1,38 @@
+import pytest
+from config import Config
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    Build an app on fresh SQLite files under tmp_path. Settings given as
+    keyword arguments override the Config defaults for this test only.
+    """
+    def make(**settings):
+        defaults = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+            'SQLALCHEMY_BINDS': {},
+            'RATELIMIT_ENABLED': False,
+            'RATELIMIT_STORAGE_URI': 'memory://',
+            'BCRYPT_ROUNDS': 4,
+            'BCRYPT_TARGET_MS': 0,
+            'HARD_DELETE_WORKER': False,
+            'METRICS_ENABLED': False,
+        }
+        for name, value in dict(defaults, **settings).items():
+            monkeypatch.setattr(Config, name, value, raising=False)
+        from app import create_app
+        return create_app()
+    yield make
+
+    # init_app registers a metadata per bind on the shared db object; drop the ones a test added
+    from app.models import db
+    for bind_key in [key for key in db.metadatas if key is not None]:
+        del db.metadatas[bind_key]
+
+
+def register_and_login(client, name, password='secret-pw'):
+    """Register a user and return the Authorization header for them"""
+    client.post('/api/auth/register', json={'username': name, 'email': f'{name}@test', 'password': password})
+    token = client.post('/api/auth/login', json={'email': f'{name}@test', 'password': password}).json['token']
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,25 @@
+import importlib.util
+import pytest
+from conftest import register_and_login
+
+MODES = [False, pytest.param(True, marks=pytest.mark.skipif(
+    importlib.util.find_spec('aiosqlite') is None, reason='ASYNC_MODE needs aiosqlite'
+))]
+
+
+@pytest.mark.parametrize('async_mode', MODES)
+def test_drafts_follow_the_same_rule_singly_and_in_batches(make_app, async_mode):
+    client = make_app(ASYNC_MODE=async_mode).test_client()
+    owner = register_and_login(client, 'owner')
+    other = register_and_login(client, 'other')
+    draft_id = client.post(
+        '/api/articles/', json={'title': 'draft', 'content': 'c', 'is_published': False}, headers=owner
+    ).json['id']
+
+    for headers, visible in ((owner, True), (other, False), ({}, False)):
+        single = client.get(f'/api/articles/{draft_id}', headers=headers)
+        batch = client.get(f'/api/articles/?ids={draft_id}', headers=headers).json[0]
+        assert (single.status_code == 200) is visible
+        assert ('status' not in batch) is visible
+        if visible:
+            assert single.json['title'] == batch['title'] == 'draft'
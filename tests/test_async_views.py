@@ -0,0 +1,27 @@
+import pytest
+from conftest import register_and_login
+
+pytest.importorskip('aiosqlite')
+
+
+def test_async_read_handlers_answer_like_the_sync_ones(make_app):
+    sync_client = make_app(RESPONSE_CACHE_BACKEND='none').test_client()
+    author = register_and_login(sync_client, 'author')
+    ids = [
+        sync_client.post('/api/articles/', json={'title': f't{i}', 'content': 'c', 'is_published': i != 1},
+                         headers=author).json['id']
+        for i in range(3)
+    ]
+    async_client = make_app(RESPONSE_CACHE_BACKEND='none', ASYNC_MODE=True).test_client()
+
+    paths = [
+        '/api/articles/?limit=2', '/api/articles/?fields=id,title&include=author', '/api/articles/?fields=,',
+        '/api/articles/?cursor=bogus', f'/api/articles/?ids={ids[1]},{ids[0]},999', f'/api/articles/{ids[0]}',
+        f'/api/articles/{ids[1]}', '/api/articles/999', '/api/articles/my-articles?include=author',
+    ]
+    for path in paths:
+        for headers in ({}, author):
+            expected, actual = sync_client.get(path, headers=headers), async_client.get(path, headers=headers)
+            assert (actual.status_code, actual.get_json()) == (expected.status_code, expected.get_json()), path
+            assert actual.headers.get('ETag') == expected.headers.get('ETag'), path
+            assert actual.headers.get('X-Next-Cursor') == expected.headers.get('X-Next-Cursor'), path
@@ -0,0 +1,24 @@
+from app.utils.fields import parse_ids
+from conftest import register_and_login
+
+
+def test_parse_ids_keeps_first_seen_order():
+    assert parse_ids('3, 1,3,2,1') == ([3, 1, 2], None)
+    assert parse_ids([True]) == (None, "ids must be a non-empty list of integers")
+
+
+def test_oversized_lists_are_rejected_before_deduplication(make_app):
+    app = make_app(BATCH_MAX_IDS=3)
+    client = app.test_client()
+    user = register_and_login(client, 'someone')
+
+    # Four entries are too many even though they name a single id
+    response = client.post('/api/users/batch', json={'ids': [1, 1, 1, 1]}, headers=user)
+    assert response.status_code == 413
+    assert client.get('/api/articles/?ids=1,1,1,1').status_code == 413
+
+    response = client.post('/api/users/batch', json={'ids': [1, 1, 'x']}, headers=user)
+    assert response.status_code == 400
+    response = client.post('/api/users/batch', json={'ids': [1, 1, 1]}, headers=user)
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json] == [1]
@@ -0,0 +1,35 @@
+from conftest import register_and_login
+
+
+def test_mistyped_fields_fail_per_operation(make_app):
+    client = make_app().test_client()
+    author = register_and_login(client, 'author')
+    article_id = client.post('/api/articles/', json={'title': 't', 'content': 'c'}, headers=author).json['id']
+
+    response = client.post('/api/articles/bulk', json={'operations': [
+        {'op': 'create', 'title': 'x', 'content': 'y', 'is_published': 'no'},
+        {'op': 'update', 'id': article_id, 'content': {'nested': True}},
+        {'op': 'create', 'title': ['x'], 'content': 'y'},
+        {'op': 'create', 'title': 'fine', 'content': 'ok'},
+    ]}, headers=author)
+
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [result['status'] for result in results] == [400, 400, 400, 201]
+    assert results[0]['error'] == 'is_published must be a boolean'
+    assert results[1]['error'] == 'content must be a string'
+    assert results[2]['error'] == 'title must be a string'
+    assert client.get(f'/api/articles/{article_id}').json['content'] == 'c'
+
+
+def test_null_is_published_creates_a_published_article(make_app):
+    client = make_app().test_client()
+    author = register_and_login(client, 'author')
+
+    response = client.post('/api/articles/bulk', json={'operations': [
+        {'op': 'create', 'title': 'x', 'content': 'y', 'is_published': None},
+    ]}, headers=author)
+
+    assert response.json['results'][0]['status'] == 201
+    assert [article['title'] for article in client.get('/api/articles/').json] == ['x']
+    assert client.get('/api/articles/stats').json['published'] == 1
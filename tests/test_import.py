@@ -0,0 +1,28 @@
+from app.controllers.importController import import_batch
+from app.models import User, Article
+from conftest import register_and_login
+
+
+def test_records_breaking_constraints_are_skipped_not_fatal(make_app):
+    app = make_app()
+    register_and_login(app.test_client(), 'existing')
+    with app.app_context():
+        inserted, skipped = import_batch('users', [
+            {'username': 'new', 'email': 'new@test', 'password': 'pw'},
+            {'username': 'new', 'email': 'other@test', 'password': 'pw'},  # Username repeated in the batch
+            {'username': 'twin', 'email': 'new@test', 'password': 'pw'},  # Email repeated in the batch
+            {'username': 'existing', 'email': 'x@test', 'password': 'pw'},  # Username already stored
+            {'username': 'y', 'email': 'existing@test', 'password': 'pw'},  # Email already stored
+        ], 'users:test', 0)
+        assert (inserted, skipped) == (1, 4)
+        assert User.query.count() == 2
+
+        author_id = User.query.filter_by(username='new').one().id
+        inserted, skipped = import_batch('articles', [
+            {'title': 't', 'content': 'c', 'user_id': str(author_id)},
+            {'title': 't', 'content': 'c', 'user_id': 'abc'},  # Not a number
+            {'title': 't', 'content': 'c', 'user_id': '999'},  # No such user
+            {'title': 't', 'content': 'c', 'author_email': 'existing@test'},
+        ], 'articles:test', 0)
+        assert (inserted, skipped) == (2, 2)
+        assert Article.query.count() == 2
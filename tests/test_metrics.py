@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.models import db
+from app.utils.metrics import REQUEST_SQL_STATEMENTS
+
+
+def test_metrics_need_an_allowed_address_or_the_token(make_app):
+    app = make_app(METRICS_ENABLED=True, METRICS_ALLOWED_IPS=('127.0.0.1',), METRICS_TOKEN='scrape-me')
+    client = app.test_client()
+    remote = {'REMOTE_ADDR': '203.0.113.9'}
+
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', environ_base=remote).status_code == 403
+    assert client.get('/metrics', environ_base=remote, headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    response = client.get('/metrics', environ_base=remote, headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.text
+
+
+def test_failed_statements_do_not_leave_timers_behind(make_app):
+    app = make_app(METRICS_ENABLED=True)
+    with app.app_context(), db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+        assert connection.info['metrics_started'] == []
+
+
+def test_async_engines_are_instrumented(make_app):
+    pytest.importorskip('aiosqlite')
+    app = make_app(METRICS_ENABLED=True, ASYNC_MODE=True, RESPONSE_CACHE_BACKEND='none')
+    counter = REQUEST_SQL_STATEMENTS.labels('article', 'article.get_articles')
+    before = counter.sum
+    assert app.test_client().get('/api/articles/').status_code == 200
+    assert counter.sum - before >= 1
+
+
+def test_metrics_answer_nobody_by_default(make_app):
+    from config import Config
+    app = make_app(METRICS_ENABLED=True, METRICS_ALLOWED_IPS=Config.METRICS_ALLOWED_IPS, METRICS_TOKEN='')
+    # A reverse proxy on the same host makes every client look local
+    assert app.test_client().get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 403
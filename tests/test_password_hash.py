@@ -0,0 +1,15 @@
+import bcrypt
+from app.utils.passwordHash import hashing_pool, needs_rehash
+
+
+def test_hashes_are_only_rehashed_upwards(monkeypatch):
+    stored = bcrypt.hashpw(b'secret-pw', bcrypt.gensalt(5)).decode('utf-8')
+    # Workers that calibrated different factors leave each other's hashes alone...
+    monkeypatch.setattr(hashing_pool, 'rounds', 4)
+    assert not needs_rehash(stored)
+    monkeypatch.setattr(hashing_pool, 'rounds', 5)
+    assert not needs_rehash(stored)
+    # ...while hashes weaker than the configured factor are still upgraded
+    monkeypatch.setattr(hashing_pool, 'rounds', 6)
+    assert needs_rehash(stored)
+    assert needs_rehash('not a bcrypt hash')
@@ -0,0 +1,40 @@
+from sqlalchemy import text
+from app.models import db
+from app.utils.principalCache import principal_cache, bump_shared_generation
+from conftest import register_and_login
+
+
+def set_role(name, role):
+    """Change a user's role the way another worker would, without touching this process's cache"""
+    db.session.execute(text("UPDATE users SET role = :role WHERE username = :name"), {'role': role, 'name': name})
+    db.session.commit()
+
+
+def test_changes_made_by_other_workers_reach_the_cache(make_app):
+    app = make_app(PRINCIPAL_CACHE_SYNC_INTERVAL=0)
+    client = app.test_client()
+    admin = register_and_login(client, 'admin')
+    with app.app_context():
+        set_role('admin', 'admin')
+    assert client.get('/api/users/', headers=admin).status_code == 200
+
+    # The row changed but nobody said so: the cached principal is still served
+    with app.app_context():
+        set_role('admin', 'user')
+    assert client.get('/api/users/', headers=admin).status_code == 200
+
+    # The other worker's invalidate() bumps the shared generation
+    with app.app_context():
+        bump_shared_generation()
+    assert client.get('/api/users/', headers=admin).status_code == 403
+
+
+def test_cached_principals_leave_out_the_password_hash(make_app):
+    app = make_app()
+    client = app.test_client()
+    user = register_and_login(client, 'someone')
+    assert client.get('/api/users/profile', headers=user).status_code == 200
+
+    cached = principal_cache.get(1)
+    assert cached.username == 'someone'
+    assert cached.password_hash is None
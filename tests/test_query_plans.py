@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from app.models import db, Article
+from conftest import register_and_login
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from query_plans import audit
+
+
+def test_controller_queries_use_indexes(make_app, tmp_path):
+    # The schema comes from the migrations, so the plans use the indexes production gets
+    database_uri = f"sqlite:///{tmp_path / 'plans.db'}"
+    result = subprocess.run(
+        [sys.executable, 'manage.py', 'db', 'upgrade'], cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, DATABASE_URL=database_uri, DB_SCHEMA_STARTUP='off', RATELIMIT_STORAGE_URI='memory://'),
+    )
+    assert result.returncode == 0, result.stderr
+    app = make_app(SQLALCHEMY_DATABASE_URI=database_uri, DB_SCHEMA_STARTUP='verify', RESPONSE_CACHE_BACKEND='none')
+    client = app.test_client()
+    author = register_and_login(client, 'author')
+    for number in range(25):
+        client.post('/api/articles/', json={'title': f'index {number}', 'content': 'query plans'}, headers=author)
+
+    with app.app_context():
+        sample = {
+            'user_id': 1,
+            'article_id': 1,
+            'email': 'author@test',
+            'cursor': tuple(
+                db.session.query(Article.created_at, Article.id).filter(Article.is_published.is_(True))
+                .order_by(Article.created_at.desc(), Article.id.desc()).offset(20).first()
+            ),
+        }
+    report, failures = audit(app, db, sample)
+    assert all(report.values()), [name for name, plans in report.items() if not plans]
+    assert failures == []
@@ -0,0 +1,24 @@
+
+def make_limited_app(make_app):
+    return make_app(
+        RATELIMIT_ENABLED=True, RATELIMIT_AUTH='5 per minute', RATELIMIT_LOGIN='3 per minute;20 per hour'
+    )
+
+
+def test_login_keeps_the_per_client_limit_when_emails_rotate(make_app):
+    client = make_limited_app(make_app).test_client()
+    statuses = [
+        client.post('/api/auth/login', json={'email': f'user{i}@test', 'password': 'wrong'}).status_code
+        for i in range(7)
+    ]
+    assert statuses[:5] == [401] * 5
+    assert statuses[5:] == [429, 429]
+
+
+def test_login_limit_per_account(make_app):
+    client = make_limited_app(make_app).test_client()
+    statuses = [
+        client.post('/api/auth/login', json={'email': 'victim@test', 'password': 'wrong'}).status_code
+        for _ in range(4)
+    ]
+    assert statuses == [401, 401, 401, 429]
@@ -0,0 +1,53 @@
+import time
+from app.models import db
+from app.utils.dbRouting import write_heartbeat, sync_sqlite_replica, REPLICA_BIND
+from conftest import register_and_login
+
+
+def sync_replica():
+    write_heartbeat(db.session)
+    sync_sqlite_replica(db.engine, db.engines[REPLICA_BIND])
+
+
+def test_replica_reads_are_cached_no_longer_than_the_lag_bound(make_app, tmp_path):
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    app = make_app(
+        REPLICA_DATABASE_URL=replica_url, SQLALCHEMY_BINDS={'replica': replica_url},
+        REPLICA_MAX_LAG=2, REPLICA_LAG_CHECK_INTERVAL=0
+    )
+    client = app.test_client()
+    author = register_and_login(client, 'author')
+    article_id = client.post('/api/articles/', json={'title': 'v1', 'content': 'first'}, headers=author).json['id']
+    with app.app_context():
+        sync_replica()
+
+    from app.utils.responseCache import response_cache
+    for _ in range(2):
+        assert client.get(f'/api/articles/{article_id}').json['title'] == 'v1'
+        assert client.get('/api/articles/').json[0]['title'] == 'v1'
+    assert response_cache.stats()['hits'] == 2
+
+    assert client.put(f'/api/articles/{article_id}', json={'title': 'v2'}, headers=author).status_code == 200
+    # Within the lag bound the replica may still answer with the old version, and that is cached...
+    assert client.get(f'/api/articles/{article_id}').json['title'] == 'v1'
+    assert client.get('/api/articles/').json[0]['title'] == 'v1'
+    with app.app_context():
+        sync_replica()
+    assert client.get(f'/api/articles/{article_id}').json['title'] == 'v1'
+
+    # ...but not past it
+    time.sleep(2.1)
+    assert client.get(f'/api/articles/{article_id}').json['title'] == 'v2'
+    assert client.get('/api/articles/').json[0]['title'] == 'v2'
+
+
+def test_primary_reads_are_still_cached(make_app):
+    app = make_app()
+    client = app.test_client()
+    author = register_and_login(client, 'author')
+    client.post('/api/articles/', json={'title': 'v1', 'content': 'first'}, headers=author)
+
+    from app.utils.responseCache import response_cache
+    client.get('/api/articles/')
+    client.get('/api/articles/')
+    assert response_cache.stats()['hits'] == 1
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+from app.utils.responseCache import ResponseCache, LRUBackend, SharedBackend, LocalSharedStore
+from config import Config
+from conftest import register_and_login
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A second worker process: builds its own app on the same database and sends one request
+WORKER = """
+import json, sys
+from app import create_app
+client = create_app().test_client()
+method, path, body, authorization = sys.argv[1:]
+response = client.open(path, method=method, json=json.loads(body), headers={'Authorization': authorization})
+sys.exit(0 if response.status_code < 300 else 1)
+"""
+
+
+def caches():
+    # Per-process backends keep their counters in the database, the shared one next to its entries
+    return [ResponseCache(LRUBackend()), ResponseCache(SharedBackend(LocalSharedStore()))]
+
+
+def other_worker(database_uri, method, path, body, headers):
+    """Send a request through a separate app in a separate process, like another gunicorn worker"""
+    result = subprocess.run(
+        [sys.executable, '-c', WORKER, method, path, json.dumps(body), headers['Authorization']],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(
+            os.environ, DATABASE_URL=database_uri, SECRET_KEY=Config.SECRET_KEY, RATELIMIT_ENABLED='false',
+            RATELIMIT_STORAGE_URI='memory://', HARD_DELETE_WORKER='false', METRICS_ENABLED='false',
+        ),
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_body_read_before_an_invalidation_is_not_served(make_app):
+    with make_app().app_context():
+        for cache in caches():
+            version = cache.version('articles', 'page')
+            # A write commits and invalidates while the read is being serialized
+            cache.invalidate_namespace('articles')
+            cache.set('articles', 'page', '[]', version)
+            assert cache.get('articles', 'page', cache.version('articles', 'page')) is None
+
+            version = cache.version('article', 1)
+            cache.invalidate('article', 1)
+            cache.set('article', 1, '{}', version)
+            assert cache.get('article', 1, cache.version('article', 1)) is None
+
+
+def test_body_read_after_the_invalidation_is_served(make_app):
+    with make_app().app_context():
+        for cache in caches():
+            cache.invalidate('article', 1)
+            version = cache.version('article', 1)
+            cache.set('article', 1, '{"id": 1}', version, etag='"e"')
+            assert cache.get('article', 1, cache.version('article', 1)) == ({'etag': '"e"'}, '{"id": 1}')
+
+
+def test_writes_in_another_worker_invalidate_this_workers_cache(make_app, tmp_path):
+    app = make_app(RESPONSE_CACHE_BACKEND='lru')
+    client = app.test_client()
+    author = register_and_login(client, 'author')
+    article_id = client.post('/api/articles/', json={'title': 'v1', 'content': 'first'}, headers=author).json['id']
+    assert client.get(f'/api/articles/{article_id}').json['title'] == 'v1'
+    assert client.get('/api/articles/').json[0]['title'] == 'v1'
+
+    database_uri = f"sqlite:///{tmp_path / 'app.db'}"
+    other_worker(database_uri, 'PUT', f'/api/articles/{article_id}', {'title': 'v2'}, author)
+    assert client.get(f'/api/articles/{article_id}').json['title'] == 'v2'
+    assert client.get('/api/articles/').json[0]['title'] == 'v2'
+
+    # Unpublishing elsewhere must not leave the body served here
+    other_worker(database_uri, 'PUT', f'/api/articles/{article_id}', {'is_published': False}, author)
+    assert client.get(f'/api/articles/{article_id}').status_code == 404
+    assert client.get('/api/articles/').json == []
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine
+from app.utils.schema import verify_schema
+from config import Config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_migrations_run_on_a_fresh_database_in_create_mode(tmp_path):
+    database_uri = f"sqlite:///{tmp_path / 'fresh.db'}"
+    result = subprocess.run(
+        [sys.executable, 'manage.py', 'db', 'upgrade'], cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, DATABASE_URL=database_uri, DB_SCHEMA_STARTUP='create', RATELIMIT_STORAGE_URI='memory://'),
+    )
+    assert result.returncode == 0, result.stderr
+    verify_schema(create_engine(database_uri), Config.MIGRATIONS_VERSIONS_DIR)
@@ -0,0 +1,22 @@
+import pytest
+from conftest import register_and_login
+
+
+@pytest.mark.parametrize('query', ['fields=,', 'fields=%20,%20', 'include=,'])
+def test_selections_naming_nothing_are_rejected(make_app, query):
+    client = make_app().test_client()
+    author = register_and_login(client, 'author')
+    client.post('/api/articles/', json={'title': 't', 'content': 'full body'}, headers=author)
+
+    assert client.get(f'/api/articles/?{query}').status_code == 400
+    assert client.get(f'/api/articles/my-articles?{query}', headers=author).status_code == 400
+
+
+def test_blank_fields_use_the_summary(make_app):
+    client = make_app().test_client()
+    author = register_and_login(client, 'author')
+    client.post('/api/articles/', json={'title': 't', 'content': 'full body'}, headers=author)
+
+    article = client.get('/api/articles/?fields=%20').json[0]
+    assert 'content' not in article
+    assert article['excerpt'] == 'full body'
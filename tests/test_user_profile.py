@@ -0,0 +1,42 @@
+from app.models import db, User
+from conftest import register_and_login
+
+
+def test_profile_validators_come_from_the_stored_row(make_app):
+    app = make_app()
+    client = app.test_client()
+    user = register_and_login(client, 'someone')
+    etag = client.get('/api/users/profile', headers=user).headers['ETag']
+
+    # Another worker changes the profile; this worker's principal cache still holds the old row
+    with app.app_context():
+        stored = User.query.filter_by(username='someone').one()
+        stored.username = 'renamed-elsewhere'
+        db.session.commit()
+
+    response = client.get('/api/users/profile', headers=dict(user, **{'If-None-Match': etag}))
+    assert response.status_code == 200
+    assert response.json['username'] == 'renamed-elsewhere'
+
+    stale = client.put('/api/users/profile', json={'username': 'mine'}, headers=dict(user, **{'If-Match': etag}))
+    assert stale.status_code == 412
+    fresh = client.put(
+        '/api/users/profile', json={'username': 'mine'}, headers=dict(user, **{'If-Match': response.headers['ETag']})
+    )
+    assert fresh.status_code == 200
+
+
+def test_concurrent_if_match_writers_cannot_both_apply(make_app):
+    from app.controllers.userController import get_user_by_id, update_user, USER_MODIFIED
+    app = make_app()
+    client = app.test_client()
+    register_and_login(client, 'someone')
+
+    with app.app_context():
+        # Both writers passed the If-Match check against the same version
+        checked = get_user_by_id(1).updated_at
+        first, error = update_user(1, username='first', expected_updated_at=checked)
+        assert error is None and first.username == 'first'
+        second, error = update_user(1, username='second', expected_updated_at=checked)
+        assert (second, error) == (None, USER_MODIFIED)
+        assert get_user_by_id(1).username == 'first'